@@ -0,0 +1,282 @@
+"""
+验证码识别准确率/耗时基准。
+
+语料库为 JSONL 文件，每行一个带标注的样本：
+
+    滑块验证码：
+    {"id": "bp-0001", "type": "blockPuzzle",
+     "jigsawImageBase64": "...", "originalImageBase64": "...",
+     "gap_x": 123, "tolerance": 5}
+
+    点选文字验证码：
+    {"id": "cw-0001", "type": "clickWord",
+     "originalImageBase64": "...", "wordList": ["中", "国", "人"],
+     "boxes": {"中": [x1, y1, x2, y2], "国": [...], "人": [...]}}
+
+滑块样本在识别出的滑动距离与 gap_x 之差不超过 tolerance（默认 5 像素，与服务端校验一致）
+时计为成功；点选样本在每个词都有坐标且坐标落在对应标注框内时计为成功。
+
+输出每类验证码的成功率、单次墙钟耗时 p50/p95、单次 CPU 时间、低于置信度阈值的样本数
+（运行时这些样本不会提交校验而是直接换一张），以及 decode/canny/matchTemplate/yolo/ocr
+各阶段平均耗时；可保存为基线并与已有基线比较。
+
+用法：
+    python benchmark/bench_captcha.py --generate 200            # 生成合成滑块语料
+    python benchmark/bench_captcha.py --save-baseline base.json
+    python benchmark/bench_captcha.py --baseline base.json      # 回归时以非零状态退出
+    python benchmark/bench_captcha.py --solver legacy           # 原来的 slide_match 作为对照
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+from util import CaptchaUtils
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmark", "captcha_corpus", "synthetic.jsonl")
+STAGES = ("decode", "canny", "matchTemplate", "yolo", "ocr")
+
+
+def iter_corpus(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def generate_corpus(path: str, count: int, seed: int = 0) -> None:
+    """生成合成滑块验证码语料。"""
+    from captcha_synth import generate_block_puzzle
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            sample = generate_block_puzzle(seed * 1000003 + i)
+            f.write(
+                json.dumps(
+                    {
+                        "id": f"synthetic-{i:05d}",
+                        "type": "blockPuzzle",
+                        "jigsawImageBase64": sample["jigsawImageBase64"],
+                        "originalImageBase64": sample["originalImageBase64"],
+                        "gap_x": sample["gap_x"],
+                        "tolerance": 5,
+                    }
+                )
+                + "\n"
+            )
+    print(f"已生成 {count} 个合成样本: {path}")
+
+
+def check_block_puzzle(sample: Dict[str, Any], solution: str) -> bool:
+    x = json.loads(solution)["x"]
+    return abs(x - sample["gap_x"]) <= sample.get("tolerance", 5)
+
+
+def check_click_word(sample: Dict[str, Any], solution: str) -> bool:
+    points = json.loads(solution)
+    if len(points) != len(sample["wordList"]):
+        return False
+    for word, point in zip(sample["wordList"], points):
+        x1, y1, x2, y2 = sample["boxes"][word]
+        if not (x1 <= point["x"] <= x2 and y1 <= point["y"] <= y2):
+            return False
+    return True
+
+
+def solve_block_puzzle_legacy(sample: Dict[str, Any]) -> str:
+    """使用原来的 slide_match（三通道边缘图、搜索整幅背景）求解，作为对照。"""
+    target_bytes = base64.b64decode(sample["jigsawImageBase64"])
+    background_bytes = base64.b64decode(sample["originalImageBase64"])
+    left, right = CaptchaUtils.slide_match(target_bytes, background_bytes)
+    distance = CaptchaUtils.calculate_precise_slider_distance(
+        left, right, CaptchaUtils.extract_png_width(target_bytes)
+    )
+    return json.dumps({"x": distance, "y": 5})
+
+
+# 各类验证码的识别函数，键为 (类型, 求解器名)
+SOLVERS: Dict[tuple, Callable[[Dict[str, Any]], str]] = {
+    ("blockPuzzle", "default"): lambda s: CaptchaUtils.recognize_blockPuzzle_captcha(
+        s["jigsawImageBase64"], s["originalImageBase64"]
+    ),
+    ("blockPuzzle", "pyramid"): lambda s: CaptchaUtils.recognize_blockPuzzle_captcha(
+        s["jigsawImageBase64"], s["originalImageBase64"], pyramid=True
+    ),
+    ("blockPuzzle", "legacy"): solve_block_puzzle_legacy,
+    ("clickWord", "default"): lambda s: CaptchaUtils.recognize_clickWord_captcha(
+        s["originalImageBase64"], s["wordList"]
+    ),
+}
+CHECKERS = {"blockPuzzle": check_block_puzzle, "clickWord": check_click_word}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def run_corpus(path: str, solver: str = "default", limit: int = 0) -> Dict[str, Any]:
+    """对语料库逐个求解，返回按验证码类型汇总的统计。"""
+    stats: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {
+            "total": 0,
+            "solved": 0,
+            "errors": 0,
+            "gated": 0,
+            "gated_wrong": 0,
+            "wall": [],
+            "cpu": [],
+            "stages": defaultdict(float),
+        }
+    )
+    models_ready = os.path.exists("./models/yolov5n.onnx") and os.path.exists(
+        "./models/ocr.onnx"
+    )
+    skipped = 0
+    for index, sample in enumerate(iter_corpus(path)):
+        if limit and index >= limit:
+            break
+        kind = sample["type"]
+        if kind == "clickWord" and not models_ready:
+            skipped += 1
+            continue
+        solve = SOLVERS[(kind, solver)]
+        entry = stats[kind]
+        entry["total"] += 1
+        with CaptchaUtils.record_stages() as timings:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                solution = solve(sample)
+                ok = CHECKERS[kind](sample, solution)
+            except Exception:
+                entry["errors"] += 1
+                ok = False
+            entry["wall"].append(time.perf_counter() - wall_start)
+            entry["cpu"].append(time.process_time() - cpu_start)
+        entry["solved"] += ok
+        # 低于置信度阈值、运行时会直接换一张的样本，以及其中确实识别错误的样本
+        if not CaptchaUtils.captcha_confident():
+            entry["gated"] += 1
+            entry["gated_wrong"] += not ok
+        CaptchaUtils.discard_captcha_solution()
+        for stage, seconds in timings.items():
+            entry["stages"][stage] += seconds
+    if skipped:
+        print(f"未找到 models/ 下的 ONNX 模型，跳过 {skipped} 个点选验证码样本")
+
+    summary = {}
+    for kind, entry in stats.items():
+        total = entry["total"] or 1
+        summary[kind] = {
+            "solver": solver,
+            "total": entry["total"],
+            "accuracy": entry["solved"] / total,
+            "errors": entry["errors"],
+            "gated": entry["gated"],
+            "gated_wrong": entry["gated_wrong"],
+            "wall_p50_ms": percentile(entry["wall"], 50) * 1000,
+            "wall_p95_ms": percentile(entry["wall"], 95) * 1000,
+            "cpu_mean_ms": sum(entry["cpu"]) / total * 1000,
+            "stages_mean_ms": {
+                stage: entry["stages"][stage] / total * 1000
+                for stage in STAGES
+                if stage in entry["stages"]
+            },
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    for kind, result in summary.items():
+        print(
+            f"[{kind}/{result['solver']}] 样本 {result['total']}，"
+            f"成功率 {result['accuracy'] * 100:.1f}%，异常 {result['errors']}，"
+            f"p50 {result['wall_p50_ms']:.2f}ms，p95 {result['wall_p95_ms']:.2f}ms，"
+            f"CPU {result['cpu_mean_ms']:.2f}ms/个，"
+            f"低置信度 {result.get('gated', 0)}（其中识别错误 {result.get('gated_wrong', 0)}）"
+        )
+        stages = "，".join(
+            f"{stage} {ms:.2f}ms" for stage, ms in result["stages_mean_ms"].items()
+        )
+        print(f"    阶段平均：{stages}")
+
+
+def compare(
+    summary: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_accuracy_drop: float,
+    max_slowdown: float,
+) -> bool:
+    """与基线比较，返回是否通过。"""
+    passed = True
+    for kind, result in summary.items():
+        base = baseline.get(kind)
+        if not base:
+            print(f"[{kind}] 基线中没有该类型，跳过比较")
+            continue
+        accuracy_delta = result["accuracy"] - base["accuracy"]
+        slowdown = result["wall_p50_ms"] / base["wall_p50_ms"] if base["wall_p50_ms"] else 1.0
+        print(
+            f"[{kind}] 成功率变化 {accuracy_delta * 100:+.2f}pp，"
+            f"p50 耗时为基线的 {slowdown:.2f} 倍，"
+            f"CPU 为基线的 {result['cpu_mean_ms'] / (base['cpu_mean_ms'] or 1):.2f} 倍"
+        )
+        if accuracy_delta < -max_accuracy_drop:
+            print(f"[{kind}] 成功率下降超过 {max_accuracy_drop * 100:.1f}pp")
+            passed = False
+        if slowdown > max_slowdown:
+            print(f"[{kind}] 耗时超过基线的 {max_slowdown:.2f} 倍")
+            passed = False
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="验证码识别准确率/耗时基准")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--generate", type=int, help="生成指定数量的合成滑块样本")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solver", default="default")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--baseline", help="与指定基线文件比较")
+    parser.add_argument("--save-baseline", help="将本次结果保存为基线")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if args.generate:
+        generate_corpus(args.corpus, args.generate, args.seed)
+    elif not os.path.exists(args.corpus):
+        generate_corpus(args.corpus, 200, args.seed)
+
+    summary = run_corpus(args.corpus, args.solver, args.limit)
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(summary, baseline, args.max_accuracy_drop, args.max_slowdown):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
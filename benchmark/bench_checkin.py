@@ -0,0 +1,105 @@
+"""
+打卡记录查询基准。
+
+在本地模拟服务器上对比 get_checkin_info 查询整月与只查询今天（today_only）的响应大小和耗时。
+模拟服务器会为账号预置本月截至昨天每天上下班各一条打卡记录，月末时整月响应有六十条左右，
+再加上今天的一条上班卡，只查今天时响应只有这一条。
+
+用法：
+    python benchmark/bench_checkin.py --runs 50 --latency-ms 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_e2e import percentile
+from mock_server import MockServer, MockState
+
+import main
+from coreApi import MainLogicApi
+from coreApi.MainLogicApi import ApiClient
+from util.Config import ConfigManager
+
+ENDPOINT = "attendence/clock/v2/listSynchro"
+
+
+def login(base_url: str) -> ApiClient:
+    with open(os.path.join(main.USER_DIR, "example.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    config["config"]["user"] = {"phone": "13900000001", "password": "bench"}
+    api_client = ApiClient(ConfigManager(config=config))
+    api_client.login()
+    api_client.fetch_internship_plan()
+    return api_client
+
+
+def measure(api_client: ApiClient, state: MockState, today_only: bool, runs: int) -> dict:
+    state.bytes_sent.pop(ENDPOINT, None)
+    state.request_counts.pop(ENDPOINT, None)
+    samples = []
+    record = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        record = api_client.get_checkin_info(today_only=today_only)
+        samples.append(time.perf_counter() - start)
+    return {
+        "bytes_per_call": state.bytes_sent.get(ENDPOINT, 0) / runs,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "latest": record.get("createTime"),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="打卡记录查询基准")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    state = MockState(latency_ms=args.latency_ms)
+    with MockServer(state) as server:
+        MainLogicApi.BASE_URL = server.base_url
+        api_client = login(server.base_url)
+        # 触发模拟服务器预置本月的历史记录，再补上今天的上班卡
+        api_client.get_checkin_info()
+        user_id = api_client.config.get_value("userInfo.userId")
+        now = datetime.now()
+        state.clock_ins[user_id].append(
+            {
+                "attendanceId": "today",
+                "type": "START",
+                "createTime": now.replace(hour=0, minute=0, second=1).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+                "address": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+                "state": "NORMAL",
+            }
+        )
+        records = len(state.clock_ins[user_id])
+
+        month = measure(api_client, state, False, args.runs)
+        today = measure(api_client, state, True, args.runs)
+
+    print(f"本月打卡记录 {records} 条，每种查询 {args.runs} 次")
+    print(f"{'查询':<12}{'响应(B)':>12}{'p50(ms)':>12}{'p95(ms)':>12}  最新记录")
+    for name, result in (("整月", month), ("今天", today)):
+        print(
+            f"{name:<12}{result['bytes_per_call']:>12.0f}{result['p50_ms']:>12.1f}"
+            f"{result['p95_ms']:>12.1f}  {result['latest']}"
+        )
+    if today["bytes_per_call"]:
+        print(f"响应缩小 {month['bytes_per_call'] / today['bytes_per_call']:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main_cli()
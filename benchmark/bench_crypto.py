@@ -0,0 +1,127 @@
+"""
+AES 加解密微基准与兼容性校验。
+
+对比原始实现（每次调用都新建 AESECBPKCS5Padding）与缓存密码器的耗时，
+并在计时前逐字节校验两者的加解密结果完全一致，任一不一致即以非零状态退出。
+
+用法：
+    python benchmark/bench_crypto.py [--iterations 20000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aes_pkcs5.algorithms.aes_ecb_pkcs5_padding import AESECBPKCS5Padding
+
+from util import CryptoUtils
+from util.CryptoUtils import aes_encrypt, aes_decrypt
+
+DEFAULT_KEY = "23DbtQHR2UMbH6mJ"
+
+
+def legacy_encrypt(plaintext: str, key: str, out_format: str) -> str:
+    return AESECBPKCS5Padding(key, out_format).encrypt(plaintext)
+
+
+def legacy_decrypt(ciphertext: str, key: str, out_format: str) -> str:
+    return AESECBPKCS5Padding(key, out_format).decrypt(ciphertext)
+
+
+def sample_plaintexts(count: int) -> list:
+    """生成覆盖各种长度、中文与填充边界的明文样本。"""
+    rng = random.Random(20240101)
+    samples = ["", "a", "0" * 15, "0" * 16, "0" * 17, "打卡", "工学云" * 11]
+    samples.append('{"x":123.4,"y":5}')
+    samples.append('[{"x":12,"y":34},{"x":56,"y":78},{"x":90,"y":12}]')
+    alphabet = string.ascii_letters + string.digits + "中文测试-_:,{}"
+    while len(samples) < count:
+        samples.append(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 120)))
+        )
+    return samples
+
+
+def check_compatibility(samples: list) -> int:
+    """逐字节比较新旧实现，返回不一致的数量。"""
+    keys = [DEFAULT_KEY] + [uuid.uuid4().hex[:16] for _ in range(4)]
+    mismatches = 0
+    for backend in ("cryptography", "aes_pkcs5"):
+        CryptoUtils.set_aes_backend(backend)
+        for key in keys:
+            for fmt in ("hex", "b64"):
+                for text in samples:
+                    expected = legacy_encrypt(text, key, fmt)
+                    actual = aes_encrypt(text, key, fmt)
+                    if actual != expected or aes_decrypt(actual, key, fmt) != text:
+                        mismatches += 1
+                        print(f"[{backend}] 不一致: key={key} fmt={fmt} text={text!r}")
+    CryptoUtils.set_aes_backend("cryptography")
+    return mismatches
+
+
+def timeit(label: str, func, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1e6 / iterations:8.2f} us/op")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AES 加解密微基准")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = sample_plaintexts(200)
+    mismatches = check_compatibility(samples)
+    print(f"兼容性校验：{len(samples)} 个样本，不一致 {mismatches} 个")
+    if mismatches:
+        sys.exit(1)
+
+    n = args.iterations
+    timestamp = lambda i: str(1700000000000 + i)
+    captcha_keys = [uuid.uuid4().hex[:16] for _ in range(32)]
+    hex_cipher = legacy_encrypt(timestamp(0), DEFAULT_KEY, "hex")
+
+    base = timeit(
+        "legacy encrypt (t)",
+        lambda i: legacy_encrypt(timestamp(i), DEFAULT_KEY, "hex"),
+        n,
+    )
+    for backend in ("aes_pkcs5", "cryptography"):
+        CryptoUtils.set_aes_backend(backend)
+        cached = timeit(
+            f"cached[{backend}] encrypt (t)",
+            lambda i: aes_encrypt(timestamp(i)),
+            n,
+        )
+        print(f"{'':<36} 加速比 x{base / cached:.2f}")
+
+    timeit(
+        "legacy decrypt",
+        lambda i: legacy_decrypt(hex_cipher, DEFAULT_KEY, "hex"),
+        n,
+    )
+    timeit("cached decrypt", lambda i: aes_decrypt(hex_cipher), n)
+    timeit(
+        "legacy encrypt (captcha keys, b64)",
+        lambda i: legacy_encrypt('{"x":1.0,"y":5}', captcha_keys[i % 32], "b64"),
+        n,
+    )
+    timeit(
+        "cached encrypt (captcha keys, b64)",
+        lambda i: aes_encrypt('{"x":1.0,"y":5}', captcha_keys[i % 32], "b64"),
+        n,
+    )
+
+
+if __name__ == "__main__":
+    main()
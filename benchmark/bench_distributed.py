@@ -0,0 +1,109 @@
+"""
+多节点租约队列的离线演练。
+
+在本地模拟服务器上启动多个工作进程（各自调用 main.execute_tasks(queue_url=...)），
+所有进程把同一批合成账号入队并共同领取；运行中途用 SIGKILL 杀掉一个节点，
+验证其持有的租约到期后被其它节点接手，且每个账号在当前窗口恰好成功打卡一次。
+
+用法：
+    python benchmark/bench_distributed.py --backend sqlite --accounts 30 --nodes 3
+    python benchmark/bench_distributed.py --backend redis --kill-after 1.5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+from bench_e2e import synthetic_account
+from mock_server import MockServer, MockState
+from resp_server import RespServer
+
+import main
+from coreApi import FileUploadApi, MainLogicApi
+
+
+def node(queue_url: str, lease_seconds: float, log_level: str) -> None:
+    logging.getLogger().setLevel(log_level)
+    main.execute_tasks(queue_url=queue_url, lease_seconds=lease_seconds)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="多节点租约队列演练")
+    parser.add_argument("--backend", choices=("sqlite", "redis"), default="sqlite")
+    parser.add_argument("--accounts", type=int, default=30)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--kill-after", type=float, default=1.0, help="多少秒后杀掉第一个节点")
+    parser.add_argument("--lease-seconds", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    ctx = multiprocessing.get_context("fork")
+    state = MockState(latency_ms=args.latency_ms, latency_jitter_ms=args.latency_ms / 4)
+    workdir = tempfile.mkdtemp(prefix="bench_queue_")
+    with MockServer(state) as server, RespServer() as resp:
+        MainLogicApi.BASE_URL = server.base_url
+        FileUploadApi.UPLOAD_URL = f"{server.base_url}qiniu/"
+        now = main.datetime.now()
+        accounts = [
+            synthetic_account(7, i, server.base_url, 0, now) for i in range(args.accounts)
+        ]
+        os.environ["USER"] = json.dumps(accounts, ensure_ascii=False)
+        main.USER_DIR = workdir
+        main.LEDGER_PATH = os.path.join(workdir, "ledger.db")
+        main.REPORT_HISTORY_PATH = os.path.join(workdir, "reports.db")
+        main.PLAN_CACHE_PATH = os.path.join(workdir, "plans.db")
+        main.CAPTCHA_CACHE_PATH = os.path.join(workdir, "captcha.db")
+        main.RUN_HISTORY_PATH = os.path.join(workdir, "history.db")
+        if args.backend == "sqlite":
+            queue_url = f"sqlite:///{os.path.join(workdir, 'queue.db')}"
+        else:
+            queue_url = resp.url
+
+        start = time.perf_counter()
+        processes = [
+            ctx.Process(target=node, args=(queue_url, args.lease_seconds, args.log_level))
+            for _ in range(args.nodes)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(args.kill_after)
+        os.kill(processes[0].pid, signal.SIGKILL)
+        print(f"已在 {args.kill_after:.1f}s 时杀掉节点 {processes[0].pid}")
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        window_type = "START" if now.hour < 12 else "END"
+        today = now.strftime("%Y-%m-%d")
+        per_user = Counter()
+        for user_id, records in state.clock_ins.items():
+            for record in records:
+                if record["type"] == window_type and record["createTime"].startswith(today):
+                    per_user[user_id] += 1
+
+    counts = Counter(per_user.values())
+    missing = args.accounts - len(per_user)
+    duplicated = sum(1 for c in per_user.values() if c > 1)
+    print(
+        f"{args.backend}：{args.nodes} 个节点，{args.accounts} 个账号，耗时 {elapsed:.2f}s；"
+        f"每账号打卡次数分布 {dict(counts)}，未打卡 {missing}，重复 {duplicated}"
+    )
+    if missing or duplicated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,274 @@
+"""
+离线端到端基准：在本地模拟服务器上运行 main.execute_tasks。
+
+为每个规模生成一批合成账号（通过环境变量 USER 注入，user 目录替换为空目录），
+对模拟服务器执行完整流程（登录滑块验证码、计划、打卡、日/周/月报、AI 生成、七牛上传），
+输出吞吐量（账号/秒）、各阶段 p50/p95/p99 耗时和进程峰值 RSS。
+
+这是其它性能优化的对照基线。
+
+用法：
+    python benchmark/bench_e2e.py --accounts 10 100 1000 --latency-ms 20
+    python benchmark/bench_e2e.py --accounts 100 --clock 18:05 --images 1 --json out.json
+    python benchmark/bench_e2e.py --accounts 60 --capacity 4   # 服务端容量不足时的过载表现
+    python benchmark/bench_e2e.py --accounts 100 --triggers 2   # 第二次触发应由本地台账跳过
+    python benchmark/bench_e2e.py --accounts 50 --captcha-fail-rate 0.5 --captcha-parallel 3
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+from mock_server import MockServer, MockState
+
+import main
+from coreApi import FileUploadApi, MainLogicApi
+from coreApi.MainLogicApi import ApiClient
+
+PHASES = (
+    "run",
+    "login",
+    "fetch_internship_plan",
+    "perform_clock_in",
+    "submit_daily_report",
+    "submit_weekly_report",
+    "submit_monthly_report",
+    "generate_article",
+    "upload_img",
+    "captcha",
+)
+
+
+class PhaseRecorder:
+    """记录各阶段耗时（线程安全）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, name: str, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.samples[name].append(elapsed)
+
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = defaultdict(list)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def synthetic_account(
+    batch: int, index: int, ai_url: str, images: int, now: datetime, captcha_parallel: int = 1
+) -> dict:
+    """生成一个今天所有任务都到期的合成账号配置，batch 用于区分不同规模的账号。"""
+    with open(os.path.join(main.USER_DIR, "example.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    settings = config["config"]
+    settings["user"] = {"phone": f"139{batch:04d}{index:04d}", "password": "bench"}
+    settings["clockIn"]["mode"] = "daily"
+    settings["clockIn"]["imageCount"] = images
+    report = settings["reportSettings"]
+    report["daily"] = {"enabled": True, "imageCount": images}
+    report["weekly"] = {"enabled": True, "imageCount": images, "submitTime": now.weekday() + 1}
+    report["monthly"] = {"enabled": True, "imageCount": images, "submitTime": now.day}
+    settings["ai"] = {"model": "mock", "apikey": "sk-mock", "apiUrl": ai_url}
+    settings["pushNotifications"] = []
+    settings["captchaParallel"] = captcha_parallel
+    return config
+
+
+def install_clock(clock: str | None) -> None:
+    """把 main 中的当前时间固定到今天的指定时刻，便于让上午/下午的任务都能被测到。"""
+    if not clock:
+        return
+    hour, minute = (int(part) for part in clock.split(":"))
+    real_datetime = main.datetime
+
+    class FixedClock(real_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return real_datetime.now(tz).replace(hour=hour, minute=minute)
+
+        @classmethod
+        def today(cls):
+            return cls.now()
+
+    main.datetime = FixedClock
+
+
+def install_probes(recorder: PhaseRecorder) -> None:
+    for name in (
+        "perform_clock_in",
+        "submit_daily_report",
+        "submit_weekly_report",
+        "submit_monthly_report",
+        "generate_article",
+        "upload_img",
+        "run",
+    ):
+        setattr(main, name, recorder.wrap(name, getattr(main, name)))
+    for name, attr in (
+        ("login", "login"),
+        ("fetch_internship_plan", "fetch_internship_plan"),
+        ("captcha", "pass_blockPuzzle_captcha"),
+    ):
+        setattr(ApiClient, attr, recorder.wrap(name, getattr(ApiClient, attr)))
+
+
+def run_scale(count: int, state: MockState, base_url: str, args, recorder) -> dict:
+    now = main.datetime.now()
+    accounts = [
+        synthetic_account(count, i, base_url, args.images, now, args.captcha_parallel)
+        for i in range(count)
+    ]
+    empty_dir = tempfile.mkdtemp(prefix="bench_user_")
+    original_dir, original_env = main.USER_DIR, os.environ.get("USER")
+    main.USER_DIR = empty_dir
+    os.environ["USER"] = json.dumps(accounts, ensure_ascii=False)
+    recorder.reset()
+    state.request_counts.clear()
+    state.bytes_sent.clear()
+    state.peak_in_flight = state.rejected = 0
+    try:
+        start = time.perf_counter()
+        main.execute_tasks()
+        elapsed = time.perf_counter() - start
+    finally:
+        main.USER_DIR = original_dir
+        if original_env is None:
+            os.environ.pop("USER", None)
+        else:
+            os.environ["USER"] = original_env
+        os.rmdir(empty_dir)
+
+    phases = {}
+    for name in PHASES:
+        samples = recorder.samples.get(name, [])
+        if samples:
+            phases[name] = {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            }
+    return {
+        "accounts": count,
+        "elapsed_s": elapsed,
+        "accounts_per_s": count / elapsed if elapsed else 0.0,
+        "requests": sum(state.request_counts.values()),
+        "response_bytes": sum(state.bytes_sent.values()),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_in_flight": state.peak_in_flight,
+        "rejected": state.rejected,
+        "phases": phases,
+    }
+
+
+def print_result(result: dict) -> None:
+    trigger = f"（第 {result['trigger']} 次触发）" if result.get("trigger", 1) > 1 else ""
+    print(
+        f"\n== {result['accounts']} 个账号{trigger}：{result['elapsed_s']:.2f}s，"
+        f"{result['accounts_per_s']:.2f} 账号/秒，请求 {result['requests']} 次，"
+        f"响应 {result['response_bytes'] / 1024:.1f} KiB，峰值 RSS {result['peak_rss_mb']:.1f} MiB，"
+        f"峰值并发 {result['peak_in_flight']}，过载拒绝 {result['rejected']}"
+    )
+    print(f"{'阶段':<24}{'次数':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}")
+    for name, stats in result["phases"].items():
+        print(
+            f"{name:<24}{stats['count']:>8}{stats['p50_ms']:>12.1f}"
+            f"{stats['p95_ms']:>12.1f}{stats['p99_ms']:>12.1f}"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="离线端到端基准")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--ai-latency-ms", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--captcha-fail-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--capacity", type=int, default=0, help="模拟服务器同时处理的请求数上限，0 表示不限制"
+    )
+    parser.add_argument(
+        "--triggers", type=int, default=1, help="同一批账号连续触发的次数（共享本地执行台账）"
+    )
+    parser.add_argument(
+        "--captcha-parallel", type=int, default=1, help="登录时每轮并行尝试的验证码数"
+    )
+    parser.add_argument("--images", type=int, default=0, help="每个任务上传的图片数")
+    parser.add_argument("--clock", help="固定当前时刻，例如 08:05 或 18:05")
+    parser.add_argument("--json", help="将结果写入指定 JSON 文件")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    install_clock(args.clock)
+    recorder = PhaseRecorder()
+    install_probes(recorder)
+
+    state = MockState(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        captcha_fail_rate=args.captcha_fail_rate,
+        ai_latency_ms=args.ai_latency_ms,
+        capacity=args.capacity,
+    )
+    results = []
+    with MockServer(state) as server:
+        MainLogicApi.BASE_URL = server.base_url
+        FileUploadApi.UPLOAD_URL = f"{server.base_url}qiniu/"
+        for count in args.accounts:
+            ledger_dir = tempfile.mkdtemp(prefix="bench_ledger_")
+            main.LEDGER_PATH = os.path.join(ledger_dir, "ledger.db")
+            main.REPORT_HISTORY_PATH = os.path.join(ledger_dir, "reports.db")
+            main.PLAN_CACHE_PATH = os.path.join(ledger_dir, "plans.db")
+            main.CAPTCHA_CACHE_PATH = os.path.join(ledger_dir, "captcha.db")
+            main.RUN_HISTORY_PATH = os.path.join(ledger_dir, "history.db")
+            try:
+                for trigger in range(1, args.triggers + 1):
+                    result = run_scale(count, state, server.base_url, args, recorder)
+                    result["trigger"] = trigger
+                    print_result(result)
+                    results.append(result)
+            finally:
+                shutil.rmtree(ledger_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
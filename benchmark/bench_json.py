@@ -0,0 +1,140 @@
+"""
+JSON 编解码基准。
+
+对比标准库 json（requests 的 json= 参数和 response.json() 所用方式）与 util.JsonCodec
+在打卡/报告请求体、登录响应和配置文件上的编解码耗时，以及请求体骨架相对逐字段构造字典的开销。
+
+用法：
+    python benchmark/bench_json.py [--iterations 20000]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coreApi.MainLogicApi import CLOCK_IN_PAYLOAD_TEMPLATE, REPORT_PAYLOAD_TEMPLATE
+from util import JsonCodec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample_payloads() -> dict:
+    report = {
+        **REPORT_PAYLOAD_TEMPLATE,
+        "content": "实习地点：成都\n\n工作内容：\n\n" + "今天完成了接口联调与测试。" * 40,
+        "planId": "8a8a8a8a8a8a8a8a8a8a8a8a8a8a8a8a",
+        "reportType": "week",
+        "title": "第12周周报",
+        "weeks": "第12周",
+        "startTime": "2024-05-06 00:00:00",
+        "endTime": "2024-05-12 23:59:59",
+        "attachments": "",
+        "jobId": "1234567890",
+        "formFieldDtoList": [],
+        "t": "9f" * 16,
+    }
+    clock_in = {
+        **CLOCK_IN_PAYLOAD_TEMPLATE,
+        "lastDetailAddress": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+        "createTime": "2024-05-10 08:01:02",
+        "device": "{brand: TA J20, systemVersion: 17, Platform: Android}",
+        "type": "START",
+        "planId": "8a8a8a8a8a8a8a8a8a8a8a8a8a8a8a8a",
+        "userId": "1234567890",
+        "t": "9f" * 16,
+        "address": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+        "latitude": "30.559922",
+        "longitude": "104.093023",
+        "province": "四川省",
+        "city": "成都市",
+        "area": "高新区",
+    }
+    response = {
+        "code": 200,
+        "msg": "success",
+        "data": [
+            {
+                "attendanceId": str(1000 + i),
+                "type": "START" if i % 2 else "END",
+                "createTime": f"2024-05-{1 + i // 2:02d} 08:00:00",
+                "address": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+                "description": "今天天气不错",
+                "state": "NORMAL",
+            }
+            for i in range(60)
+        ],
+    }
+    with open(os.path.join(ROOT, "user", "example.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    return {
+        "report": report,
+        "clock_in": clock_in,
+        "listSynchro": response,
+        "config": config,
+    }
+
+
+def timeit(label: str, func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed * 1e6 / iterations:8.2f} us/op")
+    return elapsed
+
+
+def build_report_literal(content: str) -> dict:
+    """原 submit_report 的逐字段字典构造方式（用于对比骨架展开）。"""
+    data = {key: None for key in REPORT_PAYLOAD_TEMPLATE}
+    data["fieldEntityList"] = []
+    data["isWarning"] = 0
+    data["content"] = content
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 编解码基准")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    print(f"JSON 后端: {JsonCodec.JSON_BACKEND}")
+    for name, obj in sample_payloads().items():
+        encoded = json.dumps(obj).encode()
+        # 解码结果必须与标准库一致
+        assert JsonCodec.loads(JsonCodec.dumps(obj)) == obj
+        print(f"--- {name} ({len(encoded)} 字节)")
+        base = timeit("stdlib dumps (requests json=)", lambda: json.dumps(obj), n)
+        fast = timeit("JsonCodec.dumps", lambda: JsonCodec.dumps(obj), n)
+        print(f"{'':<44} 加速比 x{base / fast:.2f}")
+        base = timeit("stdlib loads", lambda: json.loads(encoded), n)
+        fast = timeit("JsonCodec.loads", lambda: JsonCodec.loads(encoded), n)
+        print(f"{'':<44} 加速比 x{base / fast:.2f}")
+        if name == "config":
+            timeit(
+                "stdlib dump(indent=2)",
+                lambda: json.dump(obj, io.StringIO(), ensure_ascii=False, indent=2),
+                n // 4,
+            )
+            timeit(
+                "JsonCodec.dump_pretty",
+                lambda: JsonCodec.dump_pretty(obj, io.StringIO()),
+                n // 4,
+            )
+
+    print("--- 请求体构造")
+    timeit("逐字段构造报告请求体", lambda: build_report_literal("x"), n)
+    timeit(
+        "骨架展开报告请求体",
+        lambda: {**REPORT_PAYLOAD_TEMPLATE, "content": "x"},
+        n,
+    )
+
+
+if __name__ == "__main__":
+    main()
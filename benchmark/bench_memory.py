@@ -0,0 +1,192 @@
+"""
+账号规模与峰值内存的基准：证明 main.execute_tasks 的峰值内存取决于并发数而不是账号总数。
+
+每个规模在单独的子进程中运行（峰值 RSS 只增不减，不能在同一进程内比较），账号预先写入账号存储
+（--source store）或 user 目录（--source files），子进程从中按需读取并执行。
+
+工作负载：
+    synthetic  用替身代替登录和各任务（main._run）：等待 --task-ms 毫秒模拟网络往返，返回含
+               --report-kb KiB 报告全文的结果。只测量读取账号、调度和结果处理的开销，10k 账号几秒即可跑完。
+    mock       在本地模拟服务器上执行完整流程（较慢，适合几百个账号）。
+
+输出每个规模的耗时、导入后的基线 RSS、峰值 RSS（VmHWM）以及两者之差。
+
+用法：
+    python benchmark/bench_memory.py --accounts 1000 10000
+    python benchmark/bench_memory.py --accounts 100 300 --workload mock --max-in-flight 8
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+import main
+from bench_e2e import synthetic_account
+
+
+def status_kib(field: str) -> int:
+    """读取 /proc/self/status 中的内存字段（KiB）。"""
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def prepare_accounts(count: int, source: str, workdir: str, ai_url: str) -> None:
+    """生成 count 个合成账号，写入账号存储或 user 目录。"""
+    now = datetime.now()
+    accounts = (
+        (f"acc{i}", synthetic_account(count, i, ai_url, 0, now)) for i in range(count)
+    )
+    if source == "store":
+        from util.AccountStore import AccountStore
+
+        store = AccountStore(os.path.join(workdir, "accounts.db"))
+        store.upsert_many(accounts)
+        store.close()
+    else:
+        user_dir = os.path.join(workdir, "user")
+        os.makedirs(user_dir)
+        for name, config in accounts:
+            with open(os.path.join(user_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(config, f, ensure_ascii=False)
+
+
+def install_synthetic_run(task_ms: float, report_kb: int) -> None:
+    """用替身代替登录和各任务，返回与真实任务结构相同的结果。"""
+
+    def synthetic_run(config, api_client=None) -> List[Dict[str, Any]]:
+        time.sleep(task_ms / 1000)
+        content = "实习内容" * (report_kb * 256 // 3)
+        results = [{"status": "success", "message": "打卡成功", "task_type": "打卡"}]
+        for task_type in ("日报提交", "周报提交", "月报提交"):
+            results.append(
+                {
+                    "status": "success",
+                    "message": f"{task_type}成功",
+                    "task_type": task_type,
+                    "details": {"标题": task_type},
+                    "report_content": content,
+                }
+            )
+        main.MessagePusher(config.get_value("config.pushNotifications")).push(results)
+        return results
+
+    main._run = synthetic_run
+
+
+def child(args) -> None:
+    """在子进程中执行一个规模并输出一行 JSON 结果。"""
+    logging.getLogger().setLevel(args.log_level)
+    workdir = args.workdir
+    for name in (
+        "LEDGER_PATH",
+        "REPORT_HISTORY_PATH",
+        "PLAN_CACHE_PATH",
+        "CAPTCHA_CACHE_PATH",
+        "RUN_HISTORY_PATH",
+    ):
+        setattr(main, name, os.path.join(workdir, f"{name.lower()}.db"))
+    main.MAX_THREADS = args.max_in_flight
+    os.environ.pop("USER", None)
+    if args.source == "store":
+        main.ACCOUNTS_DB_PATH = os.path.join(workdir, "accounts.db")
+    else:
+        main.USER_DIR = os.path.join(workdir, "user")
+
+    if args.workload == "synthetic":
+        install_synthetic_run(args.task_ms, args.report_kb)
+    else:
+        from coreApi import FileUploadApi, MainLogicApi
+
+        MainLogicApi.BASE_URL = args.base_url
+        FileUploadApi.UPLOAD_URL = f"{args.base_url}qiniu/"
+
+    baseline = status_kib("VmRSS")
+    start = time.perf_counter()
+    main.execute_tasks()
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "elapsed_s": elapsed,
+                "baseline_kib": baseline,
+                "peak_kib": status_kib("VmHWM"),
+            }
+        )
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="账号规模与峰值内存")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--source", choices=["store", "files"], default="store")
+    parser.add_argument("--workload", choices=["synthetic", "mock"], default="synthetic")
+    parser.add_argument("--max-in-flight", type=int, default=main.MAX_THREADS)
+    parser.add_argument("--task-ms", type=float, default=2.0, help="synthetic：每个账号的模拟耗时")
+    parser.add_argument("--report-kb", type=int, default=4, help="synthetic：每篇报告的大小")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mock：模拟服务器延迟")
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{'账号数':>8}{'耗时(s)':>10}{'基线 RSS(MiB)':>16}{'峰值 RSS(MiB)':>16}{'增量(MiB)':>12}")
+    for count in args.accounts:
+        workdir = tempfile.mkdtemp(prefix="bench_memory_")
+        try:
+            with contextlib.ExitStack() as stack:
+                base_url = "http://127.0.0.1:9/"
+                if args.workload == "mock":
+                    from mock_server import MockServer, MockState
+
+                    # 模拟服务器运行在父进程中，其内存不计入子进程
+                    state = MockState(latency_ms=args.latency_ms)
+                    base_url = stack.enter_context(MockServer(state)).base_url
+                prepare_accounts(count, args.source, workdir, base_url)
+                command = [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--child",
+                    "--workdir", workdir,
+                    "--base-url", base_url,
+                    "--source", args.source,
+                    "--workload", args.workload,
+                    "--max-in-flight", str(args.max_in_flight),
+                    "--task-ms", str(args.task_ms),
+                    "--report-kb", str(args.report_kb),
+                    "--log-level", args.log_level,
+                ]
+                output = subprocess.run(command, check=True, capture_output=True, text=True)
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        baseline = result["baseline_kib"] / 1024
+        peak = result["peak_kib"] / 1024
+        print(
+            f"{count:>8}{result['elapsed_s']:>10.2f}{baseline:>16.1f}{peak:>16.1f}"
+            f"{peak - baseline:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
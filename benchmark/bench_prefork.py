@@ -0,0 +1,73 @@
+"""
+比较预先 fork 的工作进程分别加载验证码模型与共享权重时各进程的内存占用。
+
+父进程 fork 出 --workers 个子进程，每个子进程创建两个模型的推理会话并推理一次，然后报告本进程的
+RSS、PSS 和独占内存（USS）。private 模式下各子进程分别加载完整模型；shared 模式下父进程先调用
+CaptchaUtils.share_models() 映射权重文件（需先运行 benchmark/share_models.py）。
+
+用法：
+    python benchmark/bench_prefork.py --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+from share_models import random_inputs
+from util import CaptchaUtils
+from util.ProcessMemory import format_memory, memory_usage
+
+
+def worker(results) -> None:
+    for name in CaptchaUtils.MODEL_NAMES:
+        session = CaptchaUtils.get_session(CaptchaUtils.model_path(name))
+        session.run(None, random_inputs(session))
+    results.put((os.getpid(), memory_usage()))
+
+
+def measure(workers: int, shared: bool) -> List[Tuple[int, Dict[str, Any]]]:
+    """fork 出 workers 个子进程加载模型，返回各子进程的内存占用。"""
+    CaptchaUtils._shared_models.clear()
+    CaptchaUtils.configure_inference(processes=workers)
+    if shared and CaptchaUtils.share_models() < len(CaptchaUtils.MODEL_NAMES):
+        sys.exit("未找到共享模型，请先运行 benchmark/share_models.py")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.SimpleQueue()
+    processes = [ctx.Process(target=worker, args=(results,)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return [results.get() for _ in processes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预先 fork 的工作进程的内存占用")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    for name in CaptchaUtils.MODEL_NAMES:
+        if not os.path.exists(CaptchaUtils.model_path(name)):
+            sys.exit(f"未找到 {CaptchaUtils.model_path(name)}")
+
+    mib = 1024 * 1024
+    for mode in ("private", "shared"):
+        reports = measure(args.workers, mode == "shared")
+        print(f"{mode}：")
+        for pid, usage in reports:
+            print(f"  工作进程 {pid}：{format_memory(usage)}")
+        unique = sum(usage.get("uss", 0) for _, usage in reports)
+        print(f"  {args.workers} 个工作进程合计独占 {unique / mib:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+启动耗时基准。
+
+在全新的子进程中反复执行 `import main`，统计墙钟耗时的最小值、中位数和 p95，并检查启动时
+是否导入了 cv2/numpy/onnxruntime/PIL 等重量级依赖（这些依赖应在首次识别验证码或
+处理图片时才加载）。可保存为基线并与已有基线比较，回归时以非零状态退出。
+
+用法：
+    python benchmark/bench_startup.py --runs 20
+    python benchmark/bench_startup.py --save-baseline startup.json
+    python benchmark/bench_startup.py --baseline startup.json --max-slowdown 1.3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from util.StartupProfile import HEAVY_MODULES, profile_imports
+
+
+def time_import(module: str, runs: int) -> List[float]:
+    """返回每次在新进程中导入模块的墙钟耗时（秒），包含解释器启动。"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def measure(module: str, runs: int) -> Dict[str, Any]:
+    # 先空跑一次，让 .pyc 和文件系统缓存就绪
+    time_import(module, 1)
+    samples = time_import(module, runs)
+    baseline = time_import("sys", max(3, runs // 4))
+    records = profile_imports(module)
+    loaded = {r.module.split(".")[0] for r in records}
+    return {
+        "module": module,
+        "runs": runs,
+        "wall_min_ms": min(samples) * 1000,
+        "wall_p50_ms": statistics.median(samples) * 1000,
+        "wall_p95_ms": sorted(samples)[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000,
+        "interpreter_ms": min(baseline) * 1000,
+        "import_ms": next((r.cumulative_us for r in records if r.module == module), 0) / 1000,
+        "modules": len(records),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="p50 墙钟耗时上限（毫秒）")
+    parser.add_argument("--baseline", help="与指定基线文件比较")
+    parser.add_argument("--save-baseline", help="将本次结果保存为基线")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    parser.add_argument(
+        "--allow-heavy", action="store_true", help="不把启动时导入重量级依赖视为失败"
+    )
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs)
+    print(
+        f"import {result['module']}：最快 {result['wall_min_ms']:.1f}ms，"
+        f"p50 {result['wall_p50_ms']:.1f}ms，p95 {result['wall_p95_ms']:.1f}ms（空解释器 {result['interpreter_ms']:.1f}ms），"
+        f"导入本身 {result['import_ms']:.1f}ms，共 {result['modules']} 个模块"
+    )
+
+    passed = True
+    if result["heavy_modules"]:
+        print(f"启动时导入了重量级依赖: {', '.join(result['heavy_modules'])}")
+        passed = args.allow_heavy
+    if args.max_ms and result["wall_p50_ms"] > args.max_ms:
+        print(f"p50 耗时超过上限 {args.max_ms:.1f}ms")
+        passed = False
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # 取最快一次并扣除解释器自身启动时间后再比较，减少机器抖动的影响
+        current = result["wall_min_ms"] - result["interpreter_ms"]
+        previous = baseline["wall_min_ms"] - baseline["interpreter_ms"]
+        slowdown = current / previous if previous > 0 else 1.0
+        print(f"导入耗时为基线的 {slowdown:.2f} 倍")
+        if slowdown > args.max_slowdown:
+            print(f"导入耗时超过基线的 {args.max_slowdown:.2f} 倍")
+            passed = False
+
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
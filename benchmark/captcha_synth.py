@@ -0,0 +1,98 @@
+"""
+合成滑块验证码（blockPuzzle）生成器。
+
+生成与工学云 AJ-Captcha 结构一致的图片：310x155 的背景图（带缺口）和与背景等高、
+除拼图块外全透明的 RGBA 滑块图。供模拟服务器和验证码语料库使用。
+"""
+
+import base64
+import random
+from typing import Dict, Any
+
+import cv2
+import numpy as np
+
+BACKGROUND_WIDTH = 310
+BACKGROUND_HEIGHT = 155
+PIECE_SIZE = 40
+KNOB_RADIUS = 7
+
+
+def _piece_mask() -> np.ndarray:
+    """生成拼图块掩码（方块 + 右侧和上侧的凸起）。"""
+    size = PIECE_SIZE + KNOB_RADIUS * 2
+    mask = np.zeros((size, size), dtype=np.uint8)
+    top = KNOB_RADIUS
+    cv2.rectangle(mask, (0, top), (PIECE_SIZE - 1, top + PIECE_SIZE - 1), 255, -1)
+    cv2.circle(mask, (PIECE_SIZE - 1, top + PIECE_SIZE // 2), KNOB_RADIUS, 255, -1)
+    cv2.circle(mask, (PIECE_SIZE // 2, top), KNOB_RADIUS, 255, -1)
+    return mask
+
+
+def _random_background(rng: random.Random) -> np.ndarray:
+    """生成带纹理的随机背景图。"""
+    np_rng = np.random.default_rng(rng.getrandbits(32))
+    gradient = np.linspace(0, 1, BACKGROUND_WIDTH, dtype=np.float32)
+    base = np.empty((BACKGROUND_HEIGHT, BACKGROUND_WIDTH, 3), dtype=np.float32)
+    for channel in range(3):
+        start, end = rng.uniform(40, 220), rng.uniform(40, 220)
+        base[:, :, channel] = start + (end - start) * gradient
+    image = base.astype(np.uint8)
+    for _ in range(rng.randint(12, 24)):
+        color = tuple(int(c) for c in np_rng.integers(0, 256, 3))
+        center = (rng.randrange(BACKGROUND_WIDTH), rng.randrange(BACKGROUND_HEIGHT))
+        if rng.random() < 0.5:
+            cv2.circle(image, center, rng.randint(6, 40), color, -1)
+        else:
+            end = (rng.randrange(BACKGROUND_WIDTH), rng.randrange(BACKGROUND_HEIGHT))
+            cv2.line(image, center, end, color, rng.randint(1, 4))
+    noise = np_rng.integers(-12, 13, image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _encode_png(image: np.ndarray) -> bytes:
+    ok, buffer = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("PNG 编码失败")
+    return buffer.tobytes()
+
+
+def generate_block_puzzle(seed: int | None = None) -> Dict[str, Any]:
+    """
+    生成一组滑块验证码。
+
+    Args:
+        seed (int | None): 随机种子，相同种子生成相同图片。
+
+    Returns:
+        Dict[str, Any]: 包含 jigsawImageBase64、originalImageBase64、gap_x（缺口左边界）和 gap_y。
+    """
+    rng = random.Random(seed)
+    background = _random_background(rng)
+    mask = _piece_mask()
+    size = mask.shape[0]
+    gap_x = rng.randint(size + 20, BACKGROUND_WIDTH - size - 5)
+    gap_y = rng.randint(5, BACKGROUND_HEIGHT - size - 5)
+
+    region = (slice(gap_y, gap_y + size), slice(gap_x, gap_x + size))
+    inside = mask > 0
+    contour_mask = cv2.morphologyEx(mask, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+
+    # 滑块图：与背景等高，只有拼图块可见
+    jigsaw = np.zeros((BACKGROUND_HEIGHT, size, 4), dtype=np.uint8)
+    piece = background[region].copy()
+    piece[contour_mask > 0] = (255, 255, 255)
+    jigsaw[gap_y : gap_y + size, :, :3][inside] = piece[inside]
+    jigsaw[gap_y : gap_y + size, :, 3][inside] = 255
+
+    # 背景图：缺口区域压暗并描边
+    gap = background[region]
+    gap[inside] = (gap[inside] * 0.45).astype(np.uint8)
+    gap[contour_mask > 0] = (235, 235, 235)
+
+    return {
+        "jigsawImageBase64": base64.b64encode(_encode_png(jigsaw)).decode(),
+        "originalImageBase64": base64.b64encode(_encode_png(background)).decode(),
+        "gap_x": gap_x,
+        "gap_y": gap_y,
+    }
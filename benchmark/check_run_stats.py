@@ -0,0 +1,76 @@
+"""
+检查执行历史中的重试次数：工学云接口的网络/5xx 重试和 Token 失效后的重新登录都应计入 RunStats.retries。
+
+在本地模拟服务器上登录一个合成账号，然后：
+    1. 让下一次请求返回 500，请求实习计划，应重试一次；
+    2. 把 token 改为无效值，请求实习计划，应重新登录一次后重发。
+任一检查不通过时以非零状态退出。
+
+用法：
+    python benchmark/check_run_stats.py
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+from bench_e2e import synthetic_account
+from mock_server import MockServer, MockState
+
+from coreApi import MainLogicApi
+from coreApi.MainLogicApi import ApiClient
+from util.Config import ConfigManager
+from util.RunStats import RunStats, collect_stats
+
+
+def fail_next_request(state: MockState) -> None:
+    """让模拟服务器的下一次请求返回 500，之后恢复正常。"""
+    failures = iter([0.0])
+    state.error_rate = 1.0
+    state.random = lambda: next(failures, 1.0)
+
+
+def count_retries(api_client: ApiClient) -> int:
+    """请求一次实习计划，返回期间记入的重试次数。"""
+    stats = RunStats()
+    with collect_stats(stats):
+        api_client.fetch_internship_plan()
+    return stats.retries
+
+
+def main():
+    logging.disable(logging.WARNING)
+    state = MockState()
+    failed = []
+    with MockServer(state) as server:
+        MainLogicApi.BASE_URL = server.base_url
+        config = ConfigManager(
+            config=synthetic_account(1, 0, server.base_url, 0, datetime.now())
+        )
+        api_client = ApiClient(config)
+        api_client.login()
+
+        fail_next_request(state)
+        retries = count_retries(api_client)
+        print(f"服务端 500 后重试：记入 {retries} 次")
+        if retries != 1:
+            failed.append("网络/5xx 重试")
+
+        config.update_config("expired", "userInfo", "token")
+        retries = count_retries(api_client)
+        print(f"Token 失效后重新登录：记入 {retries} 次")
+        if retries != 1:
+            failed.append("Token 失效重新登录")
+
+    if failed:
+        sys.exit(f"重试未计入执行历史：{'、'.join(failed)}")
+    print("重试次数均已计入")
+
+
+if __name__ == "__main__":
+    main()
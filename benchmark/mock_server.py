@@ -0,0 +1,464 @@
+"""
+本地模拟服务器：工学云 API、七牛云上传和 OpenAI 兼容的 /v1/chat/completions。
+
+实现 ApiClient 用到的全部接口，每个请求可配置延迟、错误率（HTTP 500）和滑块验证码失败率，
+服务端按账号保存打卡/报告记录，因此同一账号重复运行时的“已打卡/已提交”判断与线上一致。
+
+单独启动：
+    python benchmark/mock_server.py --port 18080 --latency-ms 30
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from captcha_synth import generate_block_puzzle
+from util.CryptoUtils import aes_decrypt, aes_encrypt
+
+# 校验滑块位置时允许的误差（像素）
+CAPTCHA_TOLERANCE = 5
+
+
+class MockState:
+    """模拟服务器的全部状态（线程安全）。"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        captcha_fail_rate: float = 0.0,
+        ai_latency_ms: Optional[float] = None,
+        captcha_pool_size: int = 64,
+        seed: int = 0,
+        capacity: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.captcha_fail_rate = captcha_fail_rate
+        self.ai_latency_ms = latency_ms if ai_latency_ms is None else ai_latency_ms
+        # 工学云接口同时处理的请求数上限（0 表示不限制）：越接近上限越慢，超过上限直接返回 503
+        self.capacity = capacity
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.rejected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # 与线上一样，背景图来自有限的图片池
+        self._captcha_pool = [
+            generate_block_puzzle(seed * 100003 + i) for i in range(captcha_pool_size)
+        ]
+        self._captchas: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, str] = {}
+        self.clock_ins: Dict[str, list] = {}
+        self.reports: Dict[str, list] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.bytes_sent: Dict[str, int] = {}
+
+    def random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def enter(self) -> int:
+        """进入一个工学云接口请求，返回当前并发数；超出容量时计为拒绝。"""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.capacity and self.in_flight > self.capacity:
+                self.rejected += 1
+            return self.in_flight
+
+    def leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def delay(self, path: str, in_flight: int = 1) -> None:
+        base = self.ai_latency_ms if path == "v1/chat/completions" else self.latency_ms
+        if self.capacity and path != "v1/chat/completions":
+            base *= 1 + in_flight / self.capacity
+        jitter = self.latency_jitter_ms
+        if base or jitter:
+            time.sleep(max(0.0, base + random.uniform(-jitter, jitter)) / 1000)
+
+    def count(self, path: str, size: int) -> None:
+        with self._lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+            self.bytes_sent[path] = self.bytes_sent.get(path, 0) + size
+
+    def new_captcha(self) -> Dict[str, Any]:
+        with self._lock:
+            captcha = self._rng.choice(self._captcha_pool)
+            token = uuid.uuid4().hex
+            secret_key = uuid.uuid4().hex[:16]
+            self._captchas[token] = {"gap_x": captcha["gap_x"], "key": secret_key}
+        return {
+            "jigsawImageBase64": captcha["jigsawImageBase64"],
+            "originalImageBase64": captcha["originalImageBase64"],
+            "secretKey": secret_key,
+            "token": token,
+            "wordList": [],
+        }
+
+    def check_captcha(self, token: str, point_json: str) -> bool:
+        with self._lock:
+            captcha = self._captchas.pop(token, None)
+        if captcha is None:
+            return False
+        try:
+            point = json.loads(aes_decrypt(point_json, captcha["key"], "b64"))
+        except Exception:
+            return False
+        if isinstance(point, list):
+            # 点选验证码：模拟服务器不校验坐标
+            return self.random() >= self.captcha_fail_rate
+        if abs(float(point.get("x", -999)) - captcha["gap_x"]) > CAPTCHA_TOLERANCE:
+            return False
+        return self.random() >= self.captcha_fail_rate
+
+    def login(self, phone: str) -> Dict[str, Any]:
+        user_id = str(abs(hash(phone)) % 10**10)
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[token] = user_id
+        return {
+            "token": token,
+            "userId": user_id,
+            "roleKey": "student",
+            "userType": "student",
+            "nikeName": f"测试{phone[-4:]}",
+            "phone": phone,
+            "orgJson": {"snowFlakeId": "1000000000", "schoolName": "模拟学院"},
+        }
+
+    def user_of(self, token: Optional[str]) -> Optional[str]:
+        with self._lock:
+            return self._tokens.get(token or "")
+
+
+def _month_records(user_records: list, start: str, end: str) -> list:
+    """按时间倒序返回时间窗口内的打卡记录，线上接口的 endTime 只精确到日期。"""
+    start_time = datetime.strptime(start[:19], "%Y-%m-%d %H:%M:%S")
+    end_time = datetime.strptime(end[:10], "%Y-%m-%d") + timedelta(days=1)
+    return [
+        r
+        for r in reversed(user_records)
+        if start_time <= datetime.strptime(r["createTime"], "%Y-%m-%d %H:%M:%S") < end_time
+    ]
+
+
+def make_handler(state: MockState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        ROUTES: Dict[str, Any] = {}
+
+        def log_message(self, format, *args):  # noqa: A002 - 覆盖基类签名
+            pass
+
+        def _send(self, payload: Any, status: int = 200) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            state.count(self._path, len(body))
+
+        def _ok(self, data: Any = None, **extra) -> None:
+            self._send({"code": 200, "msg": "success", "data": data, **extra})
+
+        def do_POST(self):
+            self._path = self.path.split("?", 1)[0].lstrip("/")
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            metered = not self._path.startswith(("qiniu", "v1/"))
+            in_flight = state.enter() if metered else 1
+            try:
+                if metered and state.capacity and in_flight > state.capacity:
+                    self._send({"code": 503, "msg": "Service Unavailable"}, status=503)
+                    return
+                state.delay(self._path, in_flight)
+            finally:
+                if metered:
+                    state.leave()
+            if state.error_rate and state.random() < state.error_rate:
+                self._send({"code": 500, "msg": "Internal Server Error"}, status=500)
+                return
+            if self._path.startswith("qiniu"):
+                self._send({"key": f"upload/mock/{uuid.uuid4().hex}.jpg"})
+                return
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                body = {}
+            handler = self.ROUTES.get(self._path)
+            if handler is None:
+                self._send({"code": 404, "msg": f"unknown path {self._path}"}, 404)
+                return
+            handler(self, body)
+
+        # --- 验证码 ---
+        def captcha_get(self, body):
+            self._ok(state.new_captcha())
+
+        def captcha_check(self, body):
+            if state.check_captcha(body.get("token", ""), body.get("pointJson", "")):
+                self._ok({"result": True})
+            else:
+                self._send({"code": 6111, "msg": "验证失败", "data": None})
+
+        # --- 登录与鉴权 ---
+        def login(self, body):
+            phone = aes_decrypt(body.get("phone", ""))
+            self._ok(aes_encrypt(json.dumps(state.login(phone), ensure_ascii=False)))
+
+        def _user(self) -> Optional[str]:
+            user_id = state.user_of(self.headers.get("authorization"))
+            if user_id is None:
+                self._send({"code": 401, "msg": "token失效，请重新登录"})
+            return user_id
+
+        # --- 业务接口 ---
+        def plan(self, body):
+            if self._user() is None:
+                return
+            plans = [
+                {
+                    "planId": f"plan{i}",
+                    "planName": f"模拟实习计划{i}",
+                    "planPaper": {
+                        "dayPaperNum": 300,
+                        "weekPaperNum": 500,
+                        "monthPaperNum": 800,
+                    },
+                }
+                for i in range(3)
+            ]
+            page_size = int(body.get("pageSize") or 10)
+            page = int(body.get("currPage") or 1)
+            self._ok(plans[(page - 1) * page_size : page * page_size], flag=len(plans))
+
+        def list_synchro(self, body):
+            user_id = self._user()
+            if user_id is None:
+                return
+            records = state.clock_ins.get(user_id, [])
+            if not records:
+                # 预置本月已有的历史打卡，模拟月末大响应
+                now = datetime.now()
+                for day in range(1, now.day):
+                    for hour, kind in ((8, "START"), (18, "END")):
+                        records.append(
+                            {
+                                "attendanceId": uuid.uuid4().hex,
+                                "type": kind,
+                                "createTime": now.replace(
+                                    day=day, hour=hour, minute=0, second=0
+                                ).strftime("%Y-%m-%d %H:%M:%S"),
+                                "address": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+                                "description": "今天天气不错",
+                                "state": "NORMAL",
+                            }
+                        )
+                state.clock_ins[user_id] = records
+            data = _month_records(records, body["startTime"], body["endTime"])
+            page_size = body.get("pageSize")
+            if page_size:
+                page = int(body.get("currPage") or 1)
+                data = data[(page - 1) * int(page_size) : page * int(page_size)]
+            self._ok(data)
+
+        def clock_in(self, body):
+            user_id = self._user()
+            if user_id is None:
+                return
+            state.clock_ins.setdefault(user_id, []).append(
+                {
+                    "attendanceId": uuid.uuid4().hex,
+                    "type": body.get("type"),
+                    "createTime": body.get("createTime"),
+                    "address": body.get("address"),
+                    "description": body.get("description"),
+                    "state": "NORMAL",
+                }
+            )
+            self._ok(None)
+
+        def job_info(self, body):
+            if self._user() is None:
+                return
+            self._ok(
+                {
+                    "jobId": "job1",
+                    "jobAddress": "四川省成都市",
+                    "quartersIntroduce": "负责后端接口开发与测试",
+                    "practiceCompanyEntity": {
+                        "companyName": "模拟科技有限公司",
+                        "tradeValue": "软件和信息技术服务业",
+                    },
+                }
+            )
+
+        def report_list(self, body):
+            user_id = self._user()
+            if user_id is None:
+                return
+            reports = [
+                r
+                for r in reversed(state.reports.get(user_id, []))
+                if r["reportType"] == body.get("reportType")
+            ]
+            page_size = int(body.get("pageSize") or 10)
+            page = int(body.get("currPage") or 1)
+            self._ok(
+                reports[(page - 1) * page_size : page * page_size], flag=len(reports)
+            )
+
+        def report_save(self, body):
+            user_id = self._user()
+            if user_id is None:
+                return
+            state.reports.setdefault(user_id, []).append(
+                {
+                    "reportId": uuid.uuid4().hex,
+                    "reportType": body.get("reportType"),
+                    "title": body.get("title"),
+                    "weeks": body.get("weeks"),
+                    "yearmonth": body.get("yearmonth"),
+                    "createTime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            )
+            self._ok(None)
+
+        def weeks(self, body):
+            if self._user() is None:
+                return
+            today = datetime.now().date()
+            start = today - timedelta(days=today.weekday())
+            self._ok(
+                [
+                    {
+                        "startTime": f"{start} 00:00:00",
+                        "endTime": f"{start + timedelta(days=6)} 23:59:59",
+                    }
+                ]
+            )
+
+        def form_info(self, body):
+            if self._user() is None:
+                return
+            self._ok({"formFieldDtoList": []})
+
+        def upload_token(self, body):
+            if self._user() is None:
+                return
+            self._ok(uuid.uuid4().hex)
+
+        def chat(self, body):
+            self._send(
+                {
+                    "id": uuid.uuid4().hex,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "实习地点：成都\n\n工作内容：\n\n"
+                                + "完成了接口开发与联调测试。" * 40,
+                            },
+                        }
+                    ],
+                }
+            )
+
+    Handler.ROUTES = {
+        "session/captcha/v1/get": Handler.captcha_get,
+        "session/captcha/v1/check": Handler.captcha_check,
+        "attendence/clock/v1/get": Handler.captcha_get,
+        "attendence/clock/v1/check": Handler.captcha_check,
+        "session/user/v6/login": Handler.login,
+        "practice/plan/v3/getPlanByStu": Handler.plan,
+        "attendence/clock/v2/listSynchro": Handler.list_synchro,
+        "attendence/clock/v5/save": Handler.clock_in,
+        "practice/job/v4/infoByStu": Handler.job_info,
+        "practice/paper/v2/listByStu": Handler.report_list,
+        "practice/paper/v6/save": Handler.report_save,
+        "practice/paper/v3/getWeeks1": Handler.weeks,
+        "practice/paper/v2/info": Handler.form_info,
+        "session/upload/v1/token": Handler.upload_token,
+        "v1/chat/completions": Handler.chat,
+    }
+    return Handler
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # 客户端进程被杀掉（例如多节点演练）时连接会被重置，这不是服务器错误
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockServer:
+    """在后台线程中运行的模拟服务器。"""
+
+    def __init__(self, state: MockState, host: str = "127.0.0.1", port: int = 0):
+        self.state = state
+        self.httpd = _QuietHTTPServer((host, port), make_handler(state))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self) -> "MockServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工学云本地模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--captcha-fail-rate", type=float, default=0.0)
+    parser.add_argument("--capacity", type=int, default=0, help="同时处理的请求数上限")
+    args = parser.parse_args()
+
+    state = MockState(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        captcha_fail_rate=args.captcha_fail_rate,
+        capacity=args.capacity,
+    )
+    with MockServer(state, args.host, args.port) as server:
+        print(f"模拟服务器已启动: {server.base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+点选验证码模型的 INT8 量化工具。
+
+使用 onnxruntime.quantization 将 models/ 下的 yolov5n.onnx 和 ocr.onnx 量化为
+yolov5n.int8.onnx 和 ocr.int8.onnx，然后在带标注的验证码语料库（格式见 bench_captcha.py）上
+分别用原模型和量化模型识别点选验证码：成功率下降超过 --max-accuracy-drop 时删除量化模型并以非零状态退出，
+只有通过检查的量化模型会保留。运行时通过 main.py --quantized-models 加载量化模型。
+
+量化方式：
+    dynamic  权重量化为 INT8，激活在推理时动态量化，不需要校准数据。
+    static   权重和激活都量化为 INT8（QDQ 格式），用语料库中的点选验证码图片校准，CPU 上通常更快。
+
+需要额外安装 onnx（只有量化时需要，运行时不需要）：
+    pip install onnx
+
+用法：
+    python benchmark/quantize_models.py --corpus labelled.jsonl
+    python benchmark/quantize_models.py --corpus labelled.jsonl --mode static --calibration 64
+"""
+
+import argparse
+import base64
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+
+import cv2
+import numpy as np
+
+from bench_captcha import DEFAULT_CORPUS, compare, iter_corpus, print_summary, run_corpus
+from util import CaptchaUtils
+
+MODELS = ("yolov5n", "ocr")
+
+
+def click_word_images(corpus: str, limit: int) -> Iterator[Dict[str, Any]]:
+    """依次返回语料库中点选验证码的图片（OpenCV 格式）和标注框。"""
+    count = 0
+    for sample in iter_corpus(corpus):
+        if sample["type"] != "clickWord":
+            continue
+        if limit and count >= limit:
+            return
+        image = cv2.imdecode(
+            np.frombuffer(base64.b64decode(sample["originalImageBase64"]), np.uint8),
+            cv2.IMREAD_COLOR,
+        )
+        yield {"image": image, "boxes": list(sample["boxes"].values())}
+        count += 1
+
+
+def calibration_inputs(name: str, corpus: str, limit: int) -> List[np.ndarray]:
+    """按模型的预处理方式准备校准输入：检测模型用整张图，OCR 模型用标注框内的文字。"""
+    inputs = []
+    for sample in click_word_images(corpus, limit):
+        image = sample["image"]
+        if name == "yolov5n":
+            inputs.append(CaptchaUtils.detection_input(image)[0])
+        else:
+            for x1, y1, x2, y2 in sample["boxes"]:
+                inputs.append(CaptchaUtils.ocr_input(image[y1:y2, x1:x2]))
+    return inputs
+
+
+def quantize(name: str, mode: str, corpus: str, calibration: int) -> str:
+    """量化一个模型，返回量化模型的路径。"""
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    source = os.path.join(CaptchaUtils.MODEL_DIR, f"{name}.onnx")
+    target = os.path.join(
+        CaptchaUtils.MODEL_DIR, f"{name}{CaptchaUtils.QUANTIZED_SUFFIX}.onnx"
+    )
+    # 量化前先做形状推断和图优化，量化效果更好
+    prepared = os.path.join(CaptchaUtils.MODEL_DIR, f"{name}.prep.onnx")
+    quant_pre_process(source, prepared)
+    try:
+        if mode == "dynamic":
+            quantize_dynamic(prepared, target, weight_type=QuantType.QInt8)
+        else:
+            inputs = calibration_inputs(name, corpus, calibration)
+            if not inputs:
+                raise ValueError("语料库中没有点选验证码样本，无法进行静态量化的校准")
+            input_name = CaptchaUtils.get_session(source).get_inputs()[0].name
+
+            class Reader(CalibrationDataReader):
+                def __init__(self):
+                    self._inputs = iter(inputs)
+
+                def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+                    data = next(self._inputs, None)
+                    return None if data is None else {input_name: data}
+
+            quantize_static(
+                prepared,
+                target,
+                Reader(),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+            )
+    finally:
+        os.remove(prepared)
+    print(
+        f"{source} ({os.path.getsize(source) / 1024:.0f} KiB) -> "
+        f"{target} ({os.path.getsize(target) / 1024:.0f} KiB)"
+    )
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="点选验证码模型的 INT8 量化")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="带标注的验证码语料库")
+    parser.add_argument("--mode", choices=["dynamic", "static"], default="dynamic")
+    parser.add_argument("--calibration", type=int, default=64, help="静态量化使用的校准图片数")
+    parser.add_argument("--limit", type=int, default=0, help="精度检查最多使用的样本数")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    for name in MODELS:
+        if not os.path.exists(os.path.join(CaptchaUtils.MODEL_DIR, f"{name}.onnx")):
+            sys.exit(f"未找到 {CaptchaUtils.MODEL_DIR}/{name}.onnx")
+
+    outputs = [quantize(name, args.mode, args.corpus, args.calibration) for name in MODELS]
+
+    CaptchaUtils.configure_inference(quantized=False)
+    baseline = run_corpus(args.corpus, limit=args.limit)
+    CaptchaUtils.configure_inference(quantized=True)
+    summary = run_corpus(args.corpus, limit=args.limit)
+    baseline = {kind: result for kind, result in baseline.items() if kind == "clickWord"}
+    summary = {kind: result for kind, result in summary.items() if kind == "clickWord"}
+    if not summary:
+        for path in outputs:
+            os.remove(path)
+        sys.exit("语料库中没有点选验证码样本，无法检查量化后的精度，已删除量化模型")
+
+    print("原模型：")
+    print_summary(baseline)
+    print("量化模型：")
+    print_summary(summary)
+    # 只检查精度，耗时仅供参考
+    if not compare(summary, baseline, args.max_accuracy_drop, float("inf")):
+        for path in outputs:
+            os.remove(path)
+        sys.exit("量化后成功率下降超过允许范围，已删除量化模型")
+    print("量化模型通过精度检查，运行时使用 --quantized-models 加载")
+
+
+if __name__ == "__main__":
+    main()
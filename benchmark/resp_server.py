@@ -0,0 +1,264 @@
+"""
+本地 Redis 协议替身服务器，用于在没有 Redis 的环境中测试 RedisLeaseQueue。
+
+只实现租约队列用到的命令：PING、SELECT、AUTH、WATCH、UNWATCH、MULTI、EXEC、DISCARD、
+DEL、FLUSHDB、HSET、HSETNX、HGET、HINCRBY、ZADD（NX/XX）、ZSCORE、ZCOUNT、
+ZRANGEBYSCORE（LIMIT）。所有命令在一把全局锁下执行，WATCH 通过键版本号实现。
+
+用法：
+    python benchmark/resp_server.py --port 6390
+"""
+
+import argparse
+import socketserver
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class RespState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data: Dict[bytes, Any] = {}
+        self.versions: Dict[bytes, int] = {}
+
+    def touch(self, key: bytes) -> None:
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+
+def _parse_bound(value: bytes) -> tuple:
+    text = value.decode()
+    exclusive = text.startswith("(")
+    if exclusive:
+        text = text[1:]
+    return float(text), exclusive
+
+
+def _in_range(score: float, low: tuple, high: tuple) -> bool:
+    (lo, lo_ex), (hi, hi_ex) = low, high
+    above = score > lo if lo_ex else score >= lo
+    below = score < hi if hi_ex else score <= hi
+    return above and below
+
+
+def _format_score(score: float) -> bytes:
+    if score == float("inf"):
+        return b"inf"
+    if score == float("-inf"):
+        return b"-inf"
+    return repr(score).encode()
+
+
+class Error(Exception):
+    pass
+
+
+def execute(state: RespState, args: List[bytes]) -> Any:
+    """在持有 state.lock 时执行一条命令。"""
+    name = args[0].upper()
+    data = state.data
+    if name == b"PING":
+        return "PONG"
+    if name in (b"SELECT", b"AUTH"):
+        return "OK"
+    if name == b"FLUSHDB":
+        for key in list(data):
+            state.touch(key)
+        data.clear()
+        return "OK"
+    if name == b"DEL":
+        removed = 0
+        for key in args[1:]:
+            if data.pop(key, None) is not None:
+                state.touch(key)
+                removed += 1
+        return removed
+
+    key = args[1]
+    if name in (b"HSET", b"HSETNX", b"HGET", b"HINCRBY"):
+        table = data.get(key)
+        if name == b"HGET":
+            return None if table is None else table.get(args[2])
+        if table is None:
+            table = data[key] = {}
+        if name == b"HSET":
+            added = 0
+            for field, value in zip(args[2::2], args[3::2]):
+                added += field not in table
+                table[field] = value
+            state.touch(key)
+            return added
+        if name == b"HSETNX":
+            if args[2] in table:
+                return 0
+            table[args[2]] = args[3]
+            state.touch(key)
+            return 1
+        value = int(table.get(args[2], b"0")) + int(args[3])
+        table[args[2]] = str(value).encode()
+        state.touch(key)
+        return value
+
+    zset = data.get(key)
+    if name == b"ZADD":
+        options = set()
+        index = 2
+        while args[index].upper() in (b"NX", b"XX", b"CH"):
+            options.add(args[index].upper())
+            index += 1
+        if zset is None:
+            zset = data[key] = {}
+        added = 0
+        for score, member in zip(args[index::2], args[index + 1 :: 2]):
+            exists = member in zset
+            if (b"NX" in options and exists) or (b"XX" in options and not exists):
+                continue
+            zset[member] = float(score)
+            added += not exists
+        state.touch(key)
+        return added
+    if name == b"ZSCORE":
+        if zset is None or args[2] not in zset:
+            return None
+        return _format_score(zset[args[2]])
+    if name in (b"ZCOUNT", b"ZRANGEBYSCORE"):
+        low, high = _parse_bound(args[2]), _parse_bound(args[3])
+        members = sorted(
+            (score, member)
+            for member, score in (zset or {}).items()
+            if _in_range(score, low, high)
+        )
+        if name == b"ZCOUNT":
+            return len(members)
+        if len(args) > 4 and args[4].upper() == b"LIMIT":
+            offset, count = int(args[5]), int(args[6])
+            members = members[offset : offset + count if count >= 0 else None]
+        return [member for _, member in members]
+    raise Error(f"ERR unknown command '{name.decode()}'")
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Error):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(type(value))
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        state: RespState = self.server.state
+        watched: Dict[bytes, int] = {}
+        queued: Optional[List[List[bytes]]] = None
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with state.lock:
+                if name == b"WATCH":
+                    for key in args[1:]:
+                        watched[key] = state.versions.get(key, 0)
+                    reply: Any = "OK"
+                elif name == b"UNWATCH":
+                    watched.clear()
+                    reply = "OK"
+                elif name == b"MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == b"DISCARD":
+                    queued, reply = None, "OK"
+                    watched.clear()
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = Error("ERR EXEC without MULTI")
+                    elif any(state.versions.get(k, 0) != v for k, v in watched.items()):
+                        reply = None
+                    else:
+                        reply = []
+                        for command in queued:
+                            try:
+                                reply.append(execute(state, command))
+                            except Error as e:
+                                reply.append(e)
+                    queued = None
+                    watched.clear()
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    try:
+                        reply = execute(state, args)
+                    except Error as e:
+                        reply = e
+            if name == b"EXEC" and reply is None:
+                self.wfile.write(b"*-1\r\n")
+            else:
+                self.wfile.write(encode(reply))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        # 客户端被杀掉时连接会被重置，这不是服务器错误
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class RespServer:
+    """在后台线程运行的替身服务器，可作为上下文管理器使用。"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = _Server((host, port), Handler)
+        self.server.daemon_threads = True
+        self.server.state = RespState()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def __enter__(self) -> "RespServer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 Redis 协议替身服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    with RespServer(args.host, args.port) as server:
+        print(f"监听 {server.url}，Ctrl+C 退出")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+生成可在多个工作进程间共享权重的验证码模型。
+
+把 models/ 下 yolov5n.onnx 和 ocr.onnx 的权重（initializer）移到单独的权重文件，生成：
+    yolov5n.shared.onnx     不含权重的模型，权重以外部数据的形式引用权重文件
+    yolov5n.shared.weights  按页对齐排列的原始权重
+    yolov5n.shared.json     权重索引（名称 -> 偏移、类型、形状），运行时据此映射，不需要安装 onnx
+然后用原模型和共享模型对同一随机输入推理，输出不一致时删除生成的文件并以非零状态退出。
+
+运行时 main.py --workers N 在 fork 工作进程之前以只读 mmap 映射权重文件，各工作进程的推理会话
+直接使用映射的内存（见 CaptchaUtils.share_models）。
+
+需要额外安装 onnx（只有生成时需要，运行时不需要）：
+    pip install onnx
+
+用法：
+    python benchmark/share_models.py
+    python benchmark/share_models.py --quantized   # 为 INT8 量化模型生成
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import logging
+
+import numpy as np
+
+from util import CaptchaUtils
+
+# 权重按页对齐存放，映射后每个权重都从页首开始
+ALIGNMENT = mmap.PAGESIZE
+# 小于该字节数的权重保留在模型内，不值得外置
+MIN_EXTERNAL_BYTES = 1024
+
+
+def externalize(source: str) -> List[str]:
+    """生成 source 对应的共享模型文件，返回生成的文件路径。"""
+    import onnx
+    from onnx import numpy_helper
+    from onnx.external_data_helper import set_external_data
+
+    graph_path, weights_path, index_path = CaptchaUtils.shared_model_files(source)
+    model = onnx.load(source)
+    index: Dict[str, Dict] = {}
+    with open(weights_path, "wb") as f:
+        for tensor in model.graph.initializer:
+            array = numpy_helper.to_array(tensor)
+            if array.nbytes < MIN_EXTERNAL_BYTES:
+                continue
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            offset = f.tell()
+            f.write(np.ascontiguousarray(array).tobytes())
+            index[tensor.name] = {
+                "offset": offset,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+            tensor.CopyFrom(numpy_helper.from_array(array, tensor.name))
+            set_external_data(tensor, os.path.basename(weights_path), offset, array.nbytes)
+            tensor.ClearField("raw_data")
+            tensor.data_location = onnx.TensorProto.EXTERNAL
+    onnx.save(model, graph_path)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    print(
+        f"{source} -> {graph_path} ({os.path.getsize(graph_path) / 1024:.0f} KiB) + "
+        f"{weights_path} ({len(index)} 个权重，{os.path.getsize(weights_path) / 1024:.0f} KiB)"
+    )
+    return [graph_path, weights_path, index_path]
+
+
+def random_inputs(session) -> Dict[str, np.ndarray]:
+    """按模型的输入定义生成随机输入，动态维度取 1。"""
+    rng = np.random.default_rng(0)
+    inputs = {}
+    for node in session.get_inputs():
+        shape = [d if isinstance(d, int) and d > 0 else 1 for d in node.shape]
+        inputs[node.name] = rng.random(shape, dtype=np.float32)
+    return inputs
+
+
+def verify(name: str) -> bool:
+    """比较原模型和共享模型对同一输入的输出。"""
+    source = CaptchaUtils.model_path(name)
+    CaptchaUtils._shared_models.pop(source, None)
+    CaptchaUtils.get_session.cache_clear()
+    baseline = CaptchaUtils.get_session(source)
+    inputs = random_inputs(baseline)
+    expected = baseline.run(None, inputs)
+    if not CaptchaUtils.share_models((name,)):
+        return False
+    shared = CaptchaUtils.get_session(source)
+    actual = shared.run(None, inputs)
+    return all(np.allclose(a, b, rtol=1e-4, atol=1e-5) for a, b in zip(actual, expected))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成权重外置、可在工作进程间共享的验证码模型")
+    parser.add_argument("--quantized", action="store_true", help="为 INT8 量化模型生成")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    CaptchaUtils.configure_inference(quantized=args.quantized)
+    for name in CaptchaUtils.MODEL_NAMES:
+        if not os.path.exists(CaptchaUtils.model_path(name)):
+            sys.exit(f"未找到 {CaptchaUtils.model_path(name)}")
+
+    for name in CaptchaUtils.MODEL_NAMES:
+        source = CaptchaUtils.model_path(name)
+        outputs = externalize(source)
+        if not verify(name):
+            for path in outputs:
+                os.remove(path)
+            sys.exit(f"{source} 的共享模型输出与原模型不一致，已删除生成的文件")
+    print("共享模型通过检查，运行时使用 main.py --workers N 在工作进程间共享权重")
+
+
+if __name__ == "__main__":
+    main()
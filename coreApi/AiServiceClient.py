@@ -1,5 +1,4 @@
 import logging
-import time
 from typing import Dict, Any, Optional
 from urllib.parse import urljoin
 
@@ -7,10 +6,15 @@ import requests
 from requests.exceptions import RequestException
 
 from util.HelperFunctions import strip_markdown
+from util.JsonCodec import dumps, response_json
+from util.Metrics import METRICS
+from util.RetryPolicy import RetryPolicy
+from util.Tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced()
 def generate_article(
     config: Any,
     title: str,
@@ -29,8 +33,8 @@ def generate_article(
         job_info: 工作相关信息字典。
         count: 字数下限，默认500。
         max_retries: 最大重试次数，默认3。
-        retry_delay: 每次重试的延迟时间（秒）。
-        timeout: 请求超时时间（秒）。
+        retry_delay: 退避基数（秒），重试间隔为带抖动的指数退避。
+        timeout: 单次请求超时时间（秒），会被账号剩余的时间预算截断。
     Returns:
         生成的文章内容字符串。
     Raises:
@@ -44,6 +48,7 @@ def generate_article(
 
     headers = {
         "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
     }
     # 使用urljoin防止拼接错误
     api_url = urljoin(api_base_url.rstrip("/") + "/", "v1/chat/completions")
@@ -89,36 +94,40 @@ def generate_article(
             logger.exception("解析响应发生异常")
             return None
 
-    # === 主重试流程 ===
-    for attempt in range(1, max_retries + 1):
-        try:
-            logger.info(f"第 {attempt} 次请求，标题：{title}")
+    # 请求体只序列化一次，重试时复用
+    body = dumps(data)
+
+    policy = RetryPolicy(
+        max_attempts=max_retries, base_delay=retry_delay, timeout=timeout
+    )
+
+    def send(request_timeout: float) -> requests.Response:
+        logger.info(f"请求 AI 接口，标题：{title}")
+        with METRICS.timer("ai_request_duration_seconds"):
             response = requests.post(
                 url=api_url,
                 headers=headers,
-                json=data,
-                timeout=timeout,
+                data=body,
+                timeout=request_timeout,
             )
             response.raise_for_status()
-            content = parse_response(response.json())
-            if not content:
-                logger.error("AI 返回内容为空或格式不正确")
-                raise ValueError("AI 返回内容为空或格式不正确")
-            logger.info("文章生成成功")
-            return strip_markdown(content)
-        except RequestException as e:
-            logger.warning(f"网络请求错误 （尝试 {attempt}/{max_retries}）：{e}")
-            if attempt == max_retries:
-                logger.error(f"达到最大重试次数，最后一次错误: {e}")
-                raise ValueError(f"网络异常，生成失败: {e}")
-            time.sleep(retry_delay)
-        except ValueError as e:
-            logger.error(f"内容错误或解析失败：{e}")
-            raise
-        except Exception as e:
-            logger.exception(f"未知异常（第 {attempt} 次）：{e}")
-            if attempt == max_retries:
-                raise ValueError(f"生成文章失败，未知错误: {e}")
-            time.sleep(retry_delay)
+        return response
+
+    def on_retry(attempt: int, error: Exception, delay: float) -> None:
+        logger.warning(
+            f"网络请求错误 （尝试 {attempt}/{max_retries}）：{error}，{delay:.2f} 秒后重试"
+        )
+
+    # === 主重试流程 ===
+    try:
+        response = policy.call(send, on_retry)
+    except RequestException as e:
+        logger.error(f"请求失败，最后一次错误: {e}")
+        raise ValueError(f"网络异常，生成失败: {e}")
 
-    raise ValueError("文章生成失败，所有重试均未成功")
\ No newline at end of file
+    content = parse_response(response_json(response))
+    if not content:
+        logger.error("AI 返回内容为空或格式不正确")
+        raise ValueError("AI 返回内容为空或格式不正确")
+    logger.info("文章生成成功")
+    return strip_markdown(content)
@@ -3,9 +3,18 @@ import time
 import logging
 from typing import List
 
+from util.Metrics import METRICS
+from util.RetryPolicy import RetryPolicy
+from util.Tracing import traced
+
 
 logger = logging.getLogger(__name__)
 
+# 七牛云上传地址
+UPLOAD_URL = "https://up.qiniup.com/"
+# 单次上传请求的超时（秒）
+UPLOAD_TIMEOUT = 30
+
 
 def build_upload_key(snowFlakeId: str, userId: str) -> str:
     """
@@ -28,6 +37,7 @@ def build_upload_key(snowFlakeId: str, userId: str) -> str:
     )
 
 
+@traced()
 def upload_image(
     url: str,
     headers: dict,
@@ -40,7 +50,7 @@ def upload_image(
     """
     上传单张图片并处理错误。
 
-    上传图片到服务器，并返回成功上传的图片标识符。如果上传失败，函数将重试指定的次数，每次重试之间会有指数增长的延迟。
+    上传图片到服务器，并返回成功上传的图片标识符。如果上传失败，函数将按 RetryPolicy 重试指定的次数，每次重试之间会有带抖动的指数退避。
 
     Args:
         url (str): 上传图片的目标URL。
@@ -49,7 +59,7 @@ def upload_image(
         token (str): 用于身份验证的令牌。
         key (str): 上传图片的唯一标识符。
         max_retries (int): 最大重试次数，默认为3次。
-        retry_delay (int): 初始重试延迟时间（秒），默认为5秒。每次重试时，延迟时间会指数增长。
+        retry_delay (int): 退避基数（秒），默认为5秒。每次重试时，延迟时间上限会指数增长。
 
     Returns:
         str: 成功上传的图片标识符（去除前缀 "upload/"）。如果上传失败且达到最大重试次数，则抛出 ValueError 异常。
@@ -65,30 +75,35 @@ def upload_image(
 
     files = {"file": (key, image_data, "application/octet-stream")}
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, files=files, data=data)
+    policy = RetryPolicy(
+        max_attempts=max_retries, base_delay=retry_delay, timeout=UPLOAD_TIMEOUT
+    )
+
+    def send(timeout: float) -> requests.Response:
+        with METRICS.timer("upload_duration_seconds"):
+            response = requests.post(
+                url, headers=headers, files=files, data=data, timeout=timeout
+            )
             response.raise_for_status()  # 如果响应状态不是200，将引发HTTPError异常
+        return response
+
+    def on_retry(attempt: int, error: Exception, delay: float) -> None:
+        logger.error(f"上传失败 (尝试 {attempt}/{max_retries}): {str(error)}")
+        logger.info(f"等待 {delay:.2f} 秒后重试...")
+
+    try:
+        response = policy.call(send, on_retry)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"上传失败，已达到最大重试次数 {max_retries}: {str(e)}")
+        raise ValueError(f"上传失败，已达到最大重试次数 {max_retries}")
 
-            # 解析响应中的 key
-            response_data = response.json()
-            if "key" in response_data:
-                return response_data["key"].replace("upload/", "")
-            else:
-                logger.warning("上传成功，但响应中没有key字段")
-                return ""
-        except requests.exceptions.RequestException as e:
-            logger.error(f"上传失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
-            if attempt < max_retries - 1:
-                # 指数回退，重试前等待一段时间
-                wait_time = retry_delay * (
-                    2**attempt
-                )  # 每次重试时延长等待时间（指数回退）
-                logger.info(f"等待 {wait_time} 秒后重试...")
-                time.sleep(wait_time)
-            else:
-                logger.error(f"上传失败，已达到最大重试次数 {max_retries}")
-                raise ValueError(f"上传失败，已达到最大重试次数 {max_retries}")
+    # 解析响应中的 key
+    response_data = response.json()
+    if "key" in response_data:
+        return response_data["key"].replace("upload/", "")
+    else:
+        logger.warning("上传成功，但响应中没有key字段")
+        return ""
 
 
 def upload(
@@ -111,7 +126,7 @@ def upload(
     Returns:
         str: 成功上传的图片链接，用逗号分隔。
     """
-    url = "https://up.qiniup.com/"
+    url = UPLOAD_URL
     headers = {
         "host": "up.qiniup.com",
         "accept-encoding": "gzip",
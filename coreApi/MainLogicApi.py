@@ -1,17 +1,33 @@
-import json
+import concurrent.futures
 import logging
-import re
 import time
 import uuid
 import random
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 import requests
 
 from util.Config import ConfigManager
 from util.CryptoUtils import create_sign, aes_encrypt, aes_decrypt
-from util.CaptchaUtils import recognize_blockPuzzle_captcha, recognize_clickWord_captcha
-from util.HelperFunctions import get_current_month_info
+from util.HelperFunctions import get_current_month_info, get_today_info
+from util.JsonCodec import dumps, loads, response_json
+from util.Concurrency import API_BREAKER, API_CONCURRENCY, API_SLOTS, CAPTCHA_SLOTS
+from util.Metrics import METRICS
+from util.RetryPolicy import (
+    RETRYABLE_STATUS,
+    RetryPolicy,
+    current_deadline,
+    deadline,
+    policy_for,
+)
+from util.RunStats import (
+    collect_stats,
+    current_stats,
+    record_captcha_attempt,
+    record_retry,
+)
+from util.Tracing import span, traced
 
 # 常量
 BASE_URL = "https://api.moguding.net:9000/"
@@ -21,10 +37,165 @@ HEADERS = {
     "accept-encoding": "gzip",
     "host": "api.moguding.net:9000",
 }
+# 查询实习计划时的每页条数（只使用第一个计划）
+PLAN_PAGE_SIZE = 10
+
+# 报告提交请求体骨架，每次提交只需覆盖变化的字段；{**TEMPLATE} 只是浅拷贝，骨架中只放不可变的值，
+# 列表等可变的值（fieldEntityList）在每次提交时新建
+REPORT_PAYLOAD_TEMPLATE = {
+    "address": None,
+    "applyId": None,
+    "applyName": None,
+    "attachmentList": None,
+    "commentNum": None,
+    "commentContent": None,
+    "content": None,
+    "createBy": None,
+    "createTime": None,
+    "depName": None,
+    "reject": None,
+    "endTime": None,
+    "headImg": None,
+    "yearmonth": None,
+    "imageList": None,
+    "isFine": None,
+    "latitude": None,
+    "gpmsSchoolYear": None,
+    "longitude": None,
+    "planId": None,
+    "planName": None,
+    "reportId": None,
+    "reportType": None,
+    "reportTime": None,
+    "isOnTime": None,
+    "schoolId": None,
+    "startTime": None,
+    "state": None,
+    "studentId": None,
+    "studentNumber": None,
+    "supportNum": None,
+    "title": None,
+    "url": None,
+    "username": None,
+    "weeks": None,
+    "videoUrl": None,
+    "videoTitle": None,
+    "attachments": None,
+    "companyName": None,
+    "jobName": None,
+    "jobId": None,
+    "score": None,
+    "tpJobId": None,
+    "starNum": None,
+    "confirmDays": None,
+    "isApply": None,
+    "compStarNum": None,
+    "compScore": None,
+    "compComment": None,
+    "compState": None,
+    "apply": None,
+    "levelEntity": None,
+    "formFieldDtoList": None,
+    "fieldEntityList": None,
+    "feedback": None,
+    "handleWay": None,
+    "isWarning": 0,
+    "warningType": None,
+    "t": None,
+}
+
+# 打卡请求体骨架，每次提交只需覆盖变化的字段；与报告骨架一样只放不可变的值
+CLOCK_IN_PAYLOAD_TEMPLATE = {
+    "distance": None,
+    "content": None,
+    "lastAddress": None,
+    "lastDetailAddress": None,
+    "attendanceId": None,
+    "country": "中国",
+    "createBy": None,
+    "createTime": None,
+    "description": None,
+    "device": None,
+    "images": None,
+    "isDeleted": None,
+    "isReplace": None,
+    "modifiedBy": None,
+    "modifiedTime": None,
+    "schoolId": None,
+    "state": "NORMAL",
+    "teacherId": None,
+    "teacherNumber": None,
+    "type": None,
+    "stuId": None,
+    "planId": None,
+    "attendanceType": None,
+    "username": None,
+    "attachments": None,
+    "userId": None,
+    "isSYN": None,
+    "studentId": None,
+    "applyState": None,
+    "studentNumber": None,
+    "memberNumber": None,
+    "headImg": None,
+    "attendenceTime": None,
+    "depName": None,
+    "majorName": None,
+    "className": None,
+    "logDtoList": None,
+    "isBeyondFence": None,
+    "practiceAddress": None,
+    "tpJobId": None,
+    "t": None,
+}
 
 logger = logging.getLogger(__name__)
 
 
+def _record_request(endpoint: str, outcome: str, start: float) -> None:
+    """记录一次工学云接口请求的结果和耗时。"""
+    METRICS.observe(
+        "moguding_request_duration_seconds",
+        time.perf_counter() - start,
+        endpoint=endpoint,
+        outcome=outcome,
+    )
+    METRICS.inc("moguding_requests_total", endpoint=endpoint, outcome=outcome)
+
+
+def _is_overloaded(error: requests.RequestException) -> bool:
+    """网络错误、超时以及 429/5xx 视为服务端过载信号，其余 HTTP 错误不是。"""
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code in RETRYABLE_STATUS
+    return True
+
+
+def _record_health(start: float, overloaded: bool) -> None:
+    """把请求结果反馈给跨账号的并发控制和熔断器（在仍持有 API_SLOTS 名额时调用）。"""
+    API_CONCURRENCY.record(time.perf_counter() - start, overloaded)
+    API_BREAKER.record(overloaded)
+
+
+def _classify_response(rsp: Dict[str, Any]) -> str:
+    """
+    根据工学云接口的响应体判断请求结果。
+
+    Returns:
+        str: success、captcha_required（触发行为验证码）、captcha_rejected（验证码校验失败）、
+            token_expired 或 business_error。
+    """
+    code = rsp.get("code")
+    msg = rsp.get("msg", "未知错误")
+    if code == 200:
+        return "captcha_required" if msg == "302" else "success"
+    if code == 6111:
+        return "captcha_rejected"
+    if "token失效" in msg:
+        return "token_expired"
+    return "business_error"
+
+
 class ApiClient:
     """
     ApiClient类用于与远程服务器进行交互，包括用户登录、获取实习计划、获取打卡信息、提交打卡等功能。
@@ -32,7 +203,10 @@ class ApiClient:
 
     Attributes:
         config (ConfigManager): 用于管理配置的实例。
-        max_retries (int): 控制请求失败后重新尝试的次数，默认值为1。
+        max_relogins (int): 单次请求中Token失效后重新登录的次数上限，默认值为1。
+        session (requests.Session): 该账号专用的 HTTP 会话，复用 TCP/TLS 连接。
+        write_guard (Optional[Callable[[], None]]): 提交打卡/报告时，每次发出请求前（已取得 API_SLOTS 名额、
+            熔断等待之后）调用的校验函数，抛出异常时放弃提交。
     """
 
     def __init__(self, config: ConfigManager):
@@ -43,76 +217,210 @@ class ApiClient:
             config (ConfigManager): 用于管理配置的实例。
         """
         self.config = config
-        self.max_retries = 5  # 控制重新尝试的次数
+        self.max_relogins = 1  # Token失效后重新登录的次数
+        self.session = requests.Session()
+        self.write_guard: Optional[Callable[[], None]] = None
 
     def _post_request(
         self,
         url: str,
         headers: Dict[str, str],
         data: Dict[str, Any],
-        retry_count: int = 0,
+        policy: Optional[RetryPolicy] = None,
+        guard: Optional[Callable[[], None]] = None,
     ) -> Dict[str, Any]:
         """
         发送POST请求，并处理请求过程中可能发生的错误。
-        包括自动重试机制和Token失效处理。
+        按重试策略处理网络错误和服务端错误，Token失效时重新登录一次后重发。
+        所有账号的请求共享 API_SLOTS 名额，耗时和结果反馈给 API_CONCURRENCY / API_BREAKER 调整名额，
+        熔断期间等待恢复后再发出。
 
         Args:
             url (str): 请求的API地址（不包括BASE_URL部分）。
             headers (Dict[str, str]): 请求头信息，包括授权信息。
             data (Dict[str, Any]): POST请求的数据。
-            msg (str, optional): 如果请求失败，输出的错误信息前缀，默认为'请求失败'。
-            retry_count (int, optional): 当前请求的重试次数，默认为0。
+            policy (Optional[RetryPolicy]): 重试策略，默认按接口从 policy_for 获取。
+            guard (Optional[Callable[[], None]]): 每次发出请求前调用（在等待名额和熔断之后），抛出的异常
+                直接向上传递，不发出请求。
 
         Returns:
             Dict[str, Any]: 如果请求成功，返回响应的JSON数据。
 
         Raises:
-            ValueError: 如果请求失败或响应包含错误信息，则抛出包含详细错误信息的异常。
+            ValueError: 如果请求失败或响应包含错误信息，则抛出包含详细错误信息的异常；
+                超出账号时间预算时抛出 DeadlineExceeded。
         """
-        try:
-            response = requests.post(
-                f"{BASE_URL}{url}", headers=headers, json=data, timeout=10
-            )
-            response.raise_for_status()
-            rsp = response.json()
+        endpoint = url.lstrip("/")
+        policy = policy or policy_for(endpoint)
+        attempt = 0
+        relogins = 0
+        while True:
+            pause = API_BREAKER.retry_after()
+            if pause > 0:
+                policy.wait(pause)
+                continue
+            try:
+                with API_SLOTS.slot():
+                    if guard is not None:
+                        guard()
+                    start = time.perf_counter()
+                    try:
+                        with span(endpoint):
+                            response = self.session.post(
+                                f"{BASE_URL}{url}",
+                                headers=headers,
+                                data=dumps(data),
+                                timeout=policy.request_timeout(),
+                            )
+                            response.raise_for_status()
+                            rsp = response_json(response)
+                    except requests.RequestException as e:
+                        _record_health(start, _is_overloaded(e))
+                        raise
+                    _record_health(start, False)
+            except requests.RequestException as e:
+                _record_request(endpoint, "network_error", start)
+                attempt += 1
+                if attempt >= policy.max_attempts or not policy.is_retryable(e):
+                    raise ValueError(str(e)) from e
+                reason = "server" if isinstance(e, requests.HTTPError) else "network"
+                METRICS.inc(
+                    "moguding_request_retries_total", endpoint=endpoint, reason=reason
+                )
+                record_retry()
+                delay = policy.backoff(attempt - 1)
+                logger.warning(
+                    f"{endpoint} 请求失败（{e.__class__.__name__}），"
+                    f"重试 {attempt}/{policy.max_attempts - 1}，等待 {delay:.2f} 秒"
+                )
+                policy.wait(delay)
+                continue
+
+            outcome = _classify_response(rsp)
+            _record_request(endpoint, outcome, start)
 
-            if rsp.get("code") == 200 and rsp.get("msg", "未知错误") == "302":
+            if outcome == "captcha_required":
                 raise ValueError("打卡失败，触发行为验证码")
 
-            if rsp.get("code") == 200 or rsp.get("code") == 6111:
+            if outcome in ("success", "captcha_rejected"):
                 return rsp
 
-            if (
-                "token失效" in rsp.get("msg", "未知错误")
-                and retry_count < self.max_retries
-            ):
-                wait_time = 1 * (2**retry_count)
-                time.sleep(wait_time)
+            if outcome == "token_expired" and relogins < self.max_relogins:
+                relogins += 1
+                METRICS.inc("moguding_relogin_total", endpoint=endpoint)
+                METRICS.inc(
+                    "moguding_request_retries_total", endpoint=endpoint, reason="token"
+                )
+                record_retry()
                 logger.warning("Token失效，正在重新登录...")
                 self.login()
                 headers["authorization"] = self.config.get_value("userInfo.token")
-                return self._post_request(url, headers, data, retry_count + 1)
-            else:
-                raise ValueError(rsp.get("msg", "未知错误"))
+                continue
 
-        except (requests.RequestException, ValueError) as e:
-            if re.search(r"[\u4e00-\u9fff]", str(e)) or retry_count >= self.max_retries:
-                raise ValueError(f"{str(e)}")
+            raise ValueError(rsp.get("msg", "未知错误"))
 
-            wait_time = 1 * (2**retry_count)
-            logger.warning(
-                f"重试 {retry_count + 1}/{self.max_retries}，等待 {wait_time:.2f} 秒"
-            )
-            time.sleep(wait_time)
+    def _block_puzzle_attempt(
+        self, allow_refetch: bool, cancelled: Optional[threading.Event] = None
+    ) -> Tuple[Optional[str], bool]:
+        """
+        获取、识别并校验一次滑块验证码。
 
-        return self._post_request(url, headers, data, retry_count + 1)
+        Args:
+            allow_refetch (bool): 识别置信度过低时是否放弃本次校验（之后还有机会再试时才应放弃）。
+            cancelled (Optional[threading.Event]): 并行尝试中已有结果被采用时置位，之后不再获取验证码、
+                不再提交 /check，也不再写入或删除验证码缓存。
+
+        Returns:
+            Tuple[Optional[str], bool]: (验证参数, 是否因置信度过低而放弃校验)。通过时验证参数非空；
+                未通过、放弃校验或已取消时为 None，其中只有放弃校验时第二项为 True（无需等待即可换一张）。
+        """
+        if cancelled is not None and cancelled.is_set():
+            return None, False
+        captcha_url = "session/captcha/v1/get"
+        request_data = {
+            "clientUid": str(uuid.uuid4()).replace("-", ""),
+            "captchaType": "blockPuzzle",
+        }
+        captcha_info = self._post_request(
+            captcha_url,
+            HEADERS,
+            request_data,
+        )
+        # 识别模块依赖 cv2/numpy，只在真正需要验证码时才导入
+        from util.CaptchaUtils import (
+            captcha_confident,
+            discard_captcha_solution,
+            record_captcha_result,
+            recognize_blockPuzzle_captcha,
+        )
+
+        with METRICS.timer(
+            "captcha_solve_duration_seconds", captcha_type="blockPuzzle"
+        ):
+            slider_data = recognize_blockPuzzle_captcha(
+                captcha_info["data"]["jigsawImageBase64"],
+                captcha_info["data"]["originalImageBase64"],
+            )
+        record_captcha_attempt()
+        # 识别结果不可靠时直接换一张，省去一次注定失败的校验和随后的等待（最后一次仍然提交）
+        if allow_refetch and not captcha_confident():
+            discard_captcha_solution()
+            METRICS.inc(
+                "captcha_attempts_total", captcha_type="blockPuzzle", result="refetch"
+            )
+            logger.info("滑块匹配置信度过低，重新获取验证码")
+            return None, True
+        if cancelled is not None and cancelled.is_set():
+            discard_captcha_solution()
+            return None, False
+        check_slider_url = "session/captcha/v1/check"
+        check_slider_data = {
+            "pointJson": aes_encrypt(
+                slider_data, captcha_info["data"]["secretKey"], "b64"
+            ),
+            "token": captcha_info["data"]["token"],
+            "captchaType": "blockPuzzle",
+        }
+        check_result = self._post_request(
+            check_slider_url,
+            HEADERS,
+            check_slider_data,
+        )
+        passed = check_result.get("code") != 6111
+        if cancelled is not None and cancelled.is_set():
+            discard_captcha_solution()
+            return None, False
+        record_captcha_result(passed)
+        METRICS.inc(
+            "captcha_attempts_total",
+            captcha_type="blockPuzzle",
+            result="pass" if passed else "fail",
+        )
+        if not passed:
+            return None, False
+        return (
+            aes_encrypt(
+                captcha_info["data"]["token"] + "---" + slider_data,
+                captcha_info["data"]["secretKey"],
+                "b64",
+            ),
+            False,
+        )
 
-    def pass_blockPuzzle_captcha(self, max_attempts: int = 5) -> str:
+    @traced()
+    def pass_blockPuzzle_captcha(
+        self, max_attempts: int = 5, parallel: Optional[int] = None
+    ) -> str:
         """
         通过行为验证码（验证码类型为blockPuzzle）。
 
+        parallel 大于 1 时每轮同时获取并识别多张验证码，采用第一张通过校验的，其余结果丢弃。
+        额外的并行尝试需要占用全局的 CAPTCHA_SLOTS 名额，名额不足时退化为逐张尝试。
+        一轮的尝试都因置信度过低而放弃校验时立即换一张，只有校验未通过后才等待 1-3 秒。
+
         Args:
             max_attempts (Optional[int]): 最大尝试次数，默认为5次。
+            parallel (Optional[int]): 每轮并行尝试的验证码数，默认取配置 config.captchaParallel，未配置时为 1。
 
         Returns:
             str: 验证参数。
@@ -120,45 +428,90 @@ class ApiClient:
         Raises:
             Exception: 当达到最大尝试次数时抛出异常。
         """
+        if parallel is None:
+            parallel = int(self.config.get_value("config.captchaParallel") or 1)
         attempts = 0
         while attempts < max_attempts:
-            captcha_url = "session/captcha/v1/get"
-            request_data = {
-                "clientUid": str(uuid.uuid4()).replace("-", ""),
-                "captchaType": "blockPuzzle",
-            }
-            captcha_info = self._post_request(
-                captcha_url,
-                HEADERS,
-                request_data,
-            )
-            slider_data = recognize_blockPuzzle_captcha(
-                captcha_info["data"]["jigsawImageBase64"],
-                captcha_info["data"]["originalImageBase64"],
-            )
-            check_slider_url = "session/captcha/v1/check"
-            check_slider_data = {
-                "pointJson": aes_encrypt(
-                    slider_data, captcha_info["data"]["secretKey"], "b64"
-                ),
-                "token": captcha_info["data"]["token"],
-                "captchaType": "blockPuzzle",
-            }
-            check_result = self._post_request(
-                check_slider_url,
-                HEADERS,
-                check_slider_data,
-            )
-            if check_result.get("code") != 6111:
-                return aes_encrypt(
-                    captcha_info["data"]["token"] + "---" + slider_data,
-                    captcha_info["data"]["secretKey"],
-                    "b64",
-                )
-            attempts += 1
-            time.sleep(random.uniform(1, 3))
+            remaining = max_attempts - attempts
+            extra = 0
+            while extra < min(parallel, remaining) - 1 and CAPTCHA_SLOTS.try_acquire():
+                extra += 1
+            # 本轮之后还有尝试机会时，低置信度的结果可以直接放弃
+            allow_refetch = remaining > extra + 1
+            if extra:
+                result, refetched = self._speculative_attempts(extra, allow_refetch)
+            else:
+                result, refetched = self._block_puzzle_attempt(allow_refetch)
+            if result:
+                return result
+            attempts += extra + 1
+            if attempts < max_attempts and not refetched:
+                time.sleep(random.uniform(1, 3))
         raise Exception("通过滑块验证码失败")
 
+    def _speculative_attempts(
+        self, extra: int, allow_refetch: bool
+    ) -> Tuple[Optional[str], bool]:
+        """
+        当前线程与 extra 个临时线程同时尝试滑块验证码，返回第一个通过的验证参数，以及没有通过时
+        是否所有尝试都只是放弃了低置信度的结果（与 _block_puzzle_attempt 的返回值相同）。
+
+        调用方已为 extra 个额外尝试占用了 CAPTCHA_SLOTS 名额，每个额外尝试结束时归还。
+        返回前置位取消标志并取消尚未开始的尝试：仍在进行的尝试不再提交 /check，也不再改动验证码缓存，
+        只是已发出的请求不能撤回，因此在置位前已经进入 /check 的尝试仍会消耗一张验证码。
+        """
+        budget = current_deadline()
+        seconds = budget.remaining() if budget is not None else None
+        stats = current_stats()
+        cancelled = threading.Event()
+
+        def speculative() -> Tuple[Optional[str], bool]:
+            try:
+                # 时间预算和执行统计是线程内的，需要带到临时线程中
+                with deadline(seconds), collect_stats(stats):
+                    return self._block_puzzle_attempt(allow_refetch, cancelled)
+            finally:
+                CAPTCHA_SLOTS.release()
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=extra)
+        futures: List[concurrent.futures.Future] = []
+        try:
+            futures.extend(executor.submit(speculative) for _ in range(extra))
+            own_error: Optional[Exception] = None
+            all_refetched = True
+            try:
+                result, refetched = self._block_puzzle_attempt(allow_refetch, cancelled)
+                if result:
+                    METRICS.inc("captcha_speculative_total", result="primary")
+                    return result, False
+                all_refetched = refetched
+            except Exception as e:
+                own_error = e
+                all_refetched = False
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    result, refetched = future.result()
+                except Exception as e:
+                    logger.warning(f"并行识别验证码失败: {e}")
+                    all_refetched = False
+                    continue
+                if result:
+                    METRICS.inc("captcha_speculative_total", result="speculative")
+                    return result, False
+                all_refetched = all_refetched and refetched
+            if own_error is not None:
+                raise own_error
+            METRICS.inc("captcha_speculative_total", result="none")
+            return None, all_refetched
+        finally:
+            cancelled.set()
+            for future in futures:
+                # 未开始就被取消的尝试不会执行 speculative()，由这里归还名额
+                if future.cancel():
+                    CAPTCHA_SLOTS.release()
+            executor.shutdown(wait=False)
+
+    @traced()
     def solve_click_word_captcha(self, max_retries: int = 5) -> str:
         retry_count = 0
         while retry_count < max_retries:
@@ -177,12 +530,33 @@ class ApiClient:
                 captcha_request_payload,
             )
 
-            # 解析验证码图片数据
-            captcha_solution = recognize_clickWord_captcha(
-                captcha_response["data"]["originalImageBase64"],
-                captcha_response["data"]["wordList"],
+            # 解析验证码图片数据（识别模块依赖 cv2/numpy/onnxruntime，按需导入）
+            from util.CaptchaUtils import (
+                captcha_confident,
+                discard_captcha_solution,
+                record_captcha_result,
+                recognize_clickWord_captcha,
             )
 
+            with METRICS.timer(
+                "captcha_solve_duration_seconds", captcha_type="clickWord"
+            ):
+                captcha_solution = recognize_clickWord_captcha(
+                    captcha_response["data"]["originalImageBase64"],
+                    captcha_response["data"]["wordList"],
+                )
+            record_captcha_attempt()
+
+            # 有文字没有识别出来时必然校验失败，直接换一张（最后一次仍然提交）
+            if retry_count + 1 < max_retries and not captcha_confident():
+                discard_captcha_solution()
+                METRICS.inc(
+                    "captcha_attempts_total", captcha_type="clickWord", result="refetch"
+                )
+                logger.info("点选验证码有文字未识别，重新获取验证码")
+                retry_count += 1
+                continue
+
             # 验证验证码的接口地址
             verification_endpoint = "/attendence/clock/v1/check"
             verification_payload = {
@@ -201,7 +575,14 @@ class ApiClient:
             )
 
             # 如果验证码验证成功，则返回加密结果
-            if verification_response.get("code") != 6111:  # 6111 表示验证码验证失败
+            passed = verification_response.get("code") != 6111  # 6111 表示验证码验证失败
+            record_captcha_result(passed)
+            METRICS.inc(
+                "captcha_attempts_total",
+                captcha_type="clickWord",
+                result="pass" if passed else "fail",
+            )
+            if passed:
                 encrypted_result = aes_encrypt(
                     captcha_response["data"]["token"] + "---" + captcha_solution,
                     captcha_response["data"]["secretKey"],
@@ -217,6 +598,7 @@ class ApiClient:
         # 超过最大重试次数，抛出异常
         raise Exception("通过点选验证码失败")
 
+    @traced()
     def login(self) -> None:
         """
         执行用户登录操作，获取新的用户信息并更新配置。
@@ -238,20 +620,29 @@ class ApiClient:
             "t": aes_encrypt(str(int(time.time() * 1000))),
         }
         rsp = self._post_request(url, HEADERS, data)
-        user_info = json.loads(aes_decrypt(rsp.get("data", "")))
+        user_info = loads(aes_decrypt(rsp.get("data", "")))
         self.config.update_config(user_info, "userInfo")
 
-    def fetch_internship_plan(self) -> None:
+    @traced()
+    def fetch_internship_plan(self, page_size: int = PLAN_PAGE_SIZE) -> None:
         """
         获取当前用户的实习计划并更新配置中的planInfo。
 
-        该方法会发送请求获取当前用户的实习计划列表，并将结果更新到配置管理器中。
+        该方法会发送请求获取当前用户的实习计划列表，并将第一个计划更新到配置管理器中。
+        只需要第一个计划，因此只请求第一页（page_size 条），不再一次拉取全部计划。
+
+        Args:
+            page_size (int): 每页条数，默认 PLAN_PAGE_SIZE。
 
         Raises:
             ValueError: 如果获取实习计划失败，抛出包含详细错误信息的异常。
         """
         url = "practice/plan/v3/getPlanByStu"
-        data = {"pageSize": 999999, "t": aes_encrypt(str(int(time.time() * 1000)))}
+        data = {
+            "currPage": 1,
+            "pageSize": page_size,
+            "t": aes_encrypt(str(int(time.time() * 1000))),
+        }
         headers = self._get_authenticated_headers(
             sign_data=[
                 self.config.get_value("userInfo.userId"),
@@ -262,6 +653,7 @@ class ApiClient:
         plan_info = rsp.get("data", [{}])[0]
         self.config.update_config(plan_info, "planInfo")
 
+    @traced()
     def get_job_info(self) -> Dict[str, Any]:
         """
         获取用户的工作ID。
@@ -280,27 +672,32 @@ class ApiClient:
             "t": aes_encrypt(str(int(time.time() * 1000))),
         }
         headers = self._get_authenticated_headers()
-        rsp = self._post_request(url, headers, data, retry_count=3)
+        rsp = self._post_request(url, headers, data)
         data = rsp.get("data", {})
         return {} if data is None else data
 
-    def get_submitted_reports_info(self, report_type: str) -> Dict[str, Any]:
+    @traced()
+    def get_submitted_reports_info(
+        self, report_type: str, page: int = 1, page_size: int = 10
+    ) -> Dict[str, Any]:
         """
-        获取已经提交的日报、周报或月报的数量。
+        获取已经提交的日报、周报或月报（按提交时间倒序分页）及其数量。
 
         Args:
             report_type (str): 报告类型，可选值为 "day"（日报）、"week"（周报）或 "month"（月报）。
+            page (int): 页码，从 1 开始。
+            page_size (int): 每页条数。
 
         Returns:
-            Dict[str, Any]: 已经提交的报告数量。
+            Dict[str, Any]: data 为该页的报告，flag 为已经提交的报告数量。
 
         Raises:
             ValueError: 如果获取数量失败，抛出包含详细错误信息的异常。
         """
         url = "practice/paper/v2/listByStu"
         data = {
-            "currPage": 1,
-            "pageSize": 10,
+            "currPage": page,
+            "pageSize": page_size,
             "reportType": report_type,
             "planId": self.config.get_value("planInfo.planId"),
             "t": aes_encrypt(str(int(time.time() * 1000))),
@@ -315,6 +712,7 @@ class ApiClient:
         rsp = self._post_request(url, headers, data)
         return rsp
 
+    @traced()
     def submit_report(self, report_info: Dict[str, Any]) -> None:
         """
         提交报告。
@@ -338,68 +736,25 @@ class ApiClient:
             ]
         )
         data = {
-            "address": None,
-            "applyId": None,
-            "applyName": None,
-            "attachmentList": None,
-            "commentNum": None,
-            "commentContent": None,
+            **REPORT_PAYLOAD_TEMPLATE,
             "content": report_info.get("content"),
-            "createBy": None,
-            "createTime": None,
-            "depName": None,
-            "reject": None,
             "endTime": report_info.get("endTime", None),
-            "headImg": None,
             "yearmonth": report_info.get("yearmonth", None),
-            "imageList": None,
-            "isFine": None,
-            "latitude": None,
-            "gpmsSchoolYear": None,
-            "longitude": None,
             "planId": self.config.get_value("planInfo.planId"),
-            "planName": None,
-            "reportId": None,
             "reportType": report_info.get("reportType"),
             "reportTime": report_info.get("reportTime", None),
-            "isOnTime": None,
-            "schoolId": None,
             "startTime": report_info.get("startTime", None),
-            "state": None,
-            "studentId": None,
-            "studentNumber": None,
-            "supportNum": None,
             "title": report_info.get("title"),
-            "url": None,
-            "username": None,
             "weeks": report_info.get("weeks", None),
-            "videoUrl": None,
-            "videoTitle": None,
             "attachments": report_info.get("attachments", ""),
-            "companyName": None,
-            "jobName": None,
             "jobId": report_info.get("jobId", ""),
-            "score": None,
-            "tpJobId": None,
-            "starNum": None,
-            "confirmDays": None,
-            "isApply": None,
-            "compStarNum": None,
-            "compScore": None,
-            "compComment": None,
-            "compState": None,
-            "apply": None,
-            "levelEntity": None,
             "formFieldDtoList": report_info.get("formFieldDtoList", []),
             "fieldEntityList": [],
-            "feedback": None,
-            "handleWay": None,
-            "isWarning": 0,
-            "warningType": None,
             "t": aes_encrypt(str(int(time.time() * 1000))),
         }
-        self._post_request(url, headers, data)
+        self._post_request(url, headers, data, guard=self.write_guard)
 
+    @traced()
     def get_weeks_date(self) -> list[Dict[str, Any]]:
         """
         获取本周周报周期信息。
@@ -413,6 +768,7 @@ class ApiClient:
         rsp = self._post_request(url, headers, data)
         return rsp.get("data", [])
 
+    @traced()
     def get_from_info(self, formType: int) -> list[Dict[str, Any]]:
         """
         获取子表单（问卷），并设置值
@@ -437,14 +793,19 @@ class ApiClient:
 
         return formFieldDtoList
 
-    def get_checkin_info(self) -> Dict[str, Any]:
+    @traced()
+    def get_checkin_info(self, today_only: bool = False) -> Dict[str, Any]:
         """
-        获取用户的打卡信息。
+        获取用户最近一次的打卡信息。
 
-        该方法会发送请求获取当前用户当月的打卡记录。
+        该方法会发送请求获取当前用户当月（today_only 时只查今天）的打卡记录，返回最新的一条。
+        只查今天时响应只有当天的一两条记录，而整月查询到月末有数十条。
+
+        Args:
+            today_only (bool): 是否只查询今天的打卡记录，默认查询整月。
 
         Returns:
-            包含用户打卡信息的字典。
+            包含用户打卡信息的字典，查询范围内没有打卡记录时为空字典。
 
         Raises:
             ValueError: 如果获取打卡信息失败，抛出包含详细错误信息的异常。
@@ -454,13 +815,14 @@ class ApiClient:
             url = "attendence/clock/teacher/v1/listSynchro"
         headers = self._get_authenticated_headers()
         data = {
-            **get_current_month_info(),
+            **(get_today_info() if today_only else get_current_month_info()),
             "t": aes_encrypt(str(int(time.time() * 1000))),
         }
         rsp = self._post_request(url, headers, data)
-        # 每月第一天的第一次打卡返回的是空，所以特殊处理返回空字典
+        # 查询范围内没有打卡记录（例如每月第一天的第一次打卡）时返回的是空，所以特殊处理返回空字典
         return rsp.get("data", [{}])[0] if rsp.get("data") else {}
 
+    @traced()
     def submit_clock_in(self, checkin_info: Dict[str, Any]) -> None:
         """
         提交打卡信息。
@@ -490,46 +852,15 @@ class ApiClient:
         logger.info(f'打卡类型：{checkin_info.get("type")}')
 
         data = {
-            "distance": None,
-            "content": None,
-            "lastAddress": None,
+            **CLOCK_IN_PAYLOAD_TEMPLATE,
             "lastDetailAddress": checkin_info.get("lastDetailAddress"),
-            "attendanceId": None,
-            "country": "中国",
-            "createBy": None,
             "createTime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
             "description": checkin_info.get("description", None),
             "device": self.config.get_value("config.device"),
-            "images": None,
-            "isDeleted": None,
-            "isReplace": None,
-            "modifiedBy": None,
-            "modifiedTime": None,
-            "schoolId": None,
-            "state": "NORMAL",
-            "teacherId": None,
-            "teacherNumber": None,
             "type": checkin_info.get("type"),
-            "stuId": None,
             "planId": planId,
-            "attendanceType": None,
-            "username": None,
             "attachments": checkin_info.get("attachments", None),
             "userId": self.config.get_value("userInfo.userId"),
-            "isSYN": None,
-            "studentId": None,
-            "applyState": None,
-            "studentNumber": None,
-            "memberNumber": None,
-            "headImg": None,
-            "attendenceTime": None,
-            "depName": None,
-            "majorName": None,
-            "className": None,
-            "logDtoList": None,
-            "isBeyondFence": None,
-            "practiceAddress": None,
-            "tpJobId": None,
             "t": aes_encrypt(str(int(time.time() * 1000))),
         }
 
@@ -537,11 +868,12 @@ class ApiClient:
 
         headers = self._get_authenticated_headers(sign_data)
 
-        if self._post_request(url, headers, data).get("msg") == "302":
+        if self._post_request(url, headers, data, guard=self.write_guard).get("msg") == "302":
             logger.info("检测到行为验证码，正在通过···")
             data["captcha"] = self.solve_click_word_captcha()
-            self._post_request(url, headers, data)
+            self._post_request(url, headers, data, guard=self.write_guard)
 
+    @traced()
     def get_upload_token(self) -> str:
         """
         获取上传文件的认证令牌。
@@ -3,16 +3,44 @@ import os
 import json
 import argparse
 import random
+import re
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Type, TypeVar
 import concurrent.futures
+import itertools
+import socket
+import sqlite3
+import threading
 
 from coreApi.MainLogicApi import ApiClient
 from coreApi.AiServiceClient import generate_article
 from util.Config import ConfigManager
 from util.MessagePush import MessagePusher
-from util.HelperFunctions import desensitize_name, is_holiday
+from util.HelperFunctions import desensitize_name, desensitize_phone, is_holiday
 from util.FileUploader import upload_img
+from util.Metrics import METRICS, serve_metrics
+from util.Tracing import TRACER, span, traced
+from util.StartupProfile import print_startup_profile
+from util.Daemon import Daemon
+from util.WorkQueue import (
+    DEFAULT_LEASE_SECONDS,
+    LeaseLostError,
+    open_queue,
+    process_queue,
+)
+from util.Concurrency import ACCOUNT_SLOTS, CAPTCHA_SLOTS, run_bounded
+from util.RetryPolicy import deadline
+from util.RunLedger import RunLedger
+from util.ReportHistory import ReportHistory
+from util.PlanCache import DEFAULT_PLAN_TTL, PlanCache
+from util.CaptchaCache import DEFAULT_MAX_ENTRIES, configure_captcha_cache
+from util.SqliteStore import SqliteStore
+from util.RunLog import RunLog, compact_results
+from util.RunHistory import RunHistory
+from util.RunStats import RunStats, collect_stats, phase
+from util.AccountStore import AccountStore
+from util.ProcessMemory import format_memory, memory_usage
 
 logging.basicConfig(
     format="[%(asctime)s] %(name)s %(levelname)s: %(message)s",
@@ -22,56 +50,411 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 USER_DIR = os.path.join(os.path.dirname(__file__), "user")
+# 单个账号一次执行的时间预算（秒），超出后放弃剩余的请求和重试。
+# 需小于 GitHub 工作流的 timeout-minutes（10 分钟，其中安装依赖约占 1~2 分钟），否则作业先被终止，
+# 账号既没有推送也没有执行历史
+ACCOUNT_DEADLINE = 300
+# 本机执行时同时在执行或等待执行的账号数（也是线程数）上限；同时工作的账号数由 ACCOUNT_SLOTS 限制，退避等待的账号不占名额
+MAX_THREADS = 32
+# 本地执行台账路径，为空时不使用台账
+LEDGER_PATH = os.path.join(os.path.dirname(__file__), "data", "ledger.db")
+# 为 True 时忽略台账，总是向服务器确认是否已完成
+VERIFY_REMOTE = False
+
+# 已提交报告的本地镜像路径，为空时每次从服务器读取第一页
+REPORT_HISTORY_PATH = os.path.join(os.path.dirname(__file__), "data", "reports.db")
+# 实习计划缓存路径和有效期（秒），路径为空时每次运行都查询计划
+PLAN_CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "plans.db")
+PLAN_CACHE_TTL = DEFAULT_PLAN_TTL
+# 验证码解的本地缓存路径和条数上限，路径为空时每次都重新识别
+CAPTCHA_CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "captcha.db")
+CAPTCHA_CACHE_SIZE = DEFAULT_MAX_ENTRIES
+# 每个账号结束时追加精简结果的 JSON Lines 文件，为空时不写
+RUN_LOG_PATH: Optional[str] = None
+# 执行历史路径（每个账号每次执行的结果、耗时、重试和验证码尝试次数），为空时不记录
+RUN_HISTORY_PATH = os.path.join(os.path.dirname(__file__), "data", "history.db")
+# 多节点模式下每次入队的账号数
+ENQUEUE_BATCH_SIZE = 500
+# 解析环境变量 USER 时跳过 JSON 空白
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# 账号存储路径，为空时使用 user 目录的配置文件和环境变量 USER
+ACCOUNTS_DB_PATH: Optional[str] = None
+# 从账号存储选择账号的条件（见 AccountStore.select），due 为 True 时只选当前窗口尚未执行成功的账号
+ACCOUNT_FILTERS: Dict[str, Any] = {}
+
+S = TypeVar("S", bound=SqliteStore)
+_stores: Dict[Tuple[type, str], SqliteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(store_cls: Type[S], path: str) -> Optional[S]:
+    """按路径打开并缓存本地存储，path 为空或打开失败时返回 None。"""
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get((store_cls, path))
+        if store is None:
+            try:
+                store = _stores[(store_cls, path)] = store_cls(path)
+            except Exception as e:
+                logger.error(f"打开本地存储 {path} 失败: {e}")
+                return None
+        return store
+
+
+def get_ledger() -> Optional[RunLedger]:
+    """返回本地执行台账，LEDGER_PATH 为空或打开失败时返回 None。"""
+    return _get_store(RunLedger, LEDGER_PATH)
+
+
+def get_report_history() -> Optional[ReportHistory]:
+    """返回已提交报告的本地镜像，REPORT_HISTORY_PATH 为空或打开失败时返回 None。"""
+    return _get_store(ReportHistory, REPORT_HISTORY_PATH)
+
 
+def get_plan_cache() -> Optional[PlanCache]:
+    """返回实习计划缓存，PLAN_CACHE_PATH 为空或打开失败时返回 None。"""
+    cache = _get_store(PlanCache, PLAN_CACHE_PATH)
+    if cache is not None:
+        cache.ttl = PLAN_CACHE_TTL
+    return cache
 
-def perform_clock_in(api_client: ApiClient, config: ConfigManager) -> Dict[str, Any]:
+
+def get_account_store() -> Optional[AccountStore]:
+    """返回账号存储，ACCOUNTS_DB_PATH 为空或打开失败时返回 None。"""
+    return _get_store(AccountStore, ACCOUNTS_DB_PATH)
+
+
+def get_run_history() -> Optional[RunHistory]:
+    """返回执行历史，RUN_HISTORY_PATH 为空或打开失败时返回 None。"""
+    return _get_store(RunHistory, RUN_HISTORY_PATH)
+
+
+def flush_run_history() -> None:
+    """写入执行历史中尚在缓冲的记录。"""
+    history = get_run_history()
+    if history is not None:
+        history.flush()
+
+
+def _account_filters(selected_files: Optional[List[str]] = None) -> Dict[str, Any]:
+    """将 ACCOUNT_FILTERS 和 --file 转换为 AccountStore.select() 的条件。"""
+    filters = {k: v for k, v in ACCOUNT_FILTERS.items() if k != "due"}
+    if ACCOUNT_FILTERS.get("due"):
+        filters["due_window"] = current_window()
+    if selected_files:
+        filters["names"] = selected_files
+    return filters
+
+
+def mark_account_done(config: ConfigManager, results: List[Dict[str, Any]]) -> None:
+    """账号来自账号存储且本次没有失败的任务时，记录当前窗口已执行成功。"""
+    if config.store is None or config.account_id is None:
+        return
+    if any(result.get("status") == "fail" for result in results):
+        return
+    try:
+        config.store.mark_window(config.account_id, current_window())
+    except sqlite3.Error as e:
+        logger.error(f"更新账号存储失败: {e}")
+
+
+def _ledger_account(config: ConfigManager) -> Optional[str]:
+    phone = (config.get_value("config.user") or {}).get("phone")
+    return str(phone) if phone else None
+
+
+def ledger_done(config: ConfigManager, kind: str, period: str) -> bool:
     """
-    执行打卡操作。
+    本地台账中是否已记录该账号在该周期完成了 kind 任务；VERIFY_REMOTE 时总是返回 False。
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        kind (str): clock_in、day、week 或 month。
+        period (str): 周期标识，例如 2025-01-01-START、2025-01-01、2025-W01、2025-01。
+    """
+    if VERIFY_REMOTE:
+        return False
+    ledger, account = get_ledger(), _ledger_account(config)
+    if ledger is None or account is None:
+        return False
+    try:
+        return ledger.has(account, kind, period)
+    except Exception as e:
+        logger.warning(f"读取本地执行台账失败: {e}")
+        return False
+
+
+def ledger_record(config: ConfigManager, kind: str, period: str) -> None:
+    """在本地台账中记录一次已确认的完成（提交成功或服务器显示已完成），失败时只记录日志。"""
+    ledger, account = get_ledger(), _ledger_account(config)
+    if ledger is None or account is None:
+        return
+    try:
+        ledger.record(account, kind, period)
+    except Exception as e:
+        logger.warning(f"写入本地执行台账失败: {e}")
+
+
+def last_checkin_record(api_client: ApiClient, config: ConfigManager) -> Dict[str, Any]:
+    """
+    获取最近一次的打卡记录。
+
+    只查询今天的打卡记录；今天还没有打卡时使用本地缓存的上一次记录，本地也没有时才查询整月。
 
     Args:
         api_client (ApiClient): ApiClient 实例。
         config (ConfigManager): 配置管理器。
 
     Returns:
-        Dict[str, Any]: 执行结果。
+        Dict[str, Any]: 最近一次的打卡记录，没有时为空字典。
     """
+    ledger, account = get_ledger(), _ledger_account(config)
+    record = api_client.get_checkin_info(today_only=True)
+    if not record and ledger is not None and account is not None:
+        try:
+            record = ledger.last_checkin(account) or {}
+        except sqlite3.Error as e:
+            logger.warning(f"读取本地打卡记录失败: {e}")
+    if not record:
+        record = api_client.get_checkin_info()
+    if record:
+        cache_last_checkin(config, record)
+    return record
+
+
+def cache_last_checkin(config: ConfigManager, record: Dict[str, Any]) -> None:
+    """在本地缓存账号最近一次的打卡记录，失败时只记录日志。"""
+    ledger, account = get_ledger(), _ledger_account(config)
+    if ledger is None or account is None:
+        return
     try:
-        current_time = datetime.now()
-        current_hour = current_time.hour
+        ledger.set_last_checkin(account, record)
+    except sqlite3.Error as e:
+        logger.warning(f"写入本地打卡记录失败: {e}")
 
-        # 确定打卡类型
-        if current_hour < 12:
-            checkin_type = "START"
-            display_type = "上班"
-        else:
-            checkin_type = "END"
-            display_type = "下班"
 
-        # 判断是否为节假日模式并跳过打卡
-        if config.get_value("config.clockIn.mode") == "holiday" and is_holiday():
+def load_internship_plan(api_client: ApiClient, config: ConfigManager) -> bool:
+    """
+    准备实习计划（planInfo）：配置中已有时直接使用，其次使用本地缓存，都没有时向服务器查询并写入缓存。
+
+    Args:
+        api_client (ApiClient): ApiClient 实例。
+        config (ConfigManager): 配置管理器。
+
+    Returns:
+        bool: 计划是否来自本地（配置或缓存）；为 True 时依赖计划的任务失败后应重新查询。
+    """
+    if config.get_value("planInfo.planId"):
+        return True
+    cache, account = get_plan_cache(), _ledger_account(config)
+    if cache is not None and account is not None:
+        try:
+            plan = cache.get(account)
+        except sqlite3.Error as e:
+            logger.warning(f"读取本地实习计划缓存失败: {e}")
+            plan = None
+        if plan:
+            config.update_config(plan, "planInfo")
+            logger.info("使用本地缓存的实习计划")
+            return True
+    api_client.fetch_internship_plan()
+    logger.info("已获取实习计划信息")
+    _cache_internship_plan(config)
+    return False
+
+
+def _cache_internship_plan(config: ConfigManager) -> None:
+    cache, account = get_plan_cache(), _ledger_account(config)
+    if cache is None or account is None or not config.get_value("planInfo.planId"):
+        return
+    try:
+        cache.put(account, config.get_value("planInfo"))
+    except sqlite3.Error as e:
+        logger.warning(f"写入本地实习计划缓存失败: {e}")
+
+
+def revalidate_internship_plan(api_client: ApiClient, config: ConfigManager) -> bool:
+    """
+    依赖计划的任务失败后重新查询实习计划，并更新本地缓存。
+
+    Args:
+        api_client (ApiClient): ApiClient 实例。
+        config (ConfigManager): 配置管理器。
+
+    Returns:
+        bool: 计划是否发生了变化（变化时失败的任务值得重新执行），查询失败时返回 False。
+    """
+    previous = config.get_value("planInfo.planId")
+    cache, account = get_plan_cache(), _ledger_account(config)
+    try:
+        if cache is not None and account is not None:
+            cache.invalidate(account)
+        api_client.fetch_internship_plan()
+    except Exception as e:
+        logger.error(f"重新获取实习计划失败: {e}")
+        return False
+    _cache_internship_plan(config)
+    current = config.get_value("planInfo.planId")
+    if current != previous:
+        logger.warning(f"实习计划已变更：{previous} -> {current}")
+        return True
+    return False
+
+
+def submitted_reports_summary(
+    api_client: ApiClient, config: ConfigManager, report_type: str
+) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    获取最近提交的一份报告和已提交数量。
+
+    有本地镜像时先增量同步（只拉取比本地最新记录更新的页）再从本地读取，否则读取服务器第一页。
+
+    Args:
+        api_client (ApiClient): ApiClient 实例。
+        config (ConfigManager): 配置管理器。
+        report_type (str): day、week 或 month。
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], int]: 最近一份报告（没有时为 None）和已提交数量。
+    """
+    history = get_report_history()
+    phone = _ledger_account(config)
+    if history is not None and phone is not None:
+        account = f"{phone}:{config.get_value('planInfo.planId')}"
+        try:
+            history.sync(
+                account,
+                report_type,
+                lambda page, size: api_client.get_submitted_reports_info(
+                    report_type, page, size
+                ),
+            )
+            return history.summary(account, report_type)
+        except sqlite3.Error as e:
+            logger.warning(f"读取本地报告记录失败，改为直接查询服务器: {e}")
+
+    submitted_reports_info = api_client.get_submitted_reports_info(report_type)
+    submitted_reports = submitted_reports_info.get("data") or []
+    last_report = submitted_reports[0] if submitted_reports else None
+    return last_report, submitted_reports_info.get("flag", 0)
+
+
+def _holiday_status(
+    config: ConfigManager, now: datetime
+) -> Tuple[Optional[bool], Optional[Dict[str, Any]]]:
+    """
+    节假日模式下查询今天是否为休息日（访问网络），每个账号每次执行只查询一次。
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        now (datetime): 当前时间。
+
+    Returns:
+        Tuple[Optional[bool], Optional[Dict[str, Any]]]: (是否为休息日, 查询失败时打卡任务的执行结果)；
+            不是节假日模式时为 (None, None)。
+    """
+    if config.get_value("config.clockIn.mode") != "holiday":
+        return None, None
+    try:
+        return is_holiday(now), None
+    except Exception as e:
+        logger.error(f"打卡失败，查询节假日失败: {e}")
+        return None, {
+            "status": "fail",
+            "message": f"打卡失败: 查询节假日失败: {e}",
+            "task_type": "打卡",
+        }
+
+
+def _clock_in_precheck(
+    config: ConfigManager, now: datetime, holiday: Optional[bool] = None
+) -> Tuple[Optional[Dict[str, Any]], str, str]:
+    """
+    判断本次是否需要打卡：按打卡模式确定打卡类型，并查询本地台账。
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        now (datetime): 当前时间。
+        holiday (Optional[bool]): 今天是否为休息日（见 _holiday_status）。节假日模式下为 None 时
+            在此查询（访问网络，失败时抛出异常）。
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], str, str]: 可以直接跳过时的执行结果（否则为 None）、
+            打卡类型和显示名称。
+    """
+    # 确定打卡类型
+    if now.hour < 12:
+        checkin_type = "START"
+        display_type = "上班"
+    else:
+        checkin_type = "END"
+        display_type = "下班"
+
+    # 判断是否为节假日模式并跳过打卡
+    if config.get_value("config.clockIn.mode") == "holiday" and (
+        holiday if holiday is not None else is_holiday(now)
+    ):
+        if not config.get_value("config.clockIn.specialClockIn"):
+            skipped = {
+                "status": "skip",
+                "message": "今天是休息日，已跳过打卡",
+                "task_type": "打卡",
+            }
+            return skipped, checkin_type, display_type
+        checkin_type = "HOLIDAY"
+        display_type = "休息/节假日"
+
+    # 判断自定义打卡日期模式并跳过打卡
+    elif config.get_value("config.clockIn.mode") == "custom":
+        today = now.weekday() + 1  # 获取星期几（1-7）
+        if today not in config.get_value("config.clockIn.customDays"):
             if not config.get_value("config.clockIn.specialClockIn"):
-                return {
+                skipped = {
                     "status": "skip",
-                    "message": "今天是休息日，已跳过打卡",
+                    "message": "今天不在设置打卡时间范围内，已跳过打卡",
                     "task_type": "打卡",
                 }
+                return skipped, checkin_type, display_type
             checkin_type = "HOLIDAY"
             display_type = "休息/节假日"
 
-        # 判断自定义打卡日期模式并跳过打卡
-        elif config.get_value("config.clockIn.mode") == "custom":
-            today = datetime.today().weekday() + 1  # 获取星期几（1-7）
-            if today not in config.get_value("config.clockIn.customDays"):
-                if not config.get_value("config.clockIn.specialClockIn"):
-                    return {
-                        "status": "skip",
-                        "message": "今天不在设置打卡时间范围内，已跳过打卡",
-                        "task_type": "打卡",
-                    }
-                checkin_type = "HOLIDAY"
-                display_type = "休息/节假日"
-
-        last_checkin_info = api_client.get_checkin_info()
+    if ledger_done(config, "clock_in", f"{now:%Y-%m-%d}-{checkin_type}"):
+        logger.info(f"本地台账显示今日 {display_type} 卡已打，无需重复打卡")
+        skipped = {
+            "status": "skip",
+            "message": f"今日 {display_type} 卡已打，无需重复打卡",
+            "task_type": "打卡",
+        }
+        return skipped, checkin_type, display_type
+    return None, checkin_type, display_type
+
+
+@traced()
+def perform_clock_in(
+    api_client: ApiClient, config: ConfigManager, holiday: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    执行打卡操作。
+
+    Args:
+        api_client (ApiClient): ApiClient 实例。
+        config (ConfigManager): 配置管理器。
+        holiday (Optional[bool]): 已查询的今天是否为休息日，默认为 None 时按需查询。
+
+    Returns:
+        Dict[str, Any]: 执行结果。
+    """
+    try:
+        current_time = datetime.now()
+        skipped, checkin_type, display_type = _clock_in_precheck(
+            config, current_time, holiday
+        )
+        if skipped:
+            return skipped
+        period = f"{current_time:%Y-%m-%d}-{checkin_type}"
+
+        last_checkin_info = last_checkin_record(api_client, config)
 
         # 检查是否已经打过卡
         if last_checkin_info and last_checkin_info["type"] == checkin_type:
@@ -80,6 +463,7 @@ def perform_clock_in(api_client: ApiClient, config: ConfigManager) -> Dict[str,
             )
             if last_checkin_time.date() == current_time.date():
                 logger.info(f"今日 {display_type} 卡已打，无需重复打卡")
+                ledger_record(config, "clock_in", period)
                 return {
                     "status": "skip",
                     "message": f"今日 {display_type} 卡已打，无需重复打卡",
@@ -112,6 +496,15 @@ def perform_clock_in(api_client: ApiClient, config: ConfigManager) -> Dict[str,
 
         api_client.submit_clock_in(checkin_info)
         logger.info(f"用户 {user_name} {display_type} 打卡成功")
+        ledger_record(config, "clock_in", period)
+        cache_last_checkin(
+            config,
+            {
+                "type": checkin_type,
+                "createTime": current_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "address": config.get_value("config.clockIn.location.address"),
+            },
+        )
 
         return {
             "status": "success",
@@ -124,21 +517,22 @@ def perform_clock_in(api_client: ApiClient, config: ConfigManager) -> Dict[str,
                 "打卡地点": config.get_value("config.clockIn.location.address"),
             },
         }
+    except LeaseLostError:
+        # 账号已由其它节点接手，不记为失败，交给 run() 结束本次执行
+        raise
     except Exception as e:
         logger.error(f"打卡失败: {e}")
         return {"status": "fail", "message": f"打卡失败: {str(e)}", "task_type": "打卡"}
 
 
-def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[str, Any]:
+def _daily_report_precheck(
+    config: ConfigManager, now: datetime
+) -> Optional[Dict[str, Any]]:
     """
-    提交日报。
-
-    Args:
-        api_client (ApiClient): ApiClient 实例。
-        config (ConfigManager): 配置管理器。
+    不访问网络判断本次是否需要提交日报。
 
     Returns:
-        Dict[str, Any]: 执行结果。
+        Optional[Dict[str, Any]]: 可以直接跳过时的执行结果，需要继续时为 None。
     """
     if not config.get_value("config.reportSettings.daily.enabled"):
         logger.info("用户未开启日报提交功能，跳过日报提交任务")
@@ -148,8 +542,7 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
             "task_type": "日报提交",
         }
 
-    current_time = datetime.now()
-    if not (current_time.hour >= 12):
+    if not (now.hour >= 12):
         logger.info("未到日报提交时间（需12点后）")
         return {
             "status": "skip",
@@ -157,19 +550,47 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
             "task_type": "日报提交",
         }
 
+    if ledger_done(config, "day", f"{now:%Y-%m-%d}"):
+        logger.info("本地台账显示今天已经提交过日报，跳过本次提交")
+        return {
+            "status": "skip",
+            "message": "今天已经提交过日报",
+            "task_type": "日报提交",
+        }
+    return None
+
+
+@traced()
+def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[str, Any]:
+    """
+    提交日报。
+
+    Args:
+        api_client (ApiClient): ApiClient 实例。
+        config (ConfigManager): 配置管理器。
+
+    Returns:
+        Dict[str, Any]: 执行结果。
+    """
+    current_time = datetime.now()
+    skipped = _daily_report_precheck(config, current_time)
+    if skipped:
+        return skipped
+
     try:
         # 获取历史提交记录
-        submitted_reports_info = api_client.get_submitted_reports_info("day")
-        submitted_reports = submitted_reports_info.get("data", [])
+        last_report, submitted_count = submitted_reports_summary(
+            api_client, config, "day"
+        )
 
         # 检查是否已经提交过今天的日报
-        if submitted_reports:
-            last_report = submitted_reports[0]
+        if last_report:
             last_submit_time = datetime.strptime(
                 last_report["createTime"], "%Y-%m-%d %H:%M:%S"
             )
             if last_submit_time.date() == current_time.date():
                 logger.info("今天已经提交过日报，跳过本次提交")
+                ledger_record(config, "day", f"{current_time:%Y-%m-%d}")
                 return {
                     "status": "skip",
                     "message": "今天已经提交过日报",
@@ -177,7 +598,7 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
                 }
 
         job_info = api_client.get_job_info()
-        report_count = submitted_reports_info.get("flag", 0) + 1
+        report_count = submitted_count + 1
         content = generate_article(
             config,
             f"第{report_count}天日报",
@@ -203,6 +624,7 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
             "formFieldDtoList": api_client.get_from_info(7),
         }
         api_client.submit_report(report_info)
+        ledger_record(config, "day", f"{current_time:%Y-%m-%d}")
 
         logger.info(
             f"第{report_count}天日报已提交，提交时间：{current_time.strftime('%Y-%m-%d %H:%M:%S')}"
@@ -218,6 +640,8 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
             },
             "report_content": content,
         }
+    except LeaseLostError:
+        raise
     except Exception as e:
         logger.error(f"日报提交失败: {e}")
         return {
@@ -227,17 +651,14 @@ def submit_daily_report(api_client: ApiClient, config: ConfigManager) -> Dict[st
         }
 
 
-def submit_weekly_report(
-    config: ConfigManager, api_client: ApiClient
-) -> Dict[str, Any]:
-    """提交周报
-
-    Args:
-        config (ConfigManager): 配置管理器。
-        api_client (ApiClient): ApiClient 实例。
+def _weekly_report_precheck(
+    config: ConfigManager, now: datetime
+) -> Optional[Dict[str, Any]]:
+    """
+    不访问网络判断本次是否需要提交周报。
 
     Returns:
-        Dict[str, Any]: 执行结果。
+        Optional[Dict[str, Any]]: 可以直接跳过时的执行结果，需要继续时为 None。
     """
     if not config.get_value("config.reportSettings.weekly.enabled"):
         logger.info("用户未开启周报提交功能，跳过周报提交任务")
@@ -247,10 +668,9 @@ def submit_weekly_report(
             "task_type": "周报提交",
         }
 
-    current_time = datetime.now()
     submit_day = config.get_value("config.reportSettings.weekly.submitTime")
 
-    if current_time.weekday() + 1 != submit_day or not (current_time.hour >= 12):
+    if now.weekday() + 1 != submit_day or not (now.hour >= 12):
         logger.info("未到周报提交时间")
         return {
             "status": "skip",
@@ -258,28 +678,56 @@ def submit_weekly_report(
             "task_type": "周报提交",
         }
 
+    if ledger_done(config, "week", f"{now:%G-W%V}"):
+        logger.info("本地台账显示本周已经提交过周报，跳过本次提交")
+        return {
+            "status": "skip",
+            "message": "本周已经提交过周报",
+            "task_type": "周报提交",
+        }
+    return None
+
+
+@traced()
+def submit_weekly_report(
+    config: ConfigManager, api_client: ApiClient
+) -> Dict[str, Any]:
+    """提交周报
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        api_client (ApiClient): ApiClient 实例。
+
+    Returns:
+        Dict[str, Any]: 执行结果。
+    """
+    current_time = datetime.now()
+    skipped = _weekly_report_precheck(config, current_time)
+    if skipped:
+        return skipped
+
     try:
         # 获取当前周信息
         current_week_info = api_client.get_weeks_date()[0]
 
         # 获取历史提交记录
-        submitted_reports_info = api_client.get_submitted_reports_info("week")
-        submitted_reports = submitted_reports_info.get("data", [])
+        last_report, submitted_count = submitted_reports_summary(
+            api_client, config, "week"
+        )
 
         # 获取当前周数
-        week = submitted_reports_info.get("flag", 0) + 1
+        week = submitted_count + 1
         current_week_string = f"第{week}周"
 
         # 检查是否已经提交过本周的周报
-        if submitted_reports:
-            last_report = submitted_reports[0]
-            if last_report.get("weeks") == current_week_string:
-                logger.info("本周已经提交过周报，跳过本次提交")
-                return {
-                    "status": "skip",
-                    "message": "本周已经提交过周报",
-                    "task_type": "周报提交",
-                }
+        if last_report and last_report.get("weeks") == current_week_string:
+            logger.info("本周已经提交过周报，跳过本次提交")
+            ledger_record(config, "week", f"{current_time:%G-W%V}")
+            return {
+                "status": "skip",
+                "message": "本周已经提交过周报",
+                "task_type": "周报提交",
+            }
 
         job_info = api_client.get_job_info()
         content = generate_article(
@@ -309,6 +757,7 @@ def submit_weekly_report(
             "formFieldDtoList": api_client.get_from_info(8),
         }
         api_client.submit_report(report_info)
+        ledger_record(config, "week", f"{current_time:%G-W%V}")
 
         logger.info(
             f"第{week}周周报已提交，开始时间：{current_week_info.get('startTime')},结束时间：{current_week_info.get('endTime')}"
@@ -326,6 +775,8 @@ def submit_weekly_report(
             },
             "report_content": content,
         }
+    except LeaseLostError:
+        raise
     except Exception as e:
         logger.error(f"周报提交失败: {e}")
         return {
@@ -335,17 +786,14 @@ def submit_weekly_report(
         }
 
 
-def submit_monthly_report(
-    config: ConfigManager, api_client: ApiClient
-) -> Dict[str, Any]:
-    """提交月报
-
-    Args:
-        config (ConfigManager): 配置管理器。
-        api_client (ApiClient): ApiClient 实例。
+def _monthly_report_precheck(
+    config: ConfigManager, now: datetime
+) -> Optional[Dict[str, Any]]:
+    """
+    不访问网络判断本次是否需要提交月报。
 
     Returns:
-        Dict[str, Any]: 执行结果。
+        Optional[Dict[str, Any]]: 可以直接跳过时的执行结果，需要继续时为 None。
     """
     if not config.get_value("config.reportSettings.monthly.enabled"):
         logger.info("用户未开启月报提交功能，跳过月报提交任务")
@@ -355,15 +803,12 @@ def submit_monthly_report(
             "task_type": "月报提交",
         }
 
-    current_time = datetime.now()
-    last_day_of_month = (current_time.replace(day=1) + timedelta(days=32)).replace(
+    last_day_of_month = (now.replace(day=1) + timedelta(days=32)).replace(
         day=1
     ) - timedelta(days=1)
     submit_day = config.get_value("config.reportSettings.monthly.submitTime")
 
-    if current_time.day != min(submit_day, last_day_of_month.day) or not (
-        current_time.hour >= 12
-    ):
+    if now.day != min(submit_day, last_day_of_month.day) or not (now.hour >= 12):
         logger.info("未到月报提交时间")
         return {
             "status": "skip",
@@ -371,27 +816,55 @@ def submit_monthly_report(
             "task_type": "月报提交",
         }
 
+    if ledger_done(config, "month", f"{now:%Y-%m}"):
+        logger.info("本地台账显示本月已经提交过月报，跳过本次提交")
+        return {
+            "status": "skip",
+            "message": "本月已经提交过月报",
+            "task_type": "月报提交",
+        }
+    return None
+
+
+@traced()
+def submit_monthly_report(
+    config: ConfigManager, api_client: ApiClient
+) -> Dict[str, Any]:
+    """提交月报
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        api_client (ApiClient): ApiClient 实例。
+
+    Returns:
+        Dict[str, Any]: 执行结果。
+    """
+    current_time = datetime.now()
+    skipped = _monthly_report_precheck(config, current_time)
+    if skipped:
+        return skipped
+
     try:
         # 获取当前年月
         current_yearmonth = current_time.strftime("%Y-%m")
 
         # 获取历史提交记录
-        submitted_reports_info = api_client.get_submitted_reports_info("month")
-        submitted_reports = submitted_reports_info.get("data", [])
+        last_report, submitted_count = submitted_reports_summary(
+            api_client, config, "month"
+        )
 
         # 检查是否已经提交过本月的月报
-        if submitted_reports:
-            last_report = submitted_reports[0]
-            if last_report.get("yearmonth") == current_yearmonth:
-                logger.info("本月已经提交过月报，跳过本次提交")
-                return {
-                    "status": "skip",
-                    "message": "本月已经提交过月报",
-                    "task_type": "月报提交",
-                }
+        if last_report and last_report.get("yearmonth") == current_yearmonth:
+            logger.info("本月已经提交过月报，跳过本次提交")
+            ledger_record(config, "month", current_yearmonth)
+            return {
+                "status": "skip",
+                "message": "本月已经提交过月报",
+                "task_type": "月报提交",
+            }
 
         job_info = api_client.get_job_info()
-        month = submitted_reports_info.get("flag", 0) + 1
+        month = submitted_count + 1
         content = generate_article(
             config,
             f"第{month}月月报",
@@ -417,6 +890,7 @@ def submit_monthly_report(
             "formFieldDtoList": api_client.get_from_info(9),
         }
         api_client.submit_report(report_info)
+        ledger_record(config, "month", current_yearmonth)
 
         logger.info(f"第{month}月月报已提交，提交月份：{current_yearmonth}")
 
@@ -431,6 +905,8 @@ def submit_monthly_report(
             },
             "report_content": content,
         }
+    except LeaseLostError:
+        raise
     except Exception as e:
         logger.error(f"月报提交失败: {e}")
         return {
@@ -440,12 +916,65 @@ def submit_monthly_report(
         }
 
 
-def run(config: ConfigManager) -> None:
+def run(
+    config: ConfigManager, api_client: Optional[ApiClient] = None
+) -> List[Dict[str, Any]]:
     """
     执行所有任务。
 
+    执行期间占用一个账号名额（ACCOUNT_SLOTS），并受 ACCOUNT_DEADLINE 时间预算约束。
+    结束后将结果和本次执行的统计（各阶段耗时、重试和验证码尝试次数）加入执行历史的缓冲。
+
     Args:
         config (ConfigManager): 配置管理器。
+        api_client (Optional[ApiClient]): 复用的 ApiClient（守护进程模式下保持连接），默认为 None 时新建。
+
+    Returns:
+        List[Dict[str, Any]]: 各任务的精简结果（见 compact_results），报告全文在推送后即释放。
+
+    Raises:
+        LeaseLostError: 多节点模式下账号的租约已被其它节点接手；此时不推送结果，剩余任务也不再执行。
+    """
+    stats = RunStats()
+    records: List[Dict[str, Any]] = []
+    TRACER.set_account(desensitize_phone(config.get_value("config.user.phone")))
+    try:
+        with ACCOUNT_SLOTS.slot(), deadline(ACCOUNT_DEADLINE), span("run"):
+            with collect_stats(stats), stats.timing():
+                records = compact_results(_run(config, api_client))
+        return records
+    except LeaseLostError as e:
+        records = compact_results(
+            [{"status": "skip", "message": f"已由其它节点接手: {e}", "task_type": "任务执行"}]
+        )
+        raise
+    except Exception as e:
+        records = compact_results(
+            [{"status": "fail", "message": f"执行任务时发生错误: {e}", "task_type": "任务执行"}]
+        )
+        raise
+    finally:
+        TRACER.set_account(None)
+        # 已归还账号名额，写入执行历史的缓冲（满一批时才写库）
+        history = get_run_history()
+        if history is not None:
+            history.append(_ledger_account(config), records, stats)
+
+
+def _run(
+    config: ConfigManager, api_client: Optional[ApiClient] = None
+) -> List[Dict[str, Any]]:
+    """
+    登录并依次执行打卡和各类报告任务，最后推送结果。
+
+    如果本地就能确定所有任务都无需执行（未到时间或台账显示已完成），不创建会话也不登录。
+
+    Args:
+        config (ConfigManager): 配置管理器。
+        api_client (Optional[ApiClient]): 复用的 ApiClient，默认为 None 时新建。
+
+    Returns:
+        List[Dict[str, Any]]: 各任务的结果。
     """
     results: List[Dict[str, Any]] = []
 
@@ -453,21 +982,40 @@ def run(config: ConfigManager) -> None:
         pusher = MessagePusher(config.get_value("config.pushNotifications"))
     except Exception as e:
         logger.error(f"获取消息推送客户端失败: {str(e)}")
-        return
-
+        return [{"status": "fail", "message": f"获取消息推送客户端失败: {e}", "task_type": "消息推送"}]
+
+    now = datetime.now()
+    with phase("precheck"):
+        # 节假日查询失败只影响打卡，其余任务照常执行
+        holiday, clock_in_failure = _holiday_status(config, now)
+        local_results = [
+            clock_in_failure or _clock_in_precheck(config, now, holiday)[0],
+            _daily_report_precheck(config, now),
+            _weekly_report_precheck(config, now),
+            _monthly_report_precheck(config, now),
+        ]
+    if all(local_results):
+        logger.info("所有任务均已完成或未到执行时间，无需登录")
+        with phase("push"):
+            pusher.push(local_results)
+        mark_account_done(config, local_results)
+        return local_results
+
+    plan_is_local = False
     try:
-        api_client = ApiClient(config)
+        api_client = api_client or ApiClient(config)
         # 检查是否登录
         if not config.get_value("userInfo.token"):
-            api_client.login()
+            with phase("login"):
+                api_client.login()
 
         logger.info("获取用户信息成功")
         # 检查用户类型和计划信息
         if config.get_value("userInfo.userType") == "teacher":
             logger.info("用户身份为教师，跳过计划信息检查")
-        elif not config.get_value("planInfo.planId"):
-            api_client.fetch_internship_plan()
-            logger.info("已获取实习计划信息")
+        else:
+            with phase("plan"):
+                plan_is_local = load_internship_plan(api_client, config)
 
     except Exception as e:
         error_message = f"获取API客户端失败: {str(e)}"
@@ -477,17 +1025,36 @@ def run(config: ConfigManager) -> None:
         )
         pusher.push(results)
         logger.info("任务异常结束")
-        return
+        return results
 
     logger.info(f"开始执行：{desensitize_name(config.get_value('userInfo.nikeName'))}")
 
+    # (阶段名, 任务)，阶段名用于执行历史中的耗时统计
+    tasks = [
+        (
+            "clock_in",
+            lambda: clock_in_failure or perform_clock_in(api_client, config, holiday),
+        ),
+        ("daily_report", lambda: submit_daily_report(api_client, config)),
+        ("weekly_report", lambda: submit_weekly_report(config, api_client)),
+        ("monthly_report", lambda: submit_monthly_report(config, api_client)),
+    ]
+
+    def run_task(i: int) -> Dict[str, Any]:
+        name, task = tasks[i]
+        with phase(name):
+            return task()
+
     try:
-        results = [
-            perform_clock_in(api_client, config),
-            submit_daily_report(api_client, config),
-            submit_weekly_report(config, api_client),
-            submit_monthly_report(config, api_client),
-        ]
+        results = [run_task(i) for i in range(len(tasks))]
+        # 计划来自本地时，任务失败可能是因为计划已变更：重新查询计划，变更后重试失败的任务
+        failed = [i for i, result in enumerate(results) if result.get("status") == "fail"]
+        if plan_is_local and failed and revalidate_internship_plan(api_client, config):
+            for i in failed:
+                results[i] = run_task(i)
+    except LeaseLostError:
+        # 不推送也不记录完成，后续任务由接手的节点执行
+        raise
     except Exception as e:
         error_message = f"执行任务时发生错误: {str(e)}"
         logger.error(error_message)
@@ -495,19 +1062,312 @@ def run(config: ConfigManager) -> None:
             {"status": "fail", "message": error_message, "task_type": "任务执行"}
         )
 
-    pusher.push(results)
+    with phase("push"):
+        pusher.push(results)
+    mark_account_done(config, results)
     logger.info(f"执行结束：{desensitize_name(config.get_value('userInfo.nikeName'))}")
+    return results
+
+
+def execute_tasks(
+    selected_files: Optional[List[str]] = None,
+    metrics_file: Optional[str] = None,
+    metrics_json: Optional[str] = None,
+    trace_file: Optional[str] = None,
+    queue_url: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    share: Optional[Dict[str, List[Any]]] = None,
+):
+    """
+    创建并执行任务。
+
+    Args:
+        selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+        metrics_file (Optional[str]): 结束时写入 Prometheus textfile 的路径，默认为 None。
+        metrics_json (Optional[str]): 结束时写入指标 JSON 摘要的路径，默认为 None。
+        trace_file (Optional[str]): 记录追踪并在结束时导出 Chrome trace JSON 的路径，默认为 None。
+        queue_url (Optional[str]): 多节点共享的租约队列地址，设置后账号入队并由各节点领取执行，默认为 None。
+        lease_seconds (float): 租约时长（秒），节点宕机后任务最多在这么久之后被其它节点接手。
+        share (Optional[Dict[str, List[Any]]]): 只执行这一份本地账号（见 _partition_sources），默认为 None 时执行全部。
+    """
+    if trace_file:
+        TRACER.enable()
+    try:
+        _execute_tasks(selected_files, queue_url, lease_seconds, share)
+    finally:
+        flush_run_history()
+        write_metrics(metrics_file, metrics_json)
+        if trace_file:
+            try:
+                TRACER.export(trace_file)
+            except Exception as e:
+                logger.error(f"导出追踪数据失败: {e}")
+
+
+def _worker_path(path: Optional[str], index: int) -> Optional[str]:
+    """在文件扩展名前插入工作进程序号，避免多个工作进程写同一个文件。"""
+    if not path:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{index}{ext}"
 
 
-def execute_tasks(selected_files: Optional[List[str]] = None):
+def _partition_sources(
+    selected_files: Optional[List[str]], workers: int
+) -> List[Dict[str, List[Any]]]:
     """
-    创建并执行任务。
+    列出本地账号的来源并轮流分成 workers 份，不创建 ConfigManager。
+
+    账号存储和配置文件只读取手机号和文件名，由各工作进程解析自己那一份；环境变量 USER 本身就是一个
+    JSON 数组，在这里解码一次，解码后的配置直接分给各工作进程，工作进程不再解码 USER。
 
     Args:
         selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+        workers (int): 份数。
+
+    Returns:
+        List[Dict[str, List[Any]]]: 每份一项，含 account_ids（账号存储中的手机号）、
+            env_configs（环境变量 USER 中的配置）和 files（user 目录下的配置文件名）。
     """
-    logger.info("开始执行工学云任务")
+    shares: List[Dict[str, List[Any]]] = [
+        {"account_ids": [], "env_configs": [], "files": []} for _ in range(workers)
+    ]
+    sources: List[Tuple[str, Any]] = []
+    if ACCOUNTS_DB_PATH:
+        store = get_account_store()
+        if store is not None:
+            account_ids = store.ids(**_account_filters(selected_files))
+            sources.extend(("account_ids", account_id) for account_id in account_ids)
+    else:
+        sources.extend(("env_configs", config) for config in _iter_env_configs())
+        sources.extend(("files", name) for name in _list_config_files(selected_files))
+    for position, (kind, source) in enumerate(sources):
+        shares[position % workers][kind].append(source)
+    return shares
+
+
+def _prefork_worker(
+    index: int, share: Dict[str, List[Any]], results, options: Dict[str, Any]
+) -> None:
+    """工作进程的入口：执行父进程分到的账号，结束时把本进程的内存占用交给父进程。"""
+    try:
+        execute_tasks(
+            options["selected_files"],
+            _worker_path(options["metrics_file"], index),
+            _worker_path(options["metrics_json"], index),
+            _worker_path(options["trace_file"], index),
+            options["queue_url"],
+            options["lease_seconds"],
+            share=share,
+        )
+    finally:
+        results.put((index, os.getpid(), memory_usage()))
+
+
+def execute_prefork(
+    workers: int,
+    selected_files: Optional[List[str]] = None,
+    metrics_file: Optional[str] = None,
+    metrics_json: Optional[str] = None,
+    trace_file: Optional[str] = None,
+    queue_url: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> None:
+    """
+    预先 fork 多个工作进程执行任务（仅支持 Linux）。
+
+    父进程在 fork 之前以只读 mmap 映射验证码模型的权重（见 CaptchaUtils.share_models），各工作进程的
+    推理会话直接使用同一份映射，不再各自复制一份权重。父进程在 fork 之前列出本地账号并轮流分给各工作进程
+    （见 _partition_sources），每个进程只解析自己那一份；设置 queue_url 时各进程把自己那一份入队，
+    再都从共享队列领取。每个工作进程的指标和追踪文件名带上进程序号。结束时输出每个进程的 RSS 和
+    独占内存（USS），比较共享前后的内存应该看 USS。
+
+    Args:
+        workers (int): 工作进程数。
+        其余参数同 execute_tasks()。
+    """
+    import multiprocessing
+    from queue import Empty
+
+    # 只在需要时导入，避免不识别点选验证码的运行加载 OpenCV
+    from util.CaptchaUtils import configure_inference, share_models
+
+    configure_inference(processes=workers)
+    shared = share_models()
+    shares = _partition_sources(selected_files, workers)
+    logger.info(f"已映射 {shared} 个共享模型，启动 {workers} 个工作进程")
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    options = {
+        "selected_files": selected_files,
+        "metrics_file": metrics_file,
+        "metrics_json": metrics_json,
+        "trace_file": trace_file,
+        "queue_url": queue_url,
+        "lease_seconds": lease_seconds,
+    }
+    processes = [
+        ctx.Process(
+            target=_prefork_worker,
+            args=(index, shares[index], results, options),
+            name=f"worker-{index}",
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # 先取走各进程的报告再 join：结果写不进管道的工作进程不会退出
+    reports = []
+    while len(reports) < workers:
+        alive = any(process.is_alive() for process in processes)
+        try:
+            reports.append(results.get(timeout=1))
+        except Empty:
+            # 没有进程存活时已写入的报告都已可读，仍然取不到说明有进程异常退出
+            if not alive:
+                break
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.error(f"工作进程 {process.name}（{process.pid}）异常退出：{process.exitcode}")
+    parent = memory_usage()
+    logger.info(f"父进程 {os.getpid()}：{format_memory(parent)}")
+    for index, pid, usage in sorted(reports):
+        logger.info(f"工作进程 {index}（{pid}）：{format_memory(usage)}")
+    unique = parent.get("uss", 0) + sum(usage.get("uss", 0) for _, _, usage in reports)
+    logger.info(f"全部进程合计独占 {unique / 1024 / 1024:.1f} MiB")
+
+
+def current_window(now: Optional[datetime] = None) -> str:
+    """
+    返回当前执行窗口：上午对应上班打卡，下午对应下班打卡和报告，与 perform_clock_in 的判断一致。
+
+    Args:
+        now (Optional[datetime]): 当前时间，默认为 datetime.now()。
+
+    Returns:
+        str: 形如 "2025-01-01-AM" 的窗口标识。
+    """
+    now = now or datetime.now()
+    return f"{now:%Y-%m-%d}-{'AM' if now.hour < 12 else 'PM'}"
+
+
+def _execute_distributed(
+    tasks: Iterable[ConfigManager], queue_url: str, lease_seconds: float
+) -> None:
+    """
+    将本机的账号加入共享队列，并与其它节点一起领取执行，直到当前窗口的队列清空。
+
+    同一窗口内每个账号只入队一次；节点宕机时其租约到期后由其它节点接手。提交打卡/报告前会同步确认
+    租约，租约已被接手的节点放弃提交，加上任务本身对“今日已打卡/已提交”的检查，保证每个窗口只成功一次。
+
+    Args:
+        tasks (Iterable[ConfigManager]): 本机的账号配置，每 ENQUEUE_BATCH_SIZE 个入队一次。
+        queue_url (str): 队列地址。
+        lease_seconds (float): 租约时长（秒）。
+    """
+    queue = open_queue(queue_url)
+    window = current_window()
+    total = added = 0
+    tasks = iter(tasks)
+    while True:
+        batch = list(itertools.islice(tasks, ENQUEUE_BATCH_SIZE))
+        if not batch:
+            break
+        jobs = {}
+        for task in batch:
+            phone = _ledger_account(task)
+            if phone:
+                jobs[phone] = task.config
+            else:
+                logger.error("配置缺少手机号，无法加入共享队列")
+        if jobs:
+            total += len(jobs)
+            added += queue.enqueue(window, jobs)
+    logger.info(f"窗口 {window}：本机 {total} 个账号，新入队 {added} 个")
+
+    def handle(payload: Dict[str, Any], guard) -> bool:
+        config = ConfigManager(config=payload, store=get_account_store())
+        api_client = ApiClient(config)
+        api_client.write_guard = guard
+        # 有任务失败时不标记完成，由队列稍后重新分配（可能分给其它节点）
+        return not any(record["status"] == "fail" for record in run(config, api_client))
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    completed = process_queue(queue, window, handle, worker, lease_seconds)
+    logger.info(f"窗口 {window}：本节点完成 {completed} 个账号，队列状态 {queue.stats(window)}")
+
+
+def run_daemon(
+    selected_files: Optional[List[str]] = None,
+    times: Optional[List[str]] = None,
+    jitter_minutes: float = 10,
+    metrics_file: Optional[str] = None,
+    metrics_json: Optional[str] = None,
+    trace_file: Optional[str] = None,
+) -> None:
+    """
+    以守护进程方式常驻运行，按时刻表为每个账号执行任务，直到收到 SIGTERM/SIGINT。
+
+    Args:
+        selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+        times (Optional[List[str]]): 每日执行时刻（HH:MM），默认为 08:00 和 18:00。
+        jitter_minutes (float): 每次执行随机延后的最大分钟数。
+        metrics_file (Optional[str]): 退出时写入 Prometheus textfile 的路径，默认为 None。
+        metrics_json (Optional[str]): 退出时写入指标 JSON 摘要的路径，默认为 None。
+        trace_file (Optional[str]): 退出时导出 Chrome trace JSON 的路径，默认为 None。
+    """
+    if trace_file:
+        TRACER.enable()
+    configure_captcha_cache(CAPTCHA_CACHE_PATH, CAPTCHA_CACHE_SIZE)
+    try:
+        Daemon(
+            run,
+            USER_DIR,
+            selected_files=selected_files,
+            env_configs=_read_env_configs(),
+            times=times,
+            jitter_minutes=jitter_minutes,
+        ).serve_forever()
+    finally:
+        flush_run_history()
+        write_metrics(metrics_file, metrics_json)
+        if trace_file:
+            try:
+                TRACER.export(trace_file)
+            except Exception as e:
+                logger.error(f"导出追踪数据失败: {e}")
 
+
+def write_metrics(metrics_file: Optional[str], metrics_json: Optional[str]) -> None:
+    """
+    导出本次运行的指标。
+
+    Args:
+        metrics_file (Optional[str]): Prometheus textfile 路径。
+        metrics_json (Optional[str]): JSON 摘要路径。
+    """
+    try:
+        if metrics_file:
+            METRICS.write_prometheus(metrics_file)
+        if metrics_json:
+            METRICS.write_json(metrics_json)
+    except Exception as e:
+        logger.error(f"导出指标失败: {e}")
+
+
+def _list_config_files(selected_files: Optional[List[str]] = None) -> List[str]:
+    """
+    获取用户目录下的配置文件名（不含后缀），并按指定列表筛选。
+
+    Args:
+        selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+
+    Returns:
+        List[str]: 配置文件名列表。
+    """
     # 获取用户目录下的所有 .json 文件(不含后缀)
     try:
         json_files = [f[:-5] for f in os.listdir(USER_DIR) if f.endswith(".json")]
@@ -523,64 +1383,272 @@ def execute_tasks(selected_files: Optional[List[str]] = None):
         if missing_files:
             logger.error(f"以下配置文件未找到: {', '.join(missing_files)}")
         json_files = list(existing_files)
+    return json_files
 
-    # 从环境变量获取配置
-    user_env = os.getenv("USER")
-    user_configs = []
-    if user_env and user_env.strip():
-        try:
-            user_configs = json.loads(user_env)
-            if not isinstance(user_configs, list):
-                logger.error("环境变量 USER 必须包含 JSON 数组")
-                user_configs = []
-            else:
-                logger.info(f"从环境变量中获取到 {len(user_configs)} 个配置")
-        except json.JSONDecodeError as e:
-            logger.error(f"USER 不是有效的JSON格式: {e}")
-            user_configs = []
-        except Exception as e:
-            logger.error(f"解析USER时发生意外错误: {e}")
-            user_configs = []
 
-    # 检查是否存在有效配置
-    if not json_files and not user_configs:
-        logger.warning("未找到任何有效配置")
+def _iter_env_configs() -> Iterator[Dict[str, Any]]:
+    """
+    逐个解析环境变量 USER 中 JSON 数组的元素，不一次性构造全部配置。
+
+    数组中途格式错误时记录日志并停止，之前的元素照常返回。
+
+    Yields:
+        Dict[str, Any]: 账号配置。
+    """
+    user_env = os.getenv("USER")
+    if not user_env or not user_env.strip():
+        return
+    text = user_env.strip()
+    if not text.startswith("["):
+        logger.error("环境变量 USER 必须包含 JSON 数组")
         return
+    decoder = json.JSONDecoder()
+    count = 0
+    pos = _JSON_WHITESPACE.match(text, 1).end()
+    try:
+        while text[pos] != "]":
+            config, pos = decoder.raw_decode(text, pos)
+            count += 1
+            yield config
+            pos = _JSON_WHITESPACE.match(text, pos).end()
+            if text[pos] == ",":
+                pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+            elif text[pos] != "]":
+                raise ValueError(f"第 {pos} 个字符处缺少逗号")
+    except (ValueError, IndexError) as e:
+        logger.error(f"USER 不是有效的JSON格式: {e}")
+    logger.info(f"从环境变量中获取到 {count} 个配置")
+
+
+def _read_env_configs() -> List[Dict[str, Any]]:
+    """
+    从环境变量 USER 读取配置列表。
+
+    Returns:
+        List[Dict[str, Any]]: 配置列表，未设置或格式错误时为空列表。
+    """
+    return list(_iter_env_configs())
+
+
+def _iter_tasks(
+    selected_files: Optional[List[str]] = None,
+    share: Optional[Dict[str, List[Any]]] = None,
+) -> Iterator[ConfigManager]:
+    """
+    逐个产生账号配置，取用时才解析：使用账号存储时按条件分页读取，否则依次读取环境变量 USER
+    和 user 目录的配置文件。创建失败的账号记录日志后跳过。
 
-    # 创建任务列表
-    tasks = []
+    Args:
+        selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+        share (Optional[Dict[str, List[Any]]]): 只产生这一份账号（见 _partition_sources），默认为 None 时产生全部。
 
-    def add_task(source, **kwargs):
+    Yields:
+        ConfigManager: 账号配置。
+    """
+
+    def create(source: str, **kwargs) -> Optional[ConfigManager]:
         try:
-            tasks.append(ConfigManager(**kwargs))
+            task = ConfigManager(**kwargs)
             logger.debug(f"已添加来自 {source} 的任务配置")
+            return task
         except Exception as err:
             logger.error(f"创建来自 {source} 的任务失败: {err}")
+            return None
+
+    if ACCOUNTS_DB_PATH:
+        # 使用账号存储时不再扫描 user 目录和环境变量
+        store = get_account_store()
+        if store is None:
+            return
+        accounts = (
+            store.load(share["account_ids"])
+            if share is not None
+            else store.select(**_account_filters(selected_files))
+        )
+        for account_id, name, config in accounts:
+            task = create(
+                f"账号存储 {name or desensitize_phone(account_id)}", config=config, store=store
+            )
+            if task is not None:
+                yield task
+        return
 
-    # 处理环境变量中的配置
-    for config in user_configs:
-        add_task("环境变量", config=config)
+    # 处理环境变量中的配置（分给工作进程时已在父进程中解码）
+    env_configs = share["env_configs"] if share is not None else _iter_env_configs()
+    for config in env_configs:
+        task = create("环境变量", config=config)
+        if task is not None:
+            yield task
 
     # 处理配置文件
-    for name in json_files:
-        file_path = os.path.join(USER_DIR, f"{name}.json")
-        add_task(f"配置文件 {name}", path=file_path)
+    names = share["files"] if share is not None else _list_config_files(selected_files)
+    for name in names:
+        task = create(f"配置文件 {name}", path=os.path.join(USER_DIR, f"{name}.json"))
+        if task is not None:
+            yield task
+
+
+def manage_accounts(
+    action: str, directory: str, selected_files: Optional[List[str]] = None
+) -> int:
+    """
+    管理账号存储（ACCOUNTS_DB_PATH）中的账号。
+
+    Args:
+        action (str): import 从 directory 下的配置文件和环境变量 USER 导入（已存在的账号被覆盖）；
+            export 将符合条件的账号导出为 directory 下每个账号一个配置文件；count 统计符合条件的账号数。
+        directory (str): 配置文件目录。
+        selected_files (Optional[List[str]]): 导入时只导入这些配置文件，导出和统计时只选这些账号。
+
+    Returns:
+        int: 导入、导出或统计的账号数。
+
+    Raises:
+        ValueError: 未设置账号存储路径或操作无效。
+    """
+    store = get_account_store()
+    if store is None:
+        raise ValueError("请用 --accounts-db 指定账号存储路径")
+    if action == "import":
+        count = store.import_directory(directory, selected_files)
+        count += store.upsert_many((None, config) for config in _iter_env_configs())
+        logger.info(f"已导入 {count} 个账号，账号存储中共 {store.count()} 个账号")
+    elif action == "export":
+        count = store.export_directory(directory, **_account_filters(selected_files))
+        logger.info(f"已导出 {count} 个账号到 {directory}")
+    elif action == "count":
+        count = store.count(**_account_filters(selected_files))
+        logger.info(f"符合条件的账号共 {count} 个")
+    else:
+        raise ValueError(f"无效的操作: {action}")
+    return count
+
+
+def query_history(
+    query: str,
+    task_type: str = "打卡",
+    days: Optional[int] = None,
+    until: Optional[str] = None,
+    phase_name: Optional[str] = None,
+    account: Optional[str] = None,
+    limit: int = 20,
+) -> None:
+    """
+    查询执行历史（RUN_HISTORY_PATH）并打印结果。
+
+    Args:
+        query (str): streaks 最近 days 天（默认 3）每天 task_type 都失败的账号；durations 最近 days 天
+            （默认 7）每天的耗时分布（phase_name 为空时为总耗时）；summary 最近 days 天（默认 7）每天
+            各任务的结果数和重试、验证码尝试次数；account 账号 account 最近 limit 次执行。
+        task_type (str): streaks 的任务类型，默认为 打卡。
+        days (Optional[int]): 天数，默认见 query。
+        until (Optional[str]): streaks 的最后一天（YYYY-MM-DD），默认为今天。
+        phase_name (Optional[str]): durations 统计的阶段（见 _run），例如 login、clock_in。
+        account (Optional[str]): account 查询的手机号。
+        limit (int): account 查询返回的执行次数。
+
+    Raises:
+        ValueError: 未设置执行历史路径、缺少参数或查询无效。
+    """
+    history = get_run_history()
+    if history is None:
+        raise ValueError("请用 --run-history 指定执行历史路径")
+    if query == "streaks":
+        days = days or 3
+        rows = history.failure_streaks(task_type, days, until)
+        print(f"最近 {days} 天每天{task_type}都失败的账号：{len(rows)} 个")
+        for row in rows:
+            print(f"  {row['account']}  {row['last_message'] or ''}")
+    elif query == "durations":
+        days = days or 7
+        print(f"{phase_name or '总耗时'}（毫秒）")
+        print(f"{'日期':<12}{'次数':>8}{'p50':>10}{'p95':>10}{'最大':>10}")
+        for row in history.duration_stats(days, phase_name):
+            print(
+                f"{row['date']:<12}{row['runs']:>8}{row['p50']:>10.0f}"
+                f"{row['p95']:>10.0f}{row['max']:>10.0f}"
+            )
+    elif query == "summary":
+        days = days or 7
+        print(f"{'日期':<12}{'任务':<10}{'成功':>6}{'失败':>6}{'跳过':>6}{'执行':>8}{'重试':>8}{'验证码':>8}")
+        for row in history.daily_summary(days):
+            print(
+                f"{row['date']:<12}{row['task_type']:<10}{row['success']:>6}{row['fail']:>6}"
+                f"{row['skip']:>6}{row['runs']:>8}{row['retries']:>8}{row['captcha_attempts']:>8}"
+            )
+    elif query == "account":
+        if not account:
+            raise ValueError("account 查询需要 --phone 指定手机号")
+        for run in history.account_runs(account, limit):
+            started = datetime.fromtimestamp(run["started_at"])
+            phases = " ".join(f"{k}={v:.0f}" for k, v in run["phases"].items())
+            print(
+                f"{started:%Y-%m-%d %H:%M:%S}  耗时 {run['duration_ms'] or 0:.0f}ms  "
+                f"重试 {run['retries']}  验证码 {run['captcha_attempts']}  {phases}"
+            )
+            for task in run["tasks"]:
+                print(f"    {task['task_type']} {task['status']}: {task['message']}")
+    else:
+        raise ValueError(f"无效的查询: {query}")
+
+
+def _execute_tasks(
+    selected_files: Optional[List[str]] = None,
+    queue_url: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    share: Optional[Dict[str, List[Any]]] = None,
+):
+    """
+    读取配置并并发执行所有用户的任务。
+
+    账号按需读取，同时在执行或排队的最多 MAX_THREADS 个；每个账号结束后只保留精简的结果记录
+    （写入 RUN_LOG_PATH 并计入统计），因此内存占用取决于并发数而不是账号总数。
 
-    if not tasks:
-        logger.error("没有成功创建任何任务")
+    Args:
+        selected_files (Optional[List[str]]): 指定配置文件列表（不含扩展名），默认为 None。
+        queue_url (Optional[str]): 多节点共享的租约队列地址，默认为 None 时在本机执行。
+        lease_seconds (float): 租约时长（秒）。
+        share (Optional[Dict[str, List[Any]]]): 只执行这一份本地账号（见 _partition_sources）。
+    """
+    logger.info("开始执行工学云任务")
+    configure_captcha_cache(CAPTCHA_CACHE_PATH, CAPTCHA_CACHE_SIZE)
+
+    tasks = _iter_tasks(selected_files, share)
+    if queue_url:
+        _execute_distributed(tasks, queue_url, lease_seconds)
+        logger.info("工学云任务执行结束")
         return
 
-    # 执行任务
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_task = {executor.submit(run, task): task for task in tasks}
-        for future in concurrent.futures.as_completed(future_to_task):
-            task = future_to_task[future]
-            try:
-                future.result()
-            except Exception as e:
-                logger.error(f"任务 {task} 处理过程中发生错误: {e}")
+    run_log = None
+    if RUN_LOG_PATH:
+        try:
+            run_log = RunLog(RUN_LOG_PATH)
+        except OSError as e:
+            logger.error(f"打开执行日志 {RUN_LOG_PATH} 失败: {e}")
+    statuses: Counter = Counter()
 
-    logger.info("工学云任务执行结束")
+    def on_done(task: ConfigManager, future: concurrent.futures.Future) -> None:
+        try:
+            records = future.result()
+        except Exception as e:
+            logger.error(f"任务 {task} 处理过程中发生错误: {e}")
+            records = compact_results(
+                [{"status": "fail", "message": f"执行任务时发生错误: {e}", "task_type": "任务执行"}]
+            )
+        statuses.update(record["status"] for record in records)
+        if run_log is not None:
+            run_log.write(_ledger_account(task), records)
+
+    try:
+        count = run_bounded(run, tasks, MAX_THREADS, on_done)
+    finally:
+        if run_log is not None:
+            run_log.close()
+
+    if not count:
+        logger.warning("未找到任何有效配置")
+        return
+    logger.info(f"工学云任务执行结束：{count} 个账号，任务结果 {dict(statuses)}")
 
 
 if __name__ == "__main__":
@@ -592,7 +1660,323 @@ if __name__ == "__main__":
         nargs="+",
         help="指定要执行的配置文件名（不带路径和后缀），可以一次性指定多个",
     )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        help="运行结束时将指标写入该 Prometheus textfile",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        help="运行结束时将指标摘要写入该 JSON 文件",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="在本机该端口提供 /metrics 指标服务",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        help="记录各阶段耗时，并在运行结束时导出为 Chrome trace JSON（chrome://tracing / Perfetto）",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻运行，按 --schedule 指定的时刻为每个账号执行任务，并自动加载 user 目录的变更",
+    )
+    parser.add_argument(
+        "--schedule",
+        type=str,
+        nargs="+",
+        help="守护进程模式下每日执行的时刻（HH:MM），默认 08:00 18:00",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=10,
+        help="守护进程模式下每次执行随机延后的最大分钟数，默认 10",
+    )
+    parser.add_argument(
+        "--queue",
+        type=str,
+        help="多节点共享的租约队列，例如 sqlite:///mnt/shared/queue.db 或 redis://host:6379/0",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=f"共享队列的租约时长（秒），默认 {DEFAULT_LEASE_SECONDS}",
+    )
+    parser.add_argument(
+        "--run-log",
+        type=str,
+        default=None,
+        help="每个账号结束时将精简的任务结果追加到该 JSON Lines 文件",
+    )
+    parser.add_argument(
+        "--run-history",
+        type=str,
+        default=RUN_HISTORY_PATH,
+        help="执行历史路径（SQLite），记录每个账号每次执行的结果、耗时、重试和验证码尝试次数，传空字符串关闭",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=MAX_THREADS,
+        help=f"同时在执行或等待执行的账号数上限，账号按需读取，默认 {MAX_THREADS}",
+    )
+    parser.add_argument(
+        "--accounts-db",
+        type=str,
+        default=None,
+        help="账号存储路径（SQLite），设置后从中选择账号执行，代替 user 目录和环境变量 USER",
+    )
+    parser.add_argument(
+        "--tag",
+        type=str,
+        nargs="+",
+        help="只选择带有其中任一标签（配置中的 config.tags）的账号，需要 --accounts-db",
+    )
+    parser.add_argument(
+        "--school",
+        type=str,
+        help="只选择该学校的账号（登录后获取），需要 --accounts-db",
+    )
+    parser.add_argument(
+        "--snowflake-id",
+        type=str,
+        help="只选择该学校 snowFlakeId 的账号（登录后获取），需要 --accounts-db",
+    )
+    parser.add_argument(
+        "--due",
+        action="store_true",
+        help="只选择当前窗口（日期 + 上午/下午）尚未执行成功的账号，需要 --accounts-db",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="预先 fork 的工作进程数，验证码模型的权重在工作进程间共享（需先运行 benchmark/share_models.py），默认不使用",
+    )
+    parser.add_argument(
+        "--account-deadline",
+        type=float,
+        default=ACCOUNT_DEADLINE,
+        help=f"单个账号一次执行的时间预算（秒），0 表示不限制，默认 {ACCOUNT_DEADLINE}",
+    )
+    parser.add_argument(
+        "--ledger",
+        type=str,
+        default=LEDGER_PATH,
+        help="本地执行台账路径，传空字符串关闭台账",
+    )
+    parser.add_argument(
+        "--report-history",
+        type=str,
+        default=REPORT_HISTORY_PATH,
+        help="已提交报告的本地镜像路径，传空字符串关闭",
+    )
+    parser.add_argument(
+        "--plan-cache",
+        type=str,
+        default=PLAN_CACHE_PATH,
+        help="实习计划缓存路径，传空字符串关闭",
+    )
+    parser.add_argument(
+        "--plan-cache-ttl",
+        type=float,
+        default=PLAN_CACHE_TTL,
+        help=f"实习计划缓存的有效期（秒），0 表示永不过期，默认 {PLAN_CACHE_TTL}",
+    )
+    parser.add_argument(
+        "--captcha-cache",
+        type=str,
+        default=CAPTCHA_CACHE_PATH,
+        help="验证码解的本地缓存路径，传空字符串关闭",
+    )
+    parser.add_argument(
+        "--captcha-cache-size",
+        type=int,
+        default=CAPTCHA_CACHE_SIZE,
+        help=f"验证码缓存最多保留的条数，默认 {CAPTCHA_CACHE_SIZE}",
+    )
+    parser.add_argument(
+        "--captcha-speculation-cap",
+        type=int,
+        default=CAPTCHA_SLOTS.limit,
+        help=f"登录时全部账号合计额外并行尝试的验证码数上限（账号配置 captchaParallel 大于 1 时生效），默认 {CAPTCHA_SLOTS.limit}",
+    )
+    parser.add_argument(
+        "--verify-remote",
+        action="store_true",
+        help="忽略本地执行台账，总是向服务器确认打卡和报告是否已完成",
+    )
+    parser.add_argument(
+        "--ort-threads",
+        type=int,
+        default=None,
+        help="验证码模型每个推理会话的 intra-op 线程数，默认按 CPU 核数和同时工作的账号数推算",
+    )
+    parser.add_argument(
+        "--ort-inter-threads",
+        type=int,
+        default=None,
+        help="验证码模型每个推理会话的 inter-op 线程数，默认 1",
+    )
+    parser.add_argument(
+        "--ort-optimization",
+        choices=["disable", "basic", "extended", "all"],
+        default=None,
+        help="验证码模型的图优化级别，默认 all",
+    )
+    parser.add_argument(
+        "--ort-cache",
+        type=str,
+        default=None,
+        help="保存优化后验证码模型的目录，再次启动时直接加载",
+    )
+    parser.add_argument(
+        "--ort-providers",
+        type=str,
+        default=None,
+        help="按优先级排列、逗号分隔的 onnxruntime 执行提供程序，例如 OpenVINOExecutionProvider,CPUExecutionProvider",
+    )
+    parser.add_argument(
+        "--quantized-models",
+        action="store_true",
+        help="加载 INT8 量化后的验证码模型（由 benchmark/quantize_models.py 生成）",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="打印启动时各模块的导入耗时后退出",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    accounts_parser = subparsers.add_parser(
+        "accounts", help="在账号存储与 user 目录的配置文件之间导入导出账号"
+    )
+    accounts_parser.add_argument("action", choices=["import", "export", "count"])
+    accounts_parser.add_argument(
+        "--dir",
+        type=str,
+        default=USER_DIR,
+        help="导入或导出的配置文件目录，默认为 user 目录",
+    )
+    history_parser = subparsers.add_parser(
+        "history", help="查询执行历史：连续失败的账号、耗时分布、每日汇总、单个账号的执行记录"
+    )
+    history_parser.add_argument(
+        "query", choices=["streaks", "durations", "summary", "account"]
+    )
+    history_parser.add_argument(
+        "--task", type=str, default="打卡", help="streaks 的任务类型，默认为 打卡"
+    )
+    history_parser.add_argument(
+        "--days", type=int, default=None, help="天数，streaks 默认 3，durations 和 summary 默认 7"
+    )
+    history_parser.add_argument(
+        "--until", type=str, default=None, help="streaks 的最后一天（YYYY-MM-DD），默认为今天"
+    )
+    history_parser.add_argument(
+        "--phase", type=str, default=None, help="durations 统计的阶段，例如 login、clock_in，默认为总耗时"
+    )
+    history_parser.add_argument("--phone", type=str, help="account 查询的手机号")
+    history_parser.add_argument(
+        "--limit", type=int, default=20, help="account 查询返回的执行次数，默认 20"
+    )
     args = parser.parse_args()
 
+    if args.startup_profile:
+        print_startup_profile()
+        raise SystemExit(0)
+
+    if args.workers and args.daemon:
+        parser.error("--workers 不能与 --daemon 同时使用")
+    if args.accounts_db and args.daemon:
+        parser.error("--accounts-db 不能与 --daemon 同时使用")
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    ort_settings = {
+        "intra_op_threads": args.ort_threads,
+        "inter_op_threads": args.ort_inter_threads,
+        "graph_optimization": args.ort_optimization,
+        "optimized_model_dir": args.ort_cache,
+        "providers": args.ort_providers.split(",") if args.ort_providers else None,
+        "quantized": True if args.quantized_models else None,
+    }
+    if any(value is not None for value in ort_settings.values()):
+        # 只在需要时导入，避免不识别点选验证码的运行加载 OpenCV
+        from util.CaptchaUtils import configure_inference
+
+        configure_inference(**ort_settings)
+
+    ACCOUNT_DEADLINE = args.account_deadline
+    LEDGER_PATH = args.ledger
+    REPORT_HISTORY_PATH = args.report_history
+    PLAN_CACHE_PATH = args.plan_cache
+    PLAN_CACHE_TTL = args.plan_cache_ttl
+    CAPTCHA_CACHE_PATH = args.captcha_cache
+    CAPTCHA_CACHE_SIZE = args.captcha_cache_size
+    CAPTCHA_SLOTS.set_limit(args.captcha_speculation_cap)
+    VERIFY_REMOTE = args.verify_remote
+    ACCOUNTS_DB_PATH = args.accounts_db
+    RUN_LOG_PATH = args.run_log
+    RUN_HISTORY_PATH = args.run_history
+    MAX_THREADS = args.max_in_flight
+    ACCOUNT_FILTERS = {
+        "tags": args.tag,
+        "school": args.school,
+        "snowflake_id": args.snowflake_id,
+        "due": args.due,
+    }
+
     # 执行命令
-    execute_tasks(args.file)
+    if args.command == "accounts":
+        try:
+            manage_accounts(args.action, args.dir, args.file)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "history":
+        try:
+            query_history(
+                args.query,
+                args.task,
+                args.days,
+                args.until,
+                args.phase,
+                args.phone,
+                args.limit,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.daemon:
+        run_daemon(
+            args.file,
+            args.schedule,
+            args.jitter,
+            args.metrics_file,
+            args.metrics_json,
+            args.trace,
+        )
+    elif args.workers:
+        execute_prefork(
+            args.workers,
+            args.file,
+            args.metrics_file,
+            args.metrics_json,
+            args.trace,
+            args.queue,
+            args.lease_seconds,
+        )
+    else:
+        execute_tasks(
+            args.file,
+            args.metrics_file,
+            args.metrics_json,
+            args.trace,
+            args.queue,
+            args.lease_seconds,
+        )
@@ -0,0 +1,304 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from util import JsonCodec
+from util.JsonCodec import dumps_str, loads
+from util.SqliteStore import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+# 导入和分页读取时每批的账号数
+DEFAULT_BATCH_SIZE = 500
+
+
+def account_id_of(config: Dict[str, Any]) -> Optional[str]:
+    """账号的唯一标识：配置中的手机号。"""
+    phone = ((config.get("config") or {}).get("user") or {}).get("phone")
+    return str(phone) if phone else None
+
+
+def _json_path(keys: Sequence[str]) -> str:
+    """将键名序列转换为 SQLite JSON 路径，键名加引号以允许点号等特殊字符。"""
+    return "$" + "".join('."' + key.replace('"', '\\"') + '"' for key in keys)
+
+
+class AccountStore(SqliteStore):
+    """
+    账号配置的集中存储，代替 user 目录下每个账号一个 JSON 文件。
+
+    每行保存一个账号的完整配置（与 user/*.json 的内容相同），并把用于筛选的字段单独建索引：
+    学校和 snowFlakeId（来自登录后的 userInfo.orgJson）、标签（来自 config.tags）以及最近一次
+    执行成功的窗口（用于只选出当前窗口尚未完成的账号）。select() 按主键分页读取，登录信息和实习计划
+    的更新只改写对应账号的一行，启动和更新的开销都与账号总数无关。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS accounts (
+        account_id TEXT PRIMARY KEY,
+        name TEXT,
+        config TEXT NOT NULL,
+        school TEXT,
+        snowflake_id TEXT,
+        last_window TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS accounts_school ON accounts (school);
+    CREATE INDEX IF NOT EXISTS accounts_snowflake ON accounts (snowflake_id);
+    CREATE INDEX IF NOT EXISTS accounts_window ON accounts (last_window);
+    CREATE TABLE IF NOT EXISTS account_tags (
+        tag TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        PRIMARY KEY (tag, account_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS account_tags_account ON account_tags (account_id);
+    """
+
+    # 由配置派生、用于筛选的列（更新配置后重新计算）
+    _DERIVED = (
+        "school = json_extract(config, '$.userInfo.orgJson.schoolName'), "
+        "snowflake_id = json_extract(config, '$.userInfo.orgJson.snowFlakeId')"
+    )
+
+    def upsert_many(
+        self,
+        configs: Iterable[Tuple[Optional[str], Dict[str, Any]]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """
+        导入（或覆盖）账号配置，每 batch_size 个账号一个事务，configs 可以是生成器。
+
+        Args:
+            configs (Iterable[Tuple[Optional[str], Dict[str, Any]]]): (名称, 配置) 序列，名称用于导出时的文件名。
+            batch_size (int): 每个事务写入的账号数。
+
+        Returns:
+            int: 导入的账号数（缺少手机号的配置被跳过）。
+        """
+        count = 0
+        batch: List[Tuple[str, Optional[str], Dict[str, Any]]] = []
+        for name, config in configs:
+            account_id = account_id_of(config)
+            if account_id is None:
+                logger.error(f"配置 {name or ''} 缺少手机号，已跳过")
+                continue
+            batch.append((account_id, name, config))
+            if len(batch) >= batch_size:
+                count += self._write_batch(batch)
+                batch = []
+        if batch:
+            count += self._write_batch(batch)
+        return count
+
+    def _write_batch(self, batch: List[Tuple[str, Optional[str], Dict[str, Any]]]) -> int:
+        now = time.time()
+        with self.transaction() as conn:
+            for account_id, name, config in batch:
+                conn.execute(
+                    "INSERT INTO accounts (account_id, name, config, updated_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (account_id) DO UPDATE SET "
+                    "name = COALESCE(excluded.name, name), config = excluded.config, "
+                    "updated_at = excluded.updated_at",
+                    (account_id, name, dumps_str(config), now),
+                )
+                conn.execute(
+                    f"UPDATE accounts SET {self._DERIVED} WHERE account_id = ?", (account_id,)
+                )
+                conn.execute("DELETE FROM account_tags WHERE account_id = ?", (account_id,))
+                tags = (config.get("config") or {}).get("tags") or []
+                conn.executemany(
+                    "INSERT OR IGNORE INTO account_tags (tag, account_id) VALUES (?, ?)",
+                    [(str(tag), account_id) for tag in tags],
+                )
+        return len(batch)
+
+    @staticmethod
+    def _where(
+        tags: Optional[Sequence[str]] = None,
+        school: Optional[str] = None,
+        snowflake_id: Optional[str] = None,
+        due_window: Optional[str] = None,
+        names: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if tags:
+            clauses.append(
+                "account_id IN (SELECT account_id FROM account_tags "
+                f"WHERE tag IN ({','.join('?' * len(tags))}))"
+            )
+            params.extend(tags)
+        if school:
+            clauses.append("school = ?")
+            params.append(school)
+        if snowflake_id:
+            clauses.append("snowflake_id = ?")
+            params.append(str(snowflake_id))
+        if due_window:
+            clauses.append("(last_window IS NULL OR last_window != ?)")
+            params.append(due_window)
+        if names:
+            placeholders = ",".join("?" * len(names))
+            clauses.append(f"(name IN ({placeholders}) OR account_id IN ({placeholders}))")
+            params.extend(names)
+            params.extend(names)
+        return clauses, params
+
+    def select(
+        self, batch_size: int = DEFAULT_BATCH_SIZE, **filters: Any
+    ) -> Iterator[Tuple[str, Optional[str], Dict[str, Any]]]:
+        """
+        按条件逐个返回账号，按主键分页读取，内存中最多只有一页。
+
+        Args:
+            batch_size (int): 每页的账号数。
+            **filters: 筛选条件，可组合使用：
+                tags (Sequence[str]): 带有其中任一标签；
+                school (str): 学校名称；
+                snowflake_id (str): 学校的 snowFlakeId；
+                due_window (str): 该窗口（见 main.current_window）尚未执行成功；
+                names (Sequence[str]): 导入时的配置文件名或手机号。
+
+        Yields:
+            Tuple[str, Optional[str], Dict[str, Any]]: (手机号, 名称, 配置)。
+        """
+        clauses, params = self._where(**filters)
+        after = ""
+        while True:
+            where = " AND ".join(clauses + ["account_id > ?"])
+            rows = self.conn.execute(
+                f"SELECT account_id, name, config FROM accounts WHERE {where} "
+                "ORDER BY account_id LIMIT ?",
+                (*params, after, batch_size),
+            ).fetchall()
+            for row in rows:
+                yield row["account_id"], row["name"], loads(row["config"])
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]["account_id"]
+
+    def ids(self, **filters: Any) -> List[str]:
+        """符合条件的手机号（按主键排序），条件同 select()；只读取主键，不解析配置。"""
+        clauses, params = self._where(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT account_id FROM accounts {where} ORDER BY account_id", params
+        )
+        return [row[0] for row in rows]
+
+    def load(
+        self, account_ids: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[Tuple[str, Optional[str], Dict[str, Any]]]:
+        """
+        按手机号每 batch_size 个一批读取账号，已不存在的账号被跳过。
+
+        Args:
+            account_ids (Sequence[str]): 手机号列表（例如 ids() 的一部分）。
+            batch_size (int): 每批的账号数。
+
+        Yields:
+            Tuple[str, Optional[str], Dict[str, Any]]: (手机号, 名称, 配置)，与 select() 相同。
+        """
+        for start in range(0, len(account_ids), batch_size):
+            batch = account_ids[start : start + batch_size]
+            rows = self.conn.execute(
+                "SELECT account_id, name, config FROM accounts "
+                f"WHERE account_id IN ({','.join('?' * len(batch))}) ORDER BY account_id",
+                batch,
+            ).fetchall()
+            for row in rows:
+                yield row["account_id"], row["name"], loads(row["config"])
+
+    def count(self, **filters: Any) -> int:
+        """符合条件的账号数，条件同 select()。"""
+        clauses, params = self._where(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        row = self.conn.execute(f"SELECT COUNT(*) FROM accounts {where}", params).fetchone()
+        return row[0]
+
+    def update_value(self, account_id: str, keys: Sequence[str], value: Any) -> None:
+        """
+        只改写一个账号配置中的一个字段（如登录后的 userInfo、实习计划 planInfo）。
+
+        Args:
+            account_id (str): 手机号。
+            keys (Sequence[str]): 键名序列，例如 ("userInfo",)。
+            value (Any): 新值。
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE accounts SET config = json_set(config, ?, json(?)), updated_at = ? "
+                "WHERE account_id = ?",
+                (_json_path(keys), dumps_str(value), time.time(), account_id),
+            )
+            conn.execute(
+                f"UPDATE accounts SET {self._DERIVED} WHERE account_id = ?", (account_id,)
+            )
+
+    def mark_window(self, account_id: str, window: str) -> None:
+        """记录账号在该窗口已执行成功。"""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE accounts SET last_window = ? WHERE account_id = ?", (window, account_id)
+            )
+
+    def remove(self, account_id: str) -> None:
+        """删除一个账号。"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM account_tags WHERE account_id = ?", (account_id,))
+            conn.execute("DELETE FROM accounts WHERE account_id = ?", (account_id,))
+
+    def import_directory(
+        self,
+        directory: str,
+        names: Optional[Sequence[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """
+        从每个账号一个 JSON 文件的目录（user/）导入，文件逐个读取。
+
+        Args:
+            directory (str): 配置文件目录。
+            names (Optional[Sequence[str]]): 只导入这些文件（不含扩展名），默认为全部。
+            batch_size (int): 每个事务写入的账号数。
+
+        Returns:
+            int: 导入的账号数。
+        """
+        selected = set(names) if names else None
+
+        def configs() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name[:-5]
+                    if not entry.name.endswith(".json") or (selected and name not in selected):
+                        continue
+                    try:
+                        with open(entry.path, "rb") as f:
+                            yield name, JsonCodec.load(f)
+                    except (OSError, ValueError) as e:
+                        logger.error(f"读取配置文件 {entry.path} 失败: {e}")
+
+        return self.upsert_many(configs(), batch_size)
+
+    def export_directory(self, directory: str, **filters: Any) -> int:
+        """
+        导出为每个账号一个 JSON 文件的目录，文件名为导入时的名称（没有时为手机号）。
+
+        Args:
+            directory (str): 目标目录，不存在时自动创建。
+            **filters: 筛选条件，同 select()。
+
+        Returns:
+            int: 导出的账号数。
+        """
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for account_id, name, config in self.select(**filters):
+            path = os.path.join(directory, f"{name or account_id}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                JsonCodec.dump_pretty(config, f)
+            count += 1
+        return count
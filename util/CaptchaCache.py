@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from util.JsonCodec import dumps_str, loads
+from util.SqliteStore import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+# 缓存的验证码解最多保留的条数，超出后淘汰最久未使用的
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class CaptchaCache(SqliteStore):
+    """
+    验证码解的本地缓存，键为验证码图片的感知哈希（由 CaptchaUtils 计算）。
+
+    服务器的验证码背景图来自有限的图片池，同一张图会反复出现。只有通过 /check 的解才会写入，
+    没有通过的解会被删除；条数超过 max_entries 时按最近使用时间淘汰（LRU）。
+    kind 为 blockPuzzle（解为缺口左右边界）或 clickWord（解为识别出的文字及其文本框）。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS captcha_cache (
+        kind TEXT NOT NULL,
+        image_hash TEXT NOT NULL,
+        solution TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (kind, image_hash)
+    );
+    CREATE INDEX IF NOT EXISTS captcha_cache_lru ON captcha_cache (last_used);
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, **kwargs):
+        """
+        Args:
+            path (str): 数据库文件路径。
+            max_entries (int): 最多保留的条数。
+        """
+        super().__init__(path, **kwargs)
+        self.max_entries = max_entries
+
+    def get(self, kind: str, image_hash: str) -> Optional[Dict[str, Any]]:
+        """查找缓存的解，命中时更新最近使用时间。"""
+        row = self.conn.execute(
+            "SELECT solution FROM captcha_cache WHERE kind = ? AND image_hash = ?",
+            (kind, image_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE captcha_cache SET hits = hits + 1, last_used = ? "
+                "WHERE kind = ? AND image_hash = ?",
+                (time.time(), kind, image_hash),
+            )
+        return loads(row["solution"])
+
+    def put(self, kind: str, image_hash: str, solution: Dict[str, Any]) -> None:
+        """写入（或刷新）一个通过校验的解，并淘汰超出上限的旧条目。"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO captcha_cache (kind, image_hash, solution, last_used) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (kind, image_hash) DO UPDATE SET "
+                "solution = excluded.solution, last_used = excluded.last_used",
+                (kind, image_hash, dumps_str(solution), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM captcha_cache WHERE rowid IN ("
+                "SELECT rowid FROM captcha_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def evict(self, kind: str, image_hash: str) -> None:
+        """删除一个没有通过校验的解。"""
+        with self.transaction() as conn:
+            conn.execute(
+                "DELETE FROM captcha_cache WHERE kind = ? AND image_hash = ?",
+                (kind, image_hash),
+            )
+
+
+# 进程内共用的验证码缓存，由 configure_captcha_cache() 设置
+_cache: Optional[CaptchaCache] = None
+_cache_config: Dict[str, Any] = {"path": None, "max_entries": DEFAULT_MAX_ENTRIES}
+_cache_lock = threading.Lock()
+
+
+def configure_captcha_cache(
+    path: Optional[str], max_entries: int = DEFAULT_MAX_ENTRIES
+) -> None:
+    """
+    设置验证码缓存的路径和条数上限，缓存在第一次使用时才打开。
+
+    Args:
+        path (Optional[str]): 数据库文件路径，为空时不使用缓存。
+        max_entries (int): 最多保留的条数。
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None and _cache.path == path:
+            _cache.max_entries = max_entries
+        else:
+            _cache = None
+        _cache_config.update(path=path, max_entries=max_entries)
+
+
+def get_captcha_cache() -> Optional[CaptchaCache]:
+    """返回验证码缓存，未设置路径或打开失败时返回 None。"""
+    global _cache
+    with _cache_lock:
+        if _cache is None and _cache_config["path"]:
+            try:
+                _cache = CaptchaCache(_cache_config["path"], _cache_config["max_entries"])
+            except Exception as e:
+                # 打开失败时不再重试，识别照常进行
+                logger.error(f"打开验证码缓存 {_cache_config['path']} 失败: {e}")
+                _cache_config["path"] = None
+        return _cache
@@ -1,16 +1,64 @@
 import base64
 import json
 import logging
+import mmap
+import os
 import random
+import sqlite3
 import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from cv2.typing import MatLike
 import numpy as np
-import onnxruntime as ort
 import cv2
 
+from util.CaptchaCache import get_captcha_cache
+from util.Concurrency import ACCOUNT_SLOTS
+from util.Metrics import METRICS
+from util.Tracing import span
+
 logger = logging.getLogger(__name__)
 
+# 各识别阶段耗时的线程内收集器，仅在 record_stages() 期间启用
+_stage_recorder = threading.local()
+
+
+@contextmanager
+def record_stages() -> Iterator[Dict[str, float]]:
+    """
+    收集当前线程内验证码识别各阶段（decode、canny、matchTemplate、yolo、ocr）的累计耗时。
+
+    Yields:
+        Dict[str, float]: 阶段名到累计耗时（秒）的映射，退出上下文后仍可读取。
+    """
+    timings: Dict[str, float] = defaultdict(float)
+    previous = getattr(_stage_recorder, "timings", None)
+    _stage_recorder.timings = timings
+    try:
+        yield timings
+    finally:
+        _stage_recorder.timings = previous
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """记录一个识别阶段的耗时（同时作为追踪 span），未启用收集时几乎没有开销。"""
+    timings = getattr(_stage_recorder, "timings", None)
+    with span(f"captcha.{name}"):
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] += time.perf_counter() - start
+
 
 def calculate_precise_slider_distance(
     target_start_x: int, target_end_x: int, slider_width: int
@@ -95,24 +143,27 @@ def slide_match(target_bytes: bytes, background_bytes: bytes) -> list:
     """
     try:
         # 解码滑块和背景图像为OpenCV格式
-        target = cv2.imdecode(
-            np.frombuffer(target_bytes, np.uint8), cv2.IMREAD_ANYCOLOR
-        )
-        background = cv2.imdecode(
-            np.frombuffer(background_bytes, np.uint8), cv2.IMREAD_ANYCOLOR
-        )
+        with _stage("decode"):
+            target = cv2.imdecode(
+                np.frombuffer(target_bytes, np.uint8), cv2.IMREAD_ANYCOLOR
+            )
+            background = cv2.imdecode(
+                np.frombuffer(background_bytes, np.uint8), cv2.IMREAD_ANYCOLOR
+            )
 
         # 应用Canny边缘检测，将图像转换为二值图像
-        background = cv2.Canny(background, 100, 200)
-        target = cv2.Canny(target, 100, 200)
+        with _stage("canny"):
+            background = cv2.Canny(background, 100, 200)
+            target = cv2.Canny(target, 100, 200)
 
-        # 将二值图像转换为RGB格式，便于后续处理
-        background = cv2.cvtColor(background, cv2.COLOR_GRAY2RGB)
-        target = cv2.cvtColor(target, cv2.COLOR_GRAY2RGB)
+            # 将二值图像转换为RGB格式，便于后续处理
+            background = cv2.cvtColor(background, cv2.COLOR_GRAY2RGB)
+            target = cv2.cvtColor(target, cv2.COLOR_GRAY2RGB)
 
         # 使用模板匹配算法找到滑块在背景中的最佳匹配位置
-        res = cv2.matchTemplate(background, target, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(res)  # 获取最大相似度及其对应位置
+        with _stage("matchTemplate"):
+            res = cv2.matchTemplate(background, target, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)  # 获取最大相似度及其对应位置
 
         # 获取滑块的高度和宽度
         h, w = target.shape[:2]
@@ -128,24 +179,250 @@ def slide_match(target_bytes: bytes, background_bytes: bytes) -> list:
         raise
 
 
-def recognize_blockPuzzle_captcha(target: str, background: str) -> str:
+# 只在滑块所在行带内搜索时，上下各多留的行数，容忍缺口与滑块的少量垂直偏差
+SLIDE_BAND_MARGIN = 2
+# 由粗到精匹配时，在原分辨率上围绕粗匹配结果搜索的水平范围（像素）
+SLIDE_REFINE_RADIUS = 4
+
+
+def _slider_band(target: np.ndarray) -> Tuple[int, int]:
+    """根据滑块图的 alpha 通道确定拼图块所在的行范围，没有 alpha 通道或全透明时返回整幅图。"""
+    height = target.shape[0]
+    if target.ndim != 3 or target.shape[2] != 4:
+        return 0, height
+    rows = np.flatnonzero(target[:, :, 3].max(axis=1))
+    if rows.size == 0:
+        return 0, height
+    return int(rows[0]), int(rows[-1]) + 1
+
+
+def _match(background: np.ndarray, template: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+    res = cv2.matchTemplate(background, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return float(max_val), max_loc
+
+
+def slide_match_fast(
+    target_bytes: bytes, background_bytes: bytes, pyramid: bool = False
+) -> Tuple[int, int, float]:
+    """
+    获取验证区域坐标，结果与 slide_match 一致，但计算量小得多。
+
+    与 slide_match 的区别：边缘图保持单通道（不再转回三通道）；只在滑块 alpha 通道给出的行带内搜索；
+    pyramid 为 True 时先在半分辨率上粗匹配，再在原分辨率上只搜索粗匹配位置附近。
+
+    Args:
+        target_bytes (bytes): 滑块图片二进制数据。
+        background_bytes (bytes): 背景图片二进制数据。
+        pyramid (bool): 是否使用由粗到精的两级匹配。
+
+    Returns:
+        Tuple[int, int, float]: 目标区域左边界坐标、右边界坐标和匹配相似度（TM_CCOEFF_NORMED 的最大值）。
+    """
+    try:
+        target, background = _decode_block_puzzle(target_bytes, background_bytes)
+        return _slide_match_images(target, background, pyramid)[:3]
+
+    except Exception as e:
+        logger.error(f"滑块匹配时发生错误: {e}")
+        raise
+
+
+def _decode_block_puzzle(
+    target_bytes: bytes, background_bytes: bytes
+) -> Tuple[np.ndarray, np.ndarray]:
+    """解码滑块图（保留 alpha 通道）和背景图（灰度）。"""
+    with _stage("decode"):
+        target = cv2.imdecode(np.frombuffer(target_bytes, np.uint8), cv2.IMREAD_UNCHANGED)
+        background = cv2.imdecode(
+            np.frombuffer(background_bytes, np.uint8), cv2.IMREAD_GRAYSCALE
+        )
+    return target, background
+
+
+def _slide_match_images(
+    target: np.ndarray, background: np.ndarray, pyramid: bool = False
+) -> Tuple[int, int, float, float]:
+    """
+    slide_match_fast 的匹配部分，输入为已解码的滑块图和灰度背景图。
+
+    Returns:
+        Tuple[int, int, float, float]: 左边界、右边界、匹配相似度和峰值余量（见 _peak_margin）。
+    """
+    # 滑块图与背景等高，拼图块只占其中一段行，缺口在背景的同一段行上
+    top, bottom = _slider_band(target)
+    band_top = max(0, top - SLIDE_BAND_MARGIN)
+    band_bottom = min(background.shape[0], bottom + SLIDE_BAND_MARGIN)
+
+    with _stage("canny"):
+        template = cv2.Canny(_to_gray(target)[top:bottom], 100, 200)
+        edges = cv2.Canny(background[band_top:band_bottom], 100, 200)
+
+    h, w = template.shape[:2]
+    with _stage("matchTemplate"):
+        if not pyramid:
+            res = cv2.matchTemplate(edges, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+            left = max_loc[0]
+            margin = _peak_margin(res, left, w // 2)
+        else:
+            coarse = cv2.matchTemplate(
+                cv2.pyrDown(edges), cv2.pyrDown(template), cv2.TM_CCOEFF_NORMED
+            )
+            _, _, _, coarse_loc = cv2.minMaxLoc(coarse)
+            margin = _peak_margin(coarse, coarse_loc[0], w // 4)
+            start = max(0, coarse_loc[0] * 2 - SLIDE_REFINE_RADIUS)
+            end = min(edges.shape[1], coarse_loc[0] * 2 + w + SLIDE_REFINE_RADIUS)
+            max_val, max_loc = _match(edges[:, start:end], template)
+            left = start + max_loc[0]
+
+    logger.info(f"滑块匹配成功，最大相似度: {max_val}，峰值余量: {margin:.3f}")
+    return int(left), int(left + w), float(max_val), margin
+
+
+def _peak_margin(res: np.ndarray, x: int, radius: int) -> float:
+    """
+    匹配结果的峰值余量：最佳位置的相似度减去离它 radius 以外的次佳位置的相似度。
+
+    相似度本身随背景纹理变化很大，不能区分对错；余量小说明另有一个几乎一样好的位置，结果不可靠。
+    """
+    scores = res.max(axis=0)
+    others = np.concatenate([scores[: max(0, x - radius)], scores[x + radius + 1 :]])
+    if others.size == 0:
+        return 1.0
+    return float(scores[x] - others.max())
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def perceptual_hash(image: np.ndarray) -> str:
+    """
+    计算图片的感知哈希（pHash）：缩小到 32x32 灰度图后做 DCT，取左上 8x8 低频系数与其中位数比较得到 64 位。
+
+    同一张图重新编码或有轻微噪声时哈希不变，可用作验证码图片的缓存键。
+
+    Returns:
+        str: 16 位十六进制字符串。
+    """
+    small = cv2.resize(_to_gray(image), (32, 32), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(small.astype(np.float32))[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return np.packbits(bits).tobytes().hex()
+
+
+# 当前线程最近一次识别的验证码（类型、图片哈希、解和置信度），等待 /check 的结果决定写入还是删除缓存
+_pending_solution = threading.local()
+
+# 各类验证码的最低置信度，低于该值时不提交 /check，直接换一张验证码
+# 滑块为峰值余量（在合成语料上识别正确的样本最低约 0.036）；点选为识别出的文字占比
+MIN_CONFIDENCE = {"blockPuzzle": 0.03, "clickWord": 1.0}
+
+
+def _lookup_solution(kind: str, image_hash: str) -> Optional[Dict[str, Any]]:
+    cache = get_captcha_cache()
+    if cache is None:
+        return None
+    try:
+        solution = cache.get(kind, image_hash)
+    except sqlite3.Error as e:
+        logger.warning(f"读取验证码缓存失败: {e}")
+        return None
+    METRICS.inc("captcha_cache_total", captcha_type=kind, result="hit" if solution else "miss")
+    return solution
+
+
+def captcha_confidence() -> Optional[float]:
+    """
+    当前线程最近一次识别的验证码的置信度，没有识别记录时返回 None。
+
+    滑块验证码为匹配的峰值余量（命中缓存时为 1），点选验证码为 wordList 中识别到的文字占比。
+    """
+    pending = getattr(_pending_solution, "value", None)
+    return pending[3] if pending is not None else None
+
+
+def captcha_confident() -> bool:
+    """当前线程最近一次识别的结果是否值得提交 /check（置信度不低于 MIN_CONFIDENCE）。"""
+    pending = getattr(_pending_solution, "value", None)
+    if pending is None:
+        return True
+    return pending[3] >= MIN_CONFIDENCE.get(pending[0], 0.0)
+
+
+def discard_captcha_solution() -> None:
+    """放弃当前线程最近一次识别的结果（没有提交 /check），不影响缓存。"""
+    _pending_solution.value = None
+
+
+def record_captcha_result(passed: bool) -> None:
+    """
+    记录当前线程最近一次识别的验证码是否通过 /check：通过的解写入缓存，没有通过的从缓存删除。
+
+    Args:
+        passed (bool): 是否通过校验。
+    """
+    pending = getattr(_pending_solution, "value", None)
+    _pending_solution.value = None
+    cache = get_captcha_cache()
+    if pending is None or cache is None:
+        return
+    kind, image_hash, solution, _ = pending
+    try:
+        if passed:
+            cache.put(kind, image_hash, solution)
+        else:
+            cache.evict(kind, image_hash)
+    except sqlite3.Error as e:
+        logger.warning(f"更新验证码缓存失败: {e}")
+
+
+def recognize_blockPuzzle_captcha(
+    target: str, background: str, pyramid: bool = False
+) -> str:
     """
     识别图像验证码。
 
     Args:
         target (str): 目标图像的二进制数据的base64编码。
         background (str): 背景图像的二进制数据的base64编码。
+        pyramid (bool): 滑块匹配是否使用由粗到精的两级匹配。
 
     Returns:
         str: 滑块需要滑动的距离。
     """
     try:
         # 将base64编码的字符串解码为二进制数据
-        target_bytes = base64.b64decode(target)
-        background_bytes = base64.b64decode(background)
-
-        # 调用滑块匹配算法获取目标区域的坐标
-        res = slide_match(target_bytes=target_bytes, background_bytes=background_bytes)
+        with _stage("decode"):
+            target_bytes = base64.b64decode(target)
+            background_bytes = base64.b64decode(background)
+        target_image, background_image = _decode_block_puzzle(target_bytes, background_bytes)
+
+        # 缺口位置随题目变化，缓存键同时包含背景图、拼图块和拼图块所在的行
+        top, bottom = _slider_band(target_image)
+        image_hash = (
+            f"{perceptual_hash(background_image)}:"
+            f"{perceptual_hash(target_image[top:bottom])}:{top}"
+        )
+        cached = _lookup_solution("blockPuzzle", image_hash)
+        if cached:
+            res, confidence = (cached["left"], cached["right"]), 1.0
+        else:
+            # 调用滑块匹配算法获取目标区域的坐标
+            left, right, _, confidence = _slide_match_images(
+                target_image, background_image, pyramid
+            )
+            res = (left, right)
+        _pending_solution.value = (
+            "blockPuzzle",
+            image_hash,
+            {"left": res[0], "right": res[1]},
+            confidence,
+        )
 
         # 从滑块图像提取宽度信息
         target_width = extract_png_width(target_bytes)
@@ -168,6 +445,287 @@ def recognize_blockPuzzle_captcha(target: str, background: str) -> str:
         raise
 
 
+# ONNX 推理会话的设置，通过 configure_inference() 修改
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+_inference_settings: Dict[str, Any] = {
+    # 每个会话的 intra-op 线程数，0 表示按 default_intra_op_threads() 推算
+    "intra_op_threads": 0,
+    # 模型是顺序执行的，inter-op 线程池用不上
+    "inter_op_threads": 1,
+    "graph_optimization": "all",
+    # 保存优化后模型的目录，再次启动时直接加载，省去图优化的时间；None 表示不保存
+    "optimized_model_dir": None,
+    # 按优先级排列的执行提供程序，未安装的会被跳过，CPUExecutionProvider 总是作为兜底
+    "providers": ["CPUExecutionProvider"],
+    # 是否加载 INT8 量化后的模型（由 benchmark/quantize_models.py 生成）
+    "quantized": False,
+    # 同时识别验证码的进程数（main.py --workers），推算默认线程数时 CPU 核数在进程间均分
+    "processes": 1,
+}
+
+MODEL_DIR = "./models"
+# 量化模型的文件名后缀
+QUANTIZED_SUFFIX = ".int8"
+
+
+def model_path(name: str) -> str:
+    """
+    返回验证码模型的路径：启用量化模型且量化模型存在时返回量化模型，否则返回原模型。
+
+    Args:
+        name (str): 模型名（不含扩展名），例如 yolov5n、ocr。
+    """
+    if _inference_settings["quantized"]:
+        quantized = os.path.join(MODEL_DIR, f"{name}{QUANTIZED_SUFFIX}.onnx")
+        if os.path.exists(quantized):
+            return quantized
+        logger.warning(f"未找到量化模型 {quantized}，使用原模型")
+    return os.path.join(MODEL_DIR, f"{name}.onnx")
+
+
+# 点选验证码用到的模型
+MODEL_NAMES = ("yolov5n", "ocr")
+# 权重外置的共享模型的文件名后缀（由 benchmark/share_models.py 生成）
+SHARED_SUFFIX = ".shared"
+# share_models() 映射的模型：原模型路径 -> (不含权重的模型路径, 权重名, 指向映射内存的 OrtValue, 映射)
+_shared_models: Dict[str, Tuple[str, List[str], List[Any], mmap.mmap]] = {}
+
+
+def shared_model_files(path: str) -> Tuple[str, str, str]:
+    """
+    返回模型对应的共享模型文件：不含权重的模型、权重文件和权重索引（名称 -> 偏移、类型、形状）。
+
+    Args:
+        path (str): 原模型路径，例如 models/yolov5n.onnx。
+    """
+    stem = os.path.splitext(path)[0] + SHARED_SUFFIX
+    return f"{stem}.onnx", f"{stem}.weights", f"{stem}.json"
+
+
+def share_models(names: Tuple[str, ...] = MODEL_NAMES) -> int:
+    """
+    以只读 mmap 映射模型的权重文件，之后创建的推理会话直接使用映射的内存，不再各自复制一份权重。
+
+    在 fork 工作进程之前由父进程调用：映射和 OrtValue 被子进程继承，子进程创建会话时权重页来自
+    同一份页缓存，只算一次物理内存。只对已用 benchmark/share_models.py 生成共享模型的模型生效，
+    其余模型照常加载。
+
+    Args:
+        names (Tuple[str, ...]): 模型名（不含扩展名）。
+
+    Returns:
+        int: 成功映射的模型数。
+    """
+    import onnxruntime as ort
+
+    count = 0
+    for name in names:
+        path = model_path(name)
+        graph, weights, index_path = shared_model_files(path)
+        if not all(os.path.exists(p) for p in (graph, weights, index_path)):
+            logger.warning(f"未找到 {path} 的共享模型，各进程将分别加载完整模型")
+            continue
+        if path in _shared_models:
+            count += 1
+            continue
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            with open(weights, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            tensor_names, values = [], []
+            for tensor_name, entry in index.items():
+                shape = entry["shape"]
+                array = np.frombuffer(
+                    mapped,
+                    dtype=np.dtype(entry["dtype"]),
+                    count=int(np.prod(shape)),
+                    offset=entry["offset"],
+                ).reshape(shape)
+                tensor_names.append(tensor_name)
+                values.append(ort.OrtValue.ortvalue_from_numpy(array))
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"映射共享模型 {weights} 失败: {e}")
+            continue
+        _shared_models[path] = (graph, tensor_names, values, mapped)
+        count += 1
+        logger.info(
+            f"已映射 {weights}：{len(tensor_names)} 个权重，{len(mapped) / 1024 / 1024:.1f} MiB"
+        )
+    get_session.cache_clear()
+    return count
+
+
+def configure_inference(
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: Optional[int] = None,
+    graph_optimization: Optional[str] = None,
+    optimized_model_dir: Optional[str] = None,
+    providers: Optional[List[str]] = None,
+    quantized: Optional[bool] = None,
+    processes: Optional[int] = None,
+) -> None:
+    """
+    修改 ONNX 推理会话的设置（为 None 的参数保持不变），已创建的会话会被丢弃，下次使用时按新设置创建。
+
+    Args:
+        intra_op_threads (Optional[int]): 每个会话的 intra-op 线程数，0 表示按 CPU 核数和进程数推算。
+        inter_op_threads (Optional[int]): 每个会话的 inter-op 线程数。
+        graph_optimization (Optional[str]): 图优化级别，取值见 GRAPH_OPTIMIZATION_LEVELS。
+        optimized_model_dir (Optional[str]): 保存优化后模型的目录。
+        providers (Optional[List[str]]): 按优先级排列的执行提供程序，例如 ["OpenVINOExecutionProvider"]。
+        quantized (Optional[bool]): 是否加载 INT8 量化后的模型。
+        processes (Optional[int]): 同时识别验证码的进程数。
+
+    Raises:
+        ValueError: 图优化级别无效。
+    """
+    if graph_optimization is not None and graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"无效的图优化级别: {graph_optimization}")
+    changes = {
+        "intra_op_threads": intra_op_threads,
+        "inter_op_threads": inter_op_threads,
+        "graph_optimization": graph_optimization,
+        "optimized_model_dir": optimized_model_dir,
+        "providers": providers,
+        "quantized": quantized,
+        "processes": processes,
+    }
+    _inference_settings.update({k: v for k, v in changes.items() if v is not None})
+    get_session.cache_clear()
+
+
+def default_intra_op_threads() -> int:
+    """
+    每个会话默认的 intra-op 线程数：CPU 核数按同时识别验证码的进程数均分，至少为 1。
+
+    会话由 get_session() 缓存，进程内所有账号共用同一个会话和它的 intra-op 线程池，同时调用 run() 的
+    账号轮流使用这些线程，因此不按账号数再分；每个进程各有一份会话，进程数才会让线程数成倍增加。
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, _inference_settings["processes"]))
+
+
+def _session_providers(use_gpu: bool) -> List[str]:
+    """按优先级返回本机可用的执行提供程序。"""
+    import onnxruntime as ort
+
+    available = set(ort.get_available_providers())
+    preferred = list(_inference_settings["providers"])
+    if use_gpu:
+        preferred.insert(0, "CUDAExecutionProvider")
+    providers = [p for p in dict.fromkeys(preferred) if p in available]
+    if "CPUExecutionProvider" not in providers:
+        providers.append("CPUExecutionProvider")
+    return providers
+
+
+def _session_options(model_path: str, providers: List[str]):
+    """
+    按当前设置构造 SessionOptions，并决定实际加载的模型文件。
+
+    Returns:
+        Tuple[onnxruntime.SessionOptions, str]: 会话选项和要加载的模型路径（可能是之前保存的优化后模型）。
+    """
+    import onnxruntime as ort
+
+    settings = _inference_settings
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = settings["intra_op_threads"] or default_intra_op_threads()
+    options.inter_op_num_threads = settings["inter_op_threads"]
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    if ACCOUNT_SLOTS.limit > 1:
+        # 多个账号共用 CPU 时，空闲的推理线程不要自旋等待
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    level = settings["graph_optimization"]
+    options.graph_optimization_level = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }[level]
+
+    cache_dir = settings["optimized_model_dir"]
+    # 优化后的模型会把权重写进文件，共享模型不使用
+    if not cache_dir or level == "disable" or model_path in _shared_models:
+        return options, model_path
+    # 优化结果与优化级别和执行提供程序有关，都写进文件名
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    tag = providers[0].replace("ExecutionProvider", "").lower()
+    cached = os.path.join(cache_dir, f"{stem}.{level}.{tag}.onnx")
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(model_path):
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return options, cached
+    os.makedirs(cache_dir, exist_ok=True)
+    options.optimized_model_filepath = cached
+    return options, model_path
+
+
+@lru_cache(maxsize=None)
+def get_session(model_path: str, use_gpu: bool = False):
+    """
+    加载并缓存 ONNX 推理会话，同一模型在进程内只加载一次（InferenceSession.run 是线程安全的）。
+
+    onnxruntime 在这里才导入，不需要识别点选验证码的运行不会为它付出启动时间。
+    线程数、图优化级别、优化后模型的保存目录和执行提供程序由 configure_inference() 设置；
+    模型已由 share_models() 映射时，加载不含权重的共享模型，权重使用映射的内存。
+
+    Args:
+        model_path (str): ONNX模型路径。
+        use_gpu (bool): 是否使用GPU进行推理。
+
+    Returns:
+        onnxruntime.InferenceSession: 推理会话。
+    """
+    import onnxruntime as ort
+
+    providers = _session_providers(use_gpu)
+    options, path = _session_options(model_path, providers)
+    shared = _shared_models.get(model_path)
+    if shared is not None:
+        # 权重直接使用 share_models() 映射的内存
+        path, tensor_names, values, _ = shared
+        options.add_external_initializers(tensor_names, values)
+    logger.info(
+        f"加载模型 {path}：{providers[0]}，intra-op 线程 {options.intra_op_num_threads}"
+    )
+    return ort.InferenceSession(path, sess_options=options, providers=providers)
+
+
+def detection_input(image_data: MatLike) -> Tuple[np.ndarray, float, int, int]:
+    """
+    将图片缩放并填充到 640x640，转换为目标检测模型的输入。
+
+    Returns:
+        Tuple[np.ndarray, float, int, int]: 模型输入、缩放比例、上侧填充和左侧填充（像素）。
+    """
+    scale = min(640 / image_data.shape[1], 640 / image_data.shape[0])
+    img_resized = cv2.resize(
+        image_data,
+        (int(image_data.shape[1] * scale), int(image_data.shape[0] * scale)),
+    )
+    new_image = np.full((640, 640, 3), 128, dtype=np.uint8)
+    dh, dw = (640 - img_resized.shape[0]) // 2, (640 - img_resized.shape[1]) // 2
+    new_image[dh : dh + img_resized.shape[0], dw : dw + img_resized.shape[1]] = (
+        img_resized
+    )
+    input_img = (
+        np.expand_dims(new_image.transpose((2, 0, 1)), axis=0).astype(np.float32)
+        / 255.0
+    )
+    return input_img, scale, dh, dw
+
+
+def ocr_input(image: np.ndarray) -> np.ndarray:
+    """将文字区域的图片转换为 OCR 模型的输入（64x64 RGB）。"""
+    return np.expand_dims(
+        cv2.cvtColor(cv2.resize(image, (64, 64)), cv2.COLOR_BGR2RGB)
+        .transpose((2, 0, 1))
+        .astype(np.float32)
+        / 255.0,
+        axis=0,
+    )
+
+
 def detect_objects(
     model_path: str, image_data: MatLike, use_gpu: bool = False
 ) -> list[list[int]]:
@@ -180,27 +738,10 @@ def detect_objects(
     :raises: RuntimeError, ValueError
     """
     try:
-        # 调整图像大小并填充到640x640
-        scale = min(640 / image_data.shape[1], 640 / image_data.shape[0])
-        img_resized = cv2.resize(
-            image_data,
-            (int(image_data.shape[1] * scale), int(image_data.shape[0] * scale)),
-        )
-        new_image = np.full((640, 640, 3), 128, dtype=np.uint8)
-        dh, dw = (640 - img_resized.shape[0]) // 2, (640 - img_resized.shape[1]) // 2
-        new_image[dh : dh + img_resized.shape[0], dw : dw + img_resized.shape[1]] = (
-            img_resized
-        )
-
-        # 将图片转换成模型需要的输入格式
-        input_img = (
-            np.expand_dims(new_image.transpose((2, 0, 1)), axis=0).astype(np.float32)
-            / 255.0
-        )
+        input_img, scale, dh, dw = detection_input(image_data)
 
         # 加载模型并运行
-        providers = ["CUDAExecutionProvider"] if use_gpu else ["CPUExecutionProvider"]
-        session = ort.InferenceSession(model_path, providers=providers)
+        session = get_session(model_path, use_gpu)
         result = session.run(None, {session.get_inputs()[0].name: input_img})
 
         # 解析模型输出并应用非极大值抑制（NMS）
@@ -251,21 +792,10 @@ def predict_ocr(model_path: str, image: np.ndarray, use_gpu: bool = False) -> st
     """
     try:
         # 加载ONNX模型
-        session = ort.InferenceSession(
-            model_path,
-            providers=(
-                ["CUDAExecutionProvider"] if use_gpu else ["CPUExecutionProvider"]
-            ),
-        )
+        session = get_session(model_path, use_gpu)
 
         # 预处理图片
-        image = np.expand_dims(
-            cv2.cvtColor(cv2.resize(image, (64, 64)), cv2.COLOR_BGR2RGB)
-            .transpose((2, 0, 1))
-            .astype(np.float32)
-            / 255.0,
-            axis=0,
-        )
+        image = ocr_input(image)
 
         # 字符集
         charset = [
@@ -784,22 +1314,40 @@ def recognize_clickWord_captcha(target: str, wordlist: list) -> str:
     引发：
         logger.warning: 在处理文本框时出错或未找到字符时。
     """
-    target_bytes = base64.b64decode(target)
-
-    # 将图片转换为 OpenCV 格式
-    image = cv2.imdecode(np.frombuffer(target_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    with _stage("decode"):
+        target_bytes = base64.b64decode(target)
 
-    bboxes = detect_objects("./models/yolov5n.onnx", image)
+        # 将图片转换为 OpenCV 格式
+        image = cv2.imdecode(
+            np.frombuffer(target_bytes, dtype=np.uint8), cv2.IMREAD_COLOR
+        )
 
-    # 识别每个文本框中的文本，并存储为字典以便快速查找
-    recognized_dict = {}
-    for bbox in bboxes:
-        try:
-            x_min, y_min, x_max, y_max = bbox
-            text = predict_ocr("./models/ocr.onnx", image[y_min:y_max, x_min:x_max])
-            recognized_dict[text] = bbox
-        except Exception as e:
-            logger.warning(f"处理文本框时出错: {e}")
+    # 缓存中有这张图且包含全部要点击的文字时，跳过目标检测和 OCR
+    image_hash = perceptual_hash(image)
+    cached = _lookup_solution("clickWord", image_hash)
+    if cached and all(word in cached["boxes"] for word in wordlist):
+        recognized_dict = cached["boxes"]
+    else:
+        with _stage("yolo"):
+            bboxes = detect_objects(model_path("yolov5n"), image)
+
+        # 识别每个文本框中的文本，并存储为字典以便快速查找
+        recognized_dict = {}
+        for bbox in bboxes:
+            try:
+                x_min, y_min, x_max, y_max = bbox
+                with _stage("ocr"):
+                    text = predict_ocr(model_path("ocr"), image[y_min:y_max, x_min:x_max])
+                recognized_dict[text] = bbox
+            except Exception as e:
+                logger.warning(f"处理文本框时出错: {e}")
+    resolved = sum(1 for word in wordlist if recognized_dict.get(word))
+    _pending_solution.value = (
+        "clickWord",
+        image_hash,
+        {"boxes": recognized_dict},
+        resolved / len(wordlist) if wordlist else 1.0,
+    )
 
     # 根据wordlist的顺序找到对应的文本框，并生成随机坐标
     random_coordinates = []
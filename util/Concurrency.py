@@ -0,0 +1,327 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterable, Iterator, Optional, TypeVar
+
+from util.Metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# 同时处于“工作中”的账号数上限（与原先线程池的 max_workers 一致）
+DEFAULT_ACCOUNT_SLOTS = 5
+# 登录时推测性并行识别的额外验证码数的全局上限
+DEFAULT_CAPTCHA_SLOTS = 4
+# 同时发往工学云接口的请求数的初始值，之后由 AimdController 调整
+DEFAULT_API_SLOTS = 5
+
+
+class SlotLimiter:
+    """
+    限制同时工作的账号数。
+
+    与固定大小的线程池不同，持有名额的线程在退避等待时可以通过 paused() 暂时归还名额，
+    让其它账号继续工作，等待结束后再重新申请。
+    """
+
+    def __init__(self, limit: int = DEFAULT_ACCOUNT_SLOTS):
+        self._cond = threading.Condition()
+        self._limit = limit
+        self._in_use = 0
+        self._local = threading.local()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def set_limit(self, limit: int) -> None:
+        """调整名额上限，调小时已持有的名额不受影响，归还后才生效。"""
+        with self._cond:
+            self._limit = max(1, int(limit))
+            self._cond.notify_all()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def _acquire(self) -> None:
+        with self._cond:
+            while self._in_use >= self._limit:
+                self._cond.wait()
+            self._in_use += 1
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    def try_acquire(self) -> bool:
+        """
+        不等待地占用一个名额，名额已满时返回 False。
+
+        与 slot() 不同，不做线程内的重入判断，占用成功后需调用 release() 归还。
+        """
+        with self._cond:
+            if self._in_use >= self._limit:
+                return False
+            self._in_use += 1
+            return True
+
+    def release(self) -> None:
+        """归还 try_acquire() 占用的名额。"""
+        self._release()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """占用一个名额执行；同一线程内嵌套调用不会重复占用。"""
+        if getattr(self._local, "held", False):
+            yield
+            return
+        self._acquire()
+        self._local.held = True
+        try:
+            yield
+        finally:
+            self._local.held = False
+            self._release()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """在上下文内暂时归还当前线程持有的名额（未持有时不做任何事）。"""
+        if not getattr(self._local, "held", False):
+            yield
+            return
+        self._local.held = False
+        self._release()
+        try:
+            yield
+        finally:
+            self._acquire()
+            self._local.held = True
+
+
+# 全局账号名额
+ACCOUNT_SLOTS = SlotLimiter()
+
+
+class AimdController:
+    """
+    按请求结果调整 SlotLimiter 的名额（加性增、乘性减）。
+
+    名额用满时每连续 limit 次健康响应名额加 1（名额没用满说明瓶颈不在这里，不再增加）；出现过载信号（网络错误、超时、429/5xx 或耗时超过阈值）时
+    名额乘以 decrease_factor。一个往返时间（按平滑后的请求耗时估计）内的多次过载信号只减一次，
+    这些请求是在同一个名额下发出的，避免同一波失败把名额压到底。
+    """
+
+    def __init__(
+        self,
+        limiter: SlotLimiter,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_threshold: float = 5.0,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            limiter (SlotLimiter): 被调整的名额限制器。
+            min_limit (int): 名额下限。
+            max_limit (int): 名额上限。
+            latency_threshold (float): 单次请求耗时超过该值（秒）视为过载。
+            decrease_factor (float): 过载时名额的缩小比例。
+        """
+        self.limiter = limiter
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.decrease_factor = decrease_factor
+        self._lock = threading.Lock()
+        self._healthy = 0
+        self._rtt = 0.0
+        self._last_decrease = float("-inf")
+
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        """
+        记录一次请求结果，应在仍持有名额时调用。
+
+        Args:
+            latency (float): 请求耗时（秒）。
+            overloaded (bool): 是否出现了过载信号（网络错误、超时、429/5xx）。
+        """
+        overloaded = overloaded or latency > self.latency_threshold
+        with self._lock:
+            limit = self.limiter.limit
+            self._rtt = latency if not self._rtt else 0.8 * self._rtt + 0.2 * latency
+            if overloaded:
+                self._healthy = 0
+                now = time.monotonic()
+                if now - self._last_decrease < 2 * self._rtt:
+                    return
+                self._last_decrease = now
+                new_limit = max(self.min_limit, int(limit * self.decrease_factor))
+            else:
+                if self.limiter.in_use < limit:
+                    return
+                self._healthy += 1
+                if self._healthy < limit:
+                    return
+                self._healthy = 0
+                new_limit = min(self.max_limit, limit + 1)
+            if new_limit == limit:
+                return
+            self.limiter.set_limit(new_limit)
+        direction = "decrease" if new_limit < limit else "increase"
+        METRICS.inc("moguding_concurrency_changes_total", direction=direction)
+        log = logger.warning if new_limit < limit else logger.debug
+        log(f"并发名额调整：{limit} -> {new_limit}")
+
+
+class CircuitBreaker:
+    """
+    熔断器：最近 window 次请求中过载比例达到 failure_ratio 时断开，断开期间不发出新请求。
+
+    断开 open_seconds 后进入半开状态，只放行一个探测请求：成功则恢复，失败则再次断开，
+    断开时长翻倍（不超过 max_open_seconds）。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_ratio: float = 0.5,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+    ):
+        """
+        Args:
+            window (int): 统计的最近请求数。
+            min_calls (int): 至少有这么多次请求后才会断开。
+            failure_ratio (float): 断开的过载比例阈值。
+            open_seconds (float): 首次断开的时长（秒）。
+            max_open_seconds (float): 断开时长上限（秒）。
+        """
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._current_open = open_seconds
+        self._opened_until = 0.0
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _open(self, now: float) -> None:
+        self._state = self.OPEN
+        self._opened_until = now + self._current_open
+        self._probe_started = None
+        METRICS.inc("moguding_circuit_open_total")
+        logger.error(f"工学云接口持续过载，暂停发出新请求 {self._current_open:g} 秒")
+
+    def retry_after(self) -> float:
+        """
+        请求前调用：返回还需等待的秒数，0 表示可以发出请求（半开状态下当前调用者即为探测请求）。
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if now < self._opened_until:
+                    return self._opened_until - now
+                self._state = self.HALF_OPEN
+            # 探测请求迟迟没有结果时（例如所在线程异常退出）允许再放行一个
+            if self._probe_started is None or now - self._probe_started > self._current_open:
+                self._probe_started = now
+                return 0.0
+            return min(1.0, self._current_open)
+
+    def record(self, overloaded: bool) -> None:
+        """记录一次请求是否出现过载信号。"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.HALF_OPEN:
+                if overloaded:
+                    self._current_open = min(self.max_open_seconds, self._current_open * 2)
+                    self._open(now)
+                else:
+                    self._state = self.CLOSED
+                    self._current_open = self.open_seconds
+                    self._outcomes.clear()
+                    logger.info("工学云接口已恢复，解除熔断")
+                return
+            if self._state == self.OPEN:
+                return
+            self._outcomes.append(overloaded)
+            if len(self._outcomes) >= self.min_calls:
+                failures = sum(self._outcomes)
+                if failures >= self.failure_ratio * len(self._outcomes):
+                    self._outcomes.clear()
+                    self._open(now)
+
+
+# 工学云接口的并发控制：按请求延迟和错误调整同时在途的请求数，持续过载时熔断
+API_SLOTS = SlotLimiter(DEFAULT_API_SLOTS)
+API_CONCURRENCY = AimdController(API_SLOTS)
+API_BREAKER = CircuitBreaker()
+
+# 登录时额外并行尝试的验证码名额：大量账号同时登录时不让推测性尝试成倍放大服务器压力
+CAPTCHA_SLOTS = SlotLimiter(DEFAULT_CAPTCHA_SLOTS)
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_bounded(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_in_flight: int,
+    on_done: Callable[[T, "concurrent.futures.Future[R]"], None],
+) -> int:
+    """
+    用线程池对 items 逐个执行 func，items 按需读取，同时在执行或排队的最多 max_in_flight 个。
+
+    与一次性提交全部任务不同，items 可以是生成器，内存中只保留正在处理的条目；每个任务结束后
+    立即调用 on_done(item, future)，之后不再持有该条目和结果。
+
+    Args:
+        func (Callable[[T], R]): 处理单个条目的函数。
+        items (Iterable[T]): 待处理的条目。
+        max_in_flight (int): 同时在处理的条目数上限（也是线程数）。
+        on_done (Callable[[T, Future[R]], None]): 条目处理结束（成功或抛出异常）后在调用线程中执行。
+
+    Returns:
+        int: 处理的条目数。
+    """
+    count = 0
+    limit = max(1, max_in_flight)
+    iterator = iter(items)
+    exhausted = False
+    pending: Dict[concurrent.futures.Future, T] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=limit) as executor:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, item)] = item
+            if not pending:
+                return count
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                on_done(pending.pop(future), future)
+                count += 1
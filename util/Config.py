@@ -4,6 +4,9 @@ import random
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from util import JsonCodec
+from util.AccountStore import AccountStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,7 +14,10 @@ class ConfigManager:
     """管理配置文件的加载、验证和更新。"""
 
     def __init__(
-        self, path: Optional[str] = None, config: Optional[Dict[str, Any]] = None
+        self,
+        path: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        store: Optional[AccountStore] = None,
     ):
         """
         初始化ConfigManager实例。
@@ -19,8 +25,16 @@ class ConfigManager:
         Args:
             path (Optional[str]): 配置文件的路径。默认为 None。
             config (Optional[Dict[str, Any]]): 直接传入的配置字典。如果传入此参数，则不从文件加载配置。默认为 None。
+            store (Optional[AccountStore]): 配置来自账号存储时传入，更新只改写存储中该账号的一行。默认为 None。
         """
-        if config is not None:
+        self.store = store
+        self.account_id: Optional[str] = None
+        if config is not None and store is not None:
+            self._config = self._prepare(config)
+            self._path = None
+            phone = (config["config"].get("user") or {}).get("phone")
+            self.account_id = str(phone) if phone else None
+        elif config is not None:
             self._config = config
             self._path = None
             logger.info("使用直接传入的配置字典初始化")
@@ -43,36 +57,48 @@ class ConfigManager:
         """
         try:
             # 打开并加载配置文件
-            with open(str(self._path), "r", encoding="utf-8") as jsonfile:
-                config = json.load(jsonfile)
-
-            # 确保 config 和 clockIn 字典存在
-            config.setdefault("config", {})
-            clock_in = config["config"].setdefault("clockIn", {})
-
-            # 检查并添加 mode 字段
-            if "mode" not in clock_in:
-                clock_in["mode"] = "daily"
-                logger.warning(
-                    "配置文件中缺少 'mode' 字段，已自动添加默认值 'daily'。"
-                    "请尽快更新配置文件以确保正确性。"
-                )
-
-            # 确保 location 字典存在
-            location = clock_in.setdefault("location", {})
-
-            # 为经纬度添加随机偏移
-            for coord in ["latitude", "longitude"]:
-                value = location.get(coord)
-                if isinstance(value, str) and len(value) > 1:
-                    location[coord] = value[:-1] + str(random.randint(0, 9))
-
+            with open(str(self._path), "rb") as jsonfile:
+                config = self._prepare(JsonCodec.load(jsonfile))
             logger.info(f"配置文件已加载: {self._path}")
             return config
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"配置文件加载失败: {e}")
             raise
 
+    @staticmethod
+    def _prepare(config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        补全缺省字段并为经纬度添加随机偏移。
+
+        Args:
+            config (Dict[str, Any]): 从文件或账号存储读取的配置。
+
+        Returns:
+            Dict[str, Any]: 处理后的配置（即传入的字典）。
+        """
+        # 确保 config 和 clockIn 字典存在
+        config.setdefault("config", {})
+        clock_in = config["config"].setdefault("clockIn", {})
+
+        # 检查并添加 mode 字段
+        if "mode" not in clock_in:
+            clock_in["mode"] = "daily"
+            logger.warning(
+                "配置文件中缺少 'mode' 字段，已自动添加默认值 'daily'。"
+                "请尽快更新配置文件以确保正确性。"
+            )
+
+        # 确保 location 字典存在
+        location = clock_in.setdefault("location", {})
+
+        # 为经纬度添加随机偏移
+        for coord in ["latitude", "longitude"]:
+            value = location.get(coord)
+            if isinstance(value, str) and len(value) > 1:
+                location[coord] = value[:-1] + str(random.randint(0, 9))
+
+        return config
+
     def get_value(self, *keys: str) -> Any:
         """
         获取配置中的值。
@@ -110,8 +136,10 @@ class ConfigManager:
             # 更新或设置最后一个键名的值
             config[keys[-1]] = value
 
-            # 如果从文件加载，则保存配置
-            if self._path is not None:
+            # 如果从文件或账号存储加载，则保存配置
+            if self.store is not None and self.account_id is not None:
+                self.store.update_value(self.account_id, keys, value)
+            elif self._path is not None:
                 self._save_config()
             else:
                 logger.info("配置已更新（未保存到文件，因为直接使用字典初始化）")
@@ -129,7 +157,7 @@ class ConfigManager:
 
         try:
             with self._path.open("w", encoding="utf-8") as jsonfile:
-                json.dump(self._config, jsonfile, ensure_ascii=False, indent=2)
+                JsonCodec.dump_pretty(self._config, jsonfile)
             logger.info(f"配置文件已更新: {self._path}")
         except Exception as e:
             logger.error(f"保存配置文件失败: {e}")
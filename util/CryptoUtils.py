@@ -1,11 +1,124 @@
 import logging
+from base64 import b64decode, b64encode
+from binascii import unhexlify
+from functools import lru_cache
 from hashlib import md5
 
 from aes_pkcs5.algorithms.aes_ecb_pkcs5_padding import AESECBPKCS5Padding
 
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher
+    from cryptography.hazmat.primitives.ciphers.algorithms import AES
+    from cryptography.hazmat.primitives.ciphers.modes import ECB
+except ImportError:  # pragma: no cover - cryptography 是 aes-pkcs5 的依赖，通常一定存在
+    Cipher = None
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 加密后端："cryptography" 直接复用密钥扩展后的 Cipher 对象，"aes_pkcs5" 为原始实现
+AES_BACKEND = "cryptography" if Cipher is not None else "aes_pkcs5"
+
+# 缓存的密码器数量上限（默认密钥 + 各验证码的临时密钥）
+CIPHER_CACHE_SIZE = 256
+
+
+class FastAESECBPKCS5Padding:
+    """
+    基于 cryptography 的 AES/ECB/PKCS5Padding 实现。
+
+    与 aes_pkcs5 的 AESECBPKCS5Padding 输出逐字节一致，但只在初始化时构造一次 Cipher，
+    之后每次加解密只创建轻量的 encryptor/decryptor。
+    """
+
+    def __init__(self, key: str | bytes, output_format: str):
+        """
+        初始化加密器。
+
+        Args:
+            key (str | bytes): AES密钥。
+            output_format (str): 输出格式，"hex" 或 "b64"。
+
+        Raises:
+            NotImplementedError: 不支持的输出格式。
+        """
+        if output_format not in ("b64", "hex"):
+            raise NotImplementedError(
+                f"Support for output format: {output_format} is not implemented"
+            )
+        self._b64 = output_format == "b64"
+        self._cipher = Cipher(
+            AES(key if isinstance(key, bytes) else key.encode()), ECB()
+        )
+
+    def encrypt(self, message: str) -> str:
+        """
+        加密字符串。
+
+        Args:
+            message (str): 明文字符串。
+
+        Returns:
+            str: 密文（hex 或 base64）。
+        """
+        data = message.encode()
+        offset = 16 - len(data) % 16
+        encryptor = self._cipher.encryptor()
+        result = encryptor.update(data + bytes((offset,)) * offset)
+        return b64encode(result).decode() if self._b64 else result.hex()
+
+    def decrypt(self, message: str) -> str:
+        """
+        解密字符串。
+
+        Args:
+            message (str): 密文（hex 或 base64）。
+
+        Returns:
+            str: 明文字符串。
+        """
+        decryptor = self._cipher.decryptor()
+        result = decryptor.update(
+            b64decode(message) if self._b64 else unhexlify(message)
+        )
+        return result[: -result[-1]].decode()
+
+
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def get_cipher(key: str, out_format: str):
+    """
+    获取（并缓存）指定密钥和输出格式的密码器。
+
+    Args:
+        key (str): AES密钥。
+        out_format (str): 输出格式。
+
+    Returns:
+        FastAESECBPKCS5Padding | AESECBPKCS5Padding: 可重复使用的密码器。
+    """
+    if AES_BACKEND == "cryptography":
+        return FastAESECBPKCS5Padding(key, out_format)
+    return AESECBPKCS5Padding(key, out_format)
+
+
+def set_aes_backend(backend: str) -> None:
+    """
+    切换AES后端，并清空密码器缓存。
+
+    Args:
+        backend (str): "cryptography" 或 "aes_pkcs5"。
+
+    Raises:
+        ValueError: 后端名称无效或不可用。
+    """
+    global AES_BACKEND
+    if backend not in ("cryptography", "aes_pkcs5"):
+        raise ValueError(f"不支持的AES后端: {backend}")
+    if backend == "cryptography" and Cipher is None:
+        raise ValueError("cryptography 未安装，无法使用该后端")
+    AES_BACKEND = backend
+    get_cipher.cache_clear()
+
 
 def create_sign(*args) -> str:
     """
@@ -53,11 +166,8 @@ def aes_encrypt(
         ValueError: 如果加密失败，抛出包含详细错误信息的异常。
     """
     try:
-        # 使用指定的密钥和输出格式初始化AES加密器
-        cipher = AESECBPKCS5Padding(key, out_format)
-        # 对明文进行AES加密
-        ciphertext = cipher.encrypt(plaintext)
-        return ciphertext
+        # 复用缓存的密码器对明文进行AES加密
+        return get_cipher(key, out_format).encrypt(plaintext)
 
     except Exception as e:
         logger.error(f"加密失败: {e}")
@@ -84,11 +194,8 @@ def aes_decrypt(
         ValueError: 如果解密失败，抛出包含详细错误信息的异常。
     """
     try:
-        # 使用指定的密钥和输出格式初始化AES解密器
-        cipher = AESECBPKCS5Padding(key, out_format)
-        # 对密文进行AES解密
-        plaintext = cipher.decrypt(ciphertext)
-        return plaintext
+        # 复用缓存的密码器对密文进行AES解密
+        return get_cipher(key, out_format).decrypt(ciphertext)
 
     except Exception as e:
         logger.error(f"解密失败: {e}")
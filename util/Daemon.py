@@ -0,0 +1,190 @@
+import concurrent.futures
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from coreApi.MainLogicApi import ApiClient
+from util.Config import ConfigManager
+from util.HelperFunctions import desensitize_phone
+from util.Scheduler import (
+    DEFAULT_TIMES,
+    DirectoryWatcher,
+    Scheduler,
+    next_run_time,
+    parse_times,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Account:
+    """守护进程中常驻的账号：配置、ApiClient（含 token 和连接）以及执行时刻。"""
+
+    def __init__(self, key: str, config: ConfigManager, default_times, default_jitter):
+        self.key = key
+        self.config = config
+        self.api_client = ApiClient(config)
+        schedule = (config.get_value("config") or {}).get("schedule") or {}
+        self.times = parse_times(schedule.get("times") or default_times)
+        self.jitter_minutes = float(schedule.get("jitterMinutes", default_jitter))
+        self.label = desensitize_phone((config.get_value("config.user") or {}).get("phone"))
+
+
+class Daemon:
+    """
+    常驻进程模式：在一个进程内按时刻表为每个账号执行任务。
+
+    与每次由 cron 冷启动相比，导入、模型、登录 token 和 HTTP 连接在多次执行之间保持，
+    user 目录的配置文件变更会被自动加载，收到 SIGTERM/SIGINT 后等待正在执行的任务完成再退出。
+    """
+
+    def __init__(
+        self,
+        run_task: Callable[[ConfigManager, ApiClient], None],
+        user_dir: str,
+        selected_files: Optional[List[str]] = None,
+        env_configs: Optional[List[Dict[str, Any]]] = None,
+        times: Optional[List[str]] = None,
+        jitter_minutes: float = 10,
+        reload_interval: float = 30,
+        max_workers: int = 5,
+    ):
+        """
+        初始化守护进程。
+
+        Args:
+            run_task (Callable[[ConfigManager, ApiClient], None]): 执行单个账号全部任务的函数。
+            user_dir (str): 配置文件目录。
+            selected_files (Optional[List[str]]): 只加载指定的配置文件（不含扩展名），默认为全部。
+            env_configs (Optional[List[Dict[str, Any]]]): 来自环境变量的配置，只在启动时加载一次。
+            times (Optional[List[str]]): 默认的每日执行时刻，账号可用 config.schedule.times 覆盖。
+            jitter_minutes (float): 默认的最大随机延后分钟数，账号可用 config.schedule.jitterMinutes 覆盖。
+            reload_interval (float): 检查配置文件变更的间隔（秒）。
+            max_workers (int): 同时执行的账号数上限。
+        """
+        self.run_task = run_task
+        self.user_dir = user_dir
+        self.selected_files = set(selected_files) if selected_files else None
+        self.times = list(times or DEFAULT_TIMES)
+        self.jitter_minutes = jitter_minutes
+        self.reload_interval = reload_interval
+        self.max_workers = max_workers
+
+        # 先校验默认时刻，格式错误时尽早失败
+        parse_times(self.times)
+
+        self.scheduler = Scheduler()
+        self.watcher = DirectoryWatcher(user_dir)
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._accounts: Dict[str, _Account] = {}
+        self._running: Set[str] = set()
+
+        for index, config in enumerate(env_configs or []):
+            self._add(f"env:{index}", lambda c=config: ConfigManager(config=c))
+        for name in self.watcher.names():
+            if self._wanted(name):
+                self._add_file(name)
+
+    def _wanted(self, name: str) -> bool:
+        return self.selected_files is None or name in self.selected_files
+
+    def _add_file(self, name: str) -> None:
+        path = os.path.join(self.user_dir, f"{name}.json")
+        self._add(f"file:{name}", lambda: ConfigManager(path=path))
+
+    def _add(self, key: str, factory: Callable[[], ConfigManager]) -> None:
+        try:
+            account = _Account(key, factory(), self.times, self.jitter_minutes)
+        except Exception as e:
+            logger.error(f"加载账号配置 {key} 失败: {e}")
+            return
+        with self._lock:
+            self._accounts[key] = account
+        self._schedule(account)
+
+    def _remove(self, key: str) -> None:
+        with self._lock:
+            self._accounts.pop(key, None)
+        self.scheduler.cancel(key)
+        logger.info(f"已移除账号配置 {key}")
+
+    def _schedule(self, account: _Account) -> None:
+        when = next_run_time(account.times, datetime.now(), account.jitter_minutes)
+        self.scheduler.schedule(account.key, when)
+        logger.info(f"账号 {account.label} 下次执行时间: {when:%Y-%m-%d %H:%M:%S}")
+
+    def reload(self) -> None:
+        """加载 user 目录中新增或修改的配置文件，移除已删除的配置。正在执行的账号推迟到执行结束后处理。"""
+        with self._lock:
+            busy = {key[5:] for key in self._running if key.startswith("file:")}
+        changed, removed = self.watcher.poll(ignore=busy)
+        for name in removed:
+            self._remove(f"file:{name}")
+        for name in changed:
+            if self._wanted(name):
+                logger.info(f"检测到配置文件变更，重新加载: {name}")
+                self._add_file(name)
+
+    def _dispatch(self, executor: concurrent.futures.Executor, key: str) -> None:
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is None:
+                return
+            if key in self._running:
+                logger.warning(f"账号 {account.label} 上一次执行尚未结束，跳过本次")
+                self._schedule(account)
+                return
+            self._running.add(key)
+        executor.submit(self._run_account, account)
+
+    def _run_account(self, account: _Account) -> None:
+        try:
+            self.run_task(account.config, account.api_client)
+        except Exception as e:
+            logger.error(f"账号 {account.label} 执行失败: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(account.key)
+                current = self._accounts.get(account.key) is account
+            if account.key.startswith("file:"):
+                # 执行过程中写回的 token 等信息不应被当作用户修改
+                self.watcher.acknowledge(account.key[5:])
+            if current and not self.stop_event.is_set():
+                self._schedule(account)
+
+    def stop(self, *_: Any) -> None:
+        """请求退出：不再开始新的任务，等待正在执行的任务完成。"""
+        if not self.stop_event.is_set():
+            logger.info("收到退出信号，等待正在执行的任务完成...")
+        self.stop_event.set()
+        self.scheduler.wake()
+
+    def serve_forever(self) -> None:
+        """运行调度循环，直到调用 stop()（或收到 SIGTERM/SIGINT）。"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        logger.info(
+            f"守护进程已启动：{len(self._accounts)} 个账号，默认执行时刻 {', '.join(self.times)}，"
+            f"随机延后至多 {self.jitter_minutes:g} 分钟"
+        )
+        last_reload = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            while not self.stop_event.is_set():
+                wait = max(0.0, self.reload_interval - (time.monotonic() - last_reload))
+                for key in self.scheduler.wait_due(timeout=wait):
+                    if self.stop_event.is_set():
+                        break
+                    self._dispatch(executor, key)
+                if time.monotonic() - last_reload >= self.reload_interval:
+                    self.reload()
+                    last_reload = time.monotonic()
+        logger.info("守护进程已退出")
@@ -2,11 +2,11 @@ import os
 import io
 import random
 
-from PIL import Image
-
 from coreApi.FileUploadApi import upload
+from util.Tracing import traced
 
 
+@traced()
 def process_image(image_path: str) -> bytes:
     """
     读取并处理图片，确保格式为JPEG，且大小不超过1MB。
@@ -18,6 +18,9 @@ def process_image(image_path: str) -> bytes:
     Returns:
         bytes: 处理后的图片二进制数据。
     """
+    # PIL 只在需要处理图片时才导入，避免拖慢启动
+    from PIL import Image
+
     # 打开原始图片
     with Image.open(image_path) as img:
         # 如果图片格式不是JPEG，则转换为RGB模式
@@ -61,6 +64,7 @@ def process_image(image_path: str) -> bytes:
         return img_byte_arr.getvalue()
 
 
+@traced()
 def upload_img(token: str, snowFlakeId: str, userId: str, count: int) -> str:
     """上传指定数量的处理后图片
 
@@ -1,6 +1,7 @@
 import re
 import logging
 from datetime import datetime, timedelta
+from typing import Optional
 
 import requests
 
@@ -37,6 +38,20 @@ def get_current_month_info() -> dict:
     return {"startTime": start_time_str, "endTime": end_time_str}
 
 
+def get_today_info() -> dict:
+    """
+    获取今天的开始和结束时间，格式与 get_current_month_info 一致（结束时间只精确到日期）。
+
+    Returns:
+        包含今天开始和结束时间的字典。
+    """
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "startTime": today.strftime("%Y-%m-%d %H:%M:%S"),
+        "endTime": today.strftime("%Y-%m-%d 00:00:00Z"),
+    }
+
+
 def desensitize_name(name: str) -> str:
     """
     对姓名进行脱敏处理，将中间部分字符替换为星号。
@@ -56,16 +71,35 @@ def desensitize_name(name: str) -> str:
         return f"{name[0]}{'*' * (n - 2)}{name[-1]}"
 
 
-def is_holiday(current_datetime: datetime = datetime.now()) -> bool:
+def desensitize_phone(phone: Optional[str]) -> str:
+    """
+    对手机号进行脱敏处理，保留前3位和后4位。
+
+    Args:
+        phone (Optional[str]): 待脱敏的手机号。
+
+    Returns:
+        str: 脱敏后的手机号，为空时返回 "unknown"。
+    """
+    phone = (phone or "").strip()
+    if not phone:
+        return "unknown"
+    if len(phone) < 8:
+        return f"{phone[0]}***"
+    return f"{phone[:3]}****{phone[-4:]}"
+
+
+def is_holiday(current_datetime: Optional[datetime] = None) -> bool:
     """
     判断当前日期是否为节假日或周末。
 
     Args:
-        current_datetime (datetime): 当前日期时间，默认为系统当前时间。
+        current_datetime (Optional[datetime]): 当前日期时间，默认为调用时的系统时间。
 
     Returns:
         bool: 是否为节假日。
     """
+    current_datetime = current_datetime or datetime.now()
     # 获取当前年份和日期字符串
     year = current_datetime.year
     current_date = current_datetime.strftime("%Y-%m-%d")
@@ -0,0 +1,112 @@
+import json
+from typing import Any, IO
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时回退到标准库
+    orjson = None
+
+# 当前使用的 JSON 后端
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    将对象序列化为紧凑的 UTF-8 JSON 字节串（用于请求体）。
+
+    Args:
+        obj (Any): 待序列化对象。
+
+    Returns:
+        bytes: JSON 字节串。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson 不支持的类型（如超出64位的整数）交给标准库处理
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_str(obj: Any) -> str:
+    """
+    将对象序列化为紧凑的 JSON 字符串。
+
+    Args:
+        obj (Any): 待序列化对象。
+
+    Returns:
+        str: JSON 字符串。
+    """
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """
+    反序列化 JSON 数据。
+
+    Args:
+        data (bytes | bytearray | str): JSON 数据。
+
+    Returns:
+        Any: 解析后的对象。
+
+    Raises:
+        ValueError: JSON 格式错误。
+    """
+    if orjson is not None:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(fp: IO) -> Any:
+    """
+    从文件对象读取并反序列化 JSON。
+
+    Args:
+        fp (IO): 以文本或二进制模式打开的文件对象。
+
+    Returns:
+        Any: 解析后的对象。
+    """
+    return loads(fp.read())
+
+
+def dump_pretty(obj: Any, fp: IO[str]) -> None:
+    """
+    以缩进2格、保留中文的格式写入文本文件（与 json.dump(indent=2, ensure_ascii=False) 一致）。
+
+    Args:
+        obj (Any): 待序列化对象。
+        fp (IO[str]): 以文本模式打开的文件对象。
+    """
+    if orjson is not None:
+        try:
+            fp.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8"))
+            return
+        except TypeError:
+            pass
+    json.dump(obj, fp, ensure_ascii=False, indent=2)
+
+
+def response_json(response) -> Any:
+    """
+    解析 requests 响应体。
+
+    Args:
+        response (requests.Response): HTTP 响应。
+
+    Returns:
+        Any: 解析后的对象。
+
+    Raises:
+        requests.exceptions.JSONDecodeError: 响应体不是有效的 JSON（与 response.json() 一致）。
+    """
+    try:
+        return loads(response.content)
+    except json.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
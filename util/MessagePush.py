@@ -10,6 +10,9 @@ from email.utils import formataddr
 
 import requests
 
+from util.JsonCodec import dumps, response_json
+from util.Tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,28 +50,29 @@ class MessagePusher:
         for service_config in self.push_config:
             if service_config.get("enabled", False):
                 service_type = service_config["type"]
-                try:
-                    if service_type == "Server":
-                        content = self._generate_markdown_message(results)
-                        self._server_push(service_config, title, content)
-                    elif service_type == "PushPlus":
-                        content = self._generate_html_message(results)
-                        self._pushplus_push(service_config, title, content)
-                    elif service_type == "AnPush":
-                        content = self._generate_markdown_message(results)
-                        self._anpush_push(service_config, title, content)
-                    elif service_type == "WxPusher":
-                        content = self._generate_html_message(results)
-                        self._wxpusher_push(service_config, title, content)
-                    elif service_type == "SMTP":
-                        content = self._generate_html_message(results)
-                        self._smtp_push(service_config, title, content)
-                    else:
-                        logger.warning(f"不支持的推送服务类型: {service_type}")
-
-                except Exception as e:
-                    logger.error(f"{service_type} 消息推送失败: {str(e)}")
-                    continue
+                with span(f"push.{service_type}"):
+                    try:
+                        if service_type == "Server":
+                            content = self._generate_markdown_message(results)
+                            self._server_push(service_config, title, content)
+                        elif service_type == "PushPlus":
+                            content = self._generate_html_message(results)
+                            self._pushplus_push(service_config, title, content)
+                        elif service_type == "AnPush":
+                            content = self._generate_markdown_message(results)
+                            self._anpush_push(service_config, title, content)
+                        elif service_type == "WxPusher":
+                            content = self._generate_html_message(results)
+                            self._wxpusher_push(service_config, title, content)
+                        elif service_type == "SMTP":
+                            content = self._generate_html_message(results)
+                            self._smtp_push(service_config, title, content)
+                        else:
+                            logger.warning(f"不支持的推送服务类型: {service_type}")
+
+                    except Exception as e:
+                        logger.error(f"{service_type} 消息推送失败: {str(e)}")
+                        continue
 
     def _server_push(self, config: dict[str, Any], title: str, content: str):
         """Server酱 推送
@@ -81,7 +85,7 @@ class MessagePusher:
         url = f'https://sctapi.ftqq.com/{config["sendKey"]}.send'
         data = {"title": title, "desp": content}
 
-        rsp = requests.post(url, data=data).json()
+        rsp = response_json(requests.post(url, data=data))
         if rsp.get("code") == 0:
             logger.info("Server酱推送成功")
         else:
@@ -98,7 +102,7 @@ class MessagePusher:
         url = f'https://www.pushplus.plus/send/{config["token"]}'
         data = {"title": title, "content": content}
 
-        rsp = requests.post(url, data=data).json()
+        rsp = response_json(requests.post(url, data=data))
         if rsp.get("code") == 200:
             logger.info("PushPlus推送成功")
         else:
@@ -121,7 +125,7 @@ class MessagePusher:
             "to": config["to"],
         }
 
-        rsp = requests.post(url, data=data).json()
+        rsp = response_json(requests.post(url, data=data))
         if rsp.get("code") == 200:
             logger.info("AnPush推送成功")
         else:
@@ -144,7 +148,13 @@ class MessagePusher:
             "spt": config["spt"],
         }
 
-        rsp = requests.post(url, json=data).json()
+        rsp = response_json(
+            requests.post(
+                url,
+                data=dumps(data),
+                headers={"Content-Type": "application/json"},
+            )
+        )
         if rsp.get("code") == 1000:
             logger.info("WxPusher推送成功")
         else:
@@ -0,0 +1,254 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+
+from util import JsonCodec
+
+logger = logging.getLogger(__name__)
+
+# 耗时直方图的桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """单个标签组合的直方图，只保存各桶计数、总和和次数。"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数。"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表，提供计数器和耗时直方图。
+
+    每次记录只做一次加锁和一次二分查找，可以放在请求热路径上。
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, object]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str) -> None:
+        """设置指标的说明文字（Prometheus HELP）。"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """计数器加值。"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """记录一次耗时。"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[Dict[str, object]]:
+        """
+        计时上下文，退出时记录耗时。
+
+        Yields:
+            Dict[str, object]: 可在上下文内修改的标签（例如根据结果设置 outcome）。
+        """
+        start = time.perf_counter()
+        try:
+            yield labels
+        except Exception:
+            labels.setdefault("outcome", "error")
+            raise
+        finally:
+            labels.setdefault("outcome", "success")
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        """清空所有指标。"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(key) + ([extra] if extra else [])
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+    def render_prometheus(self) -> str:
+        """
+        生成 Prometheus 文本格式的指标。
+
+        Returns:
+            str: Prometheus exposition 格式文本。
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        labels = self._format_labels(key, ("le", f"{bound:g}"))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = self._format_labels(key, ("le", "+Inf"))
+                    lines.append(f"{name}_bucket{labels} {histogram.count}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, list]:
+        """
+        生成便于阅读的 JSON 摘要。
+
+        Returns:
+            Dict[str, list]: 计数器取值，以及直方图的次数、平均值和 p50/p95/p99 估计。
+        """
+        result: Dict[str, list] = {}
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                result[name] = [
+                    {"labels": dict(key), "value": value} for key, value in series.items()
+                ]
+            for name, series in sorted(self._histograms.items()):
+                result[name] = [
+                    {
+                        "labels": dict(key),
+                        "count": h.count,
+                        "sum_seconds": round(h.sum, 6),
+                        "mean_seconds": round(h.sum / h.count, 6) if h.count else 0.0,
+                        "p50_seconds": h.quantile(0.5),
+                        "p95_seconds": h.quantile(0.95),
+                        "p99_seconds": h.quantile(0.99),
+                    }
+                    for key, h in series.items()
+                ]
+        return result
+
+    def write_prometheus(self, path: str) -> None:
+        """以原子替换的方式写入 Prometheus textfile（node_exporter textfile collector）。"""
+        _atomic_write(path, self.render_prometheus().encode("utf-8"))
+        logger.info(f"指标已写入: {path}")
+
+    def write_json(self, path: str) -> None:
+        """写入 JSON 摘要。"""
+        _atomic_write(path, JsonCodec.dumps(self.summary()))
+        logger.info(f"指标摘要已写入: {path}")
+
+
+def _escape(value: str) -> str:
+    """转义 Prometheus 标签值。"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# 全局指标注册表
+METRICS = MetricsRegistry()
+METRICS.describe("moguding_requests_total", "工学云接口请求次数")
+METRICS.describe("moguding_request_duration_seconds", "工学云接口单次请求耗时")
+METRICS.describe("moguding_request_retries_total", "工学云接口重试次数")
+METRICS.describe("moguding_relogin_total", "因 token 失效触发的重新登录次数")
+METRICS.describe("captcha_attempts_total", "验证码尝试次数")
+METRICS.describe("captcha_solve_duration_seconds", "验证码识别耗时")
+METRICS.describe("ai_request_duration_seconds", "AI 生成文章请求耗时")
+METRICS.describe("upload_duration_seconds", "图片上传耗时")
+
+
+def serve_metrics(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry = METRICS
+) -> ThreadingHTTPServer:
+    """
+    在后台线程中启动指标 HTTP 服务：/metrics 返回 Prometheus 文本，/metrics.json 返回 JSON 摘要。
+
+    Args:
+        port (int): 监听端口。
+        host (str): 监听地址，默认仅本机。
+        registry (MetricsRegistry): 指标注册表。
+
+    Returns:
+        ThreadingHTTPServer: 已启动的服务，调用 shutdown() 停止。
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - 覆盖基类签名
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body = JsonCodec.dumps(registry.summary())
+                content_type = "application/json"
+            elif self.path.startswith("/metrics"):
+                body = registry.render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"指标服务已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
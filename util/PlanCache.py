@@ -0,0 +1,58 @@
+import time
+from typing import Any, Dict, Optional
+
+from util.JsonCodec import dumps_str, loads
+from util.SqliteStore import SqliteStore
+
+# 实习计划缓存的默认有效期（秒）：计划在一个实习周期内基本不变
+DEFAULT_PLAN_TTL = 7 * 24 * 3600
+
+
+class PlanCache(SqliteStore):
+    """
+    实习计划的本地缓存：按账号保存 getPlanByStu 返回的计划（即 planInfo）。
+
+    通过环境变量 USER 传入的账号配置不会写回文件，没有缓存时每次运行都要重新查询计划。
+    缓存超过有效期后重新查询；依赖计划的接口调用失败时由调用方 invalidate() 后重新查询。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS plan_cache (
+        account TEXT PRIMARY KEY,
+        plan TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_PLAN_TTL, **kwargs):
+        """
+        Args:
+            path (str): 数据库文件路径。
+            ttl (float): 缓存有效期（秒），不大于 0 时缓存永不过期。
+        """
+        super().__init__(path, **kwargs)
+        self.ttl = ttl
+
+    def get(self, account: str) -> Optional[Dict[str, Any]]:
+        """返回账号未过期的实习计划，没有缓存或已过期时返回 None。"""
+        row = self.conn.execute(
+            "SELECT plan, fetched_at FROM plan_cache WHERE account = ?", (account,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self.ttl > 0 and time.time() - row["fetched_at"] > self.ttl:
+            return None
+        return loads(row["plan"])
+
+    def put(self, account: str, plan: Dict[str, Any]) -> None:
+        """保存账号的实习计划。"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO plan_cache (account, plan, fetched_at) VALUES (?, ?, ?)",
+                (account, dumps_str(plan), time.time()),
+            )
+
+    def invalidate(self, account: str) -> None:
+        """删除账号的缓存，下次运行时重新查询。"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM plan_cache WHERE account = ?", (account,))
@@ -0,0 +1,59 @@
+import logging
+import os
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# smaps_rollup 中需要的字段（单位 KiB）
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    读取进程的内存占用（单位字节），只支持 Linux。
+
+    rss 为常驻内存，uss 为进程独占（Private_Clean + Private_Dirty）的部分，即进程退出后能释放的内存；
+    pss 把共享页按共享的进程数平摊。多个工作进程共享只读映射的模型文件时，rss 仍会把共享页算进每个进程，
+    应该比较 uss。
+
+    Args:
+        pid (Optional[int]): 进程号，默认为当前进程。
+
+    Returns:
+        Dict[str, int]: 包含 rss、pss、shared、uss 的字典，无法读取时为空字典。
+    """
+    pid = pid or os.getpid()
+    values = dict.fromkeys(_FIELDS, 0)
+    # smaps_rollup 需要 Linux 4.14 以上，旧内核逐段累加 smaps
+    for name in ("smaps_rollup", "smaps"):
+        try:
+            with open(f"/proc/{pid}/{name}", encoding="ascii") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in values:
+                        values[key] += int(rest.split()[0])
+            break
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            logger.debug(f"读取进程 {pid} 的内存占用失败: {e}")
+            return {}
+    else:
+        return {}
+    return {
+        "rss": values["Rss"] * 1024,
+        "pss": values["Pss"] * 1024,
+        "shared": (values["Shared_Clean"] + values["Shared_Dirty"]) * 1024,
+        "uss": (values["Private_Clean"] + values["Private_Dirty"]) * 1024,
+    }
+
+
+def format_memory(usage: Dict[str, int]) -> str:
+    """将 memory_usage() 的结果格式化为一行日志。"""
+    if not usage:
+        return "无法读取"
+    mib = 1024 * 1024
+    return (
+        f"RSS {usage['rss'] / mib:.1f} MiB，PSS {usage['pss'] / mib:.1f} MiB，"
+        f"独占 {usage['uss'] / mib:.1f} MiB"
+    )
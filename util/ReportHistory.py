@@ -0,0 +1,147 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from util.SqliteStore import SqliteStore
+
+# 本地没有记录时一次拉取的条数（首次同步），之后每次只看第一页
+BACKFILL_PAGE_SIZE = 100
+INCREMENTAL_PAGE_SIZE = 10
+
+
+class ReportHistory(SqliteStore):
+    """
+    已提交报告的本地镜像：按账号和报告类型保存 listByStu 返回的记录以及服务器给出的总数（flag）。
+
+    sync() 只拉取比本地最新记录更新的页，因此每次运行的请求量与实习时长无关。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS report_history (
+        account TEXT NOT NULL,
+        report_type TEXT NOT NULL,
+        report_key TEXT NOT NULL,
+        create_time TEXT NOT NULL,
+        title TEXT,
+        weeks TEXT,
+        yearmonth TEXT,
+        PRIMARY KEY (account, report_type, report_key)
+    );
+    CREATE INDEX IF NOT EXISTS report_history_latest
+        ON report_history (account, report_type, create_time);
+    CREATE TABLE IF NOT EXISTS report_sync (
+        account TEXT NOT NULL,
+        report_type TEXT NOT NULL,
+        flag INTEGER NOT NULL,
+        synced_at REAL NOT NULL,
+        PRIMARY KEY (account, report_type)
+    );
+    """
+
+    @staticmethod
+    def _key(report: Dict[str, Any]) -> str:
+        """记录的唯一标识：优先使用 reportId，缺失时用提交时间和标题。"""
+        report_id = report.get("reportId") or report.get("id")
+        if report_id:
+            return str(report_id)
+        return f"{report.get('createTime')}|{report.get('title')}"
+
+    def _known(self, account: str, report_type: str, key: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM report_history "
+            "WHERE account = ? AND report_type = ? AND report_key = ?",
+            (account, report_type, key),
+        ).fetchone()
+        return row is not None
+
+    def sync(
+        self,
+        account: str,
+        report_type: str,
+        fetch_page: Callable[[int, int], Dict[str, Any]],
+    ) -> int:
+        """
+        从服务器增量同步：从第一页（最新）开始拉取，遇到本地已有的记录即停止。
+
+        Args:
+            account (str): 账号标识。
+            report_type (str): day、week 或 month。
+            fetch_page (Callable[[int, int], Dict[str, Any]]): 按（页码, 每页条数）请求 listByStu，
+                返回包含 data 和 flag 的响应。
+
+        Returns:
+            int: 新增的记录数。
+        """
+        has_local = self.latest(account, report_type) is not None
+        page_size = INCREMENTAL_PAGE_SIZE if has_local else BACKFILL_PAGE_SIZE
+        new_reports = []
+        flag = None
+        page = 1
+        while True:
+            rsp = fetch_page(page, page_size)
+            reports = rsp.get("data") or []
+            if flag is None:
+                flag = rsp.get("flag", 0) or 0
+            reached_known = False
+            for report in reports:
+                if self._known(account, report_type, self._key(report)):
+                    reached_known = True
+                    break
+                new_reports.append(report)
+            if reached_known or len(reports) < page_size:
+                break
+            if page * page_size >= flag:
+                break
+            page += 1
+
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO report_history "
+                "(account, report_type, report_key, create_time, title, weeks, yearmonth) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        account,
+                        report_type,
+                        self._key(report),
+                        report.get("createTime") or "",
+                        report.get("title"),
+                        report.get("weeks"),
+                        report.get("yearmonth"),
+                    )
+                    for report in new_reports
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO report_sync (account, report_type, flag, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (account, report_type, int(flag), time.time()),
+            )
+        return len(new_reports)
+
+    def latest(self, account: str, report_type: str) -> Optional[Dict[str, Any]]:
+        """本地最新的一条记录（字段与 listByStu 一致），没有记录时返回 None。"""
+        row = self.conn.execute(
+            "SELECT create_time, title, weeks, yearmonth FROM report_history "
+            "WHERE account = ? AND report_type = ? ORDER BY create_time DESC LIMIT 1",
+            (account, report_type),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "createTime": row["create_time"],
+            "title": row["title"],
+            "weeks": row["weeks"],
+            "yearmonth": row["yearmonth"],
+        }
+
+    def submitted_count(self, account: str, report_type: str) -> int:
+        """服务器最近一次给出的已提交数量（flag），用于计算下一份报告的序号。"""
+        row = self.conn.execute(
+            "SELECT flag FROM report_sync WHERE account = ? AND report_type = ?",
+            (account, report_type),
+        ).fetchone()
+        return row["flag"] if row is not None else 0
+
+    def summary(self, account: str, report_type: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """返回（最新记录, 已提交数量）。"""
+        return self.latest(account, report_type), self.submitted_count(account, report_type)
@@ -0,0 +1,134 @@
+import socket
+import threading
+from typing import Any, List, Optional
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """服务端返回的错误回复（-ERR ...）。"""
+
+
+class RespClient:
+    """
+    极简的 Redis 协议（RESP2）客户端，只依赖标准库。
+
+    每个线程使用独立的连接，因此 WATCH/MULTI/EXEC 等需要同一连接的命令序列可以在线程内安全使用。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str) -> "RespClient":
+        """
+        从 redis://[:password@]host:port/db 形式的地址创建客户端。
+
+        Args:
+            url (str): 连接地址。
+
+        Returns:
+            RespClient: 客户端实例。
+        """
+        parsed = urlparse(url)
+        db = parsed.path.lstrip("/")
+        return cls(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=parsed.password,
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self.execute("AUTH", self.password)
+            if self.db:
+                self.execute("SELECT", self.db)
+        return conn
+
+    def execute(self, *args: Any) -> Any:
+        """
+        发送一条命令并读取回复。
+
+        Returns:
+            Any: 状态回复为 str，整数回复为 int，批量回复为 bytes 或 None，数组回复为 list 或 None。
+
+        Raises:
+            RespError: 服务端返回错误回复。
+            OSError: 连接失败或断开，此时连接会被丢弃，下次调用重新连接。
+        """
+        sock, reader = self._connection()
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        try:
+            sock.sendall(b"".join(parts))
+            return self._read_reply(reader)
+        except OSError:
+            self.close()
+            raise
+
+    def _read_reply(self, reader) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("连接已被服务端关闭")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RespError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self._read_reply(reader) for _ in range(count)]
+        raise RespError(f"无法解析的回复: {line!r}")
+
+    def transaction(self, commands: List[List[Any]]) -> Optional[List[Any]]:
+        """
+        以 MULTI/EXEC 执行一组命令。
+
+        Args:
+            commands (List[List[Any]]): 命令列表。
+
+        Returns:
+            Optional[List[Any]]: 各命令的结果；若事务因 WATCH 的键被修改而放弃则为 None。
+        """
+        self.execute("MULTI")
+        for command in commands:
+            self.execute(*command)
+        return self.execute("EXEC")
+
+    def close(self) -> None:
+        """关闭当前线程的连接。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn[0].close()
+            finally:
+                self._local.conn = None
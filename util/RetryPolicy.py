@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from util.Concurrency import ACCOUNT_SLOTS
+from util.RunStats import record_retry
+
+T = TypeVar("T")
+
+# 幂等类别：只读请求可以放心重试；写入请求（save 等）只在确定请求没有到达服务器时重试
+IDEMPOTENT = "idempotent"
+NON_IDEMPOTENT = "non_idempotent"
+
+# 可重试的 HTTP 状态码
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 写入请求可重试的状态码：服务端明确表示未处理
+RETRYABLE_STATUS_NON_IDEMPOTENT = {429, 503}
+
+
+class DeadlineExceeded(ValueError):
+    """账号的执行时间预算已用完。"""
+
+
+class Deadline:
+    """一个账号的整体时间预算。"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self) -> None:
+        """预算已用完时抛出 DeadlineExceeded。"""
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"已超出 {self.seconds:g} 秒的执行时间预算")
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    为当前线程设置时间预算，上下文内所有按 RetryPolicy 发出的请求共享该预算。
+
+    嵌套时取更早到期的一个；seconds 为 None 或不大于 0 时不限制。
+
+    Yields:
+        Optional[Deadline]: 当前生效的预算。
+    """
+    previous = getattr(_local, "deadline", None)
+    current = previous
+    if seconds and seconds > 0:
+        candidate = Deadline(seconds)
+        if previous is None or candidate.expires_at < previous.expires_at:
+            current = candidate
+    _local.deadline = current
+    try:
+        yield current
+    finally:
+        _local.deadline = previous
+
+
+def current_deadline() -> Optional[Deadline]:
+    """返回当前线程的时间预算，未设置时为 None。"""
+    return getattr(_local, "deadline", None)
+
+
+def _never_sent(error: Exception) -> bool:
+    """判断请求是否确定没有发出（连接未建立），这种情况下写入请求也可以安全重试。"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+class RetryPolicy:
+    """
+    请求重试策略：带抖动的指数退避、单次请求超时、幂等类别，以及与账号时间预算的配合。
+
+    退避等待期间会暂时归还账号名额（ACCOUNT_SLOTS），不占用并发。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: float = 10.0,
+        idempotency: str = IDEMPOTENT,
+    ):
+        """
+        Args:
+            max_attempts (int): 最多尝试次数（含第一次）。
+            base_delay (float): 退避基数（秒），第 n 次重试前等待 [0, base_delay * 2^n] 内的随机时间。
+            max_delay (float): 单次退避的上限（秒）。
+            timeout (float): 单次请求的超时（秒），会被剩余的时间预算截断。
+            idempotency (str): IDEMPOTENT 或 NON_IDEMPOTENT。
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.idempotency = idempotency
+
+    def replace(self, **changes) -> "RetryPolicy":
+        """返回修改了部分参数的新策略。"""
+        params = {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "timeout": self.timeout,
+            "idempotency": self.idempotency,
+        }
+        params.update(changes)
+        return RetryPolicy(**params)
+
+    def request_timeout(self) -> float:
+        """
+        本次请求可用的超时时间。
+
+        Raises:
+            DeadlineExceeded: 时间预算已用完。
+        """
+        budget = current_deadline()
+        if budget is None:
+            return self.timeout
+        budget.check()
+        return min(self.timeout, budget.remaining())
+
+    def is_retryable(self, error: Exception) -> bool:
+        """根据异常类型和幂等类别判断是否可以重试。"""
+        if isinstance(error, DeadlineExceeded):
+            return False
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = error.response.status_code if error.response is not None else None
+            allowed = (
+                RETRYABLE_STATUS
+                if self.idempotency == IDEMPOTENT
+                else RETRYABLE_STATUS_NON_IDEMPOTENT
+            )
+            return status in allowed
+        if self.idempotency == NON_IDEMPOTENT:
+            return _never_sent(error)
+        return isinstance(
+            error,
+            (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试（从 0 开始）前的等待时间，采用 full jitter。"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    @staticmethod
+    def wait(delay: float) -> None:
+        """
+        退避等待，等待期间归还账号名额。
+
+        Raises:
+            DeadlineExceeded: 剩余时间预算不足以等待并再试一次。
+        """
+        budget = current_deadline()
+        if budget is not None and delay >= budget.remaining():
+            raise DeadlineExceeded(f"剩余时间预算不足，放弃重试（需等待 {delay:.2f} 秒）")
+        with ACCOUNT_SLOTS.paused():
+            time.sleep(delay)
+
+    def call(
+        self,
+        func: Callable[[float], T],
+        on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    ) -> T:
+        """
+        按策略执行 func，失败时重试。
+
+        Args:
+            func (Callable[[float], T]): 接收本次请求超时时间的函数。
+            on_retry (Optional[Callable[[int, Exception, float], None]]): 每次重试前调用，
+                参数为已失败的次数、异常和即将等待的秒数。
+
+        Returns:
+            T: func 的返回值。
+
+        Raises:
+            Exception: 不可重试的异常、重试用尽后的最后一个异常，或 DeadlineExceeded。
+        """
+        attempt = 0
+        while True:
+            try:
+                return func(self.request_timeout())
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                record_retry()
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+                self.wait(delay)
+                attempt += 1
+
+
+# 工学云接口的默认策略：只读接口
+READ_POLICY = RetryPolicy(max_attempts=5, base_delay=1.0, timeout=10.0)
+# 提交类接口（save）和验证码校验（check，验证码只能用一次）：只在请求确定没有发出时重试
+WRITE_POLICY = RetryPolicy(
+    max_attempts=3, base_delay=2.0, timeout=15.0, idempotency=NON_IDEMPOTENT
+)
+
+# 非幂等接口路径的最后一段
+NON_IDEMPOTENT_ACTIONS = ("save", "check")
+
+# 按接口覆盖的策略
+ENDPOINT_POLICIES: Dict[str, RetryPolicy] = {
+    # 岗位信息可缺省，少重试几次即可
+    "practice/job/v4/infoByStu": READ_POLICY.replace(max_attempts=3),
+}
+
+
+def policy_for(endpoint: str) -> RetryPolicy:
+    """
+    返回工学云接口对应的重试策略：优先按接口覆盖，其次 save/check 视为写入，其余为只读。
+
+    Args:
+        endpoint (str): 接口路径，例如 attendence/clock/v5/save。
+    """
+    policy = ENDPOINT_POLICIES.get(endpoint)
+    if policy is not None:
+        return policy
+    if endpoint.rsplit("/", 1)[-1] in NON_IDEMPOTENT_ACTIONS:
+        return WRITE_POLICY
+    return READ_POLICY
@@ -0,0 +1,319 @@
+import logging
+import math
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from util.JsonCodec import dumps_str, loads
+from util.RunStats import RunStats
+from util.SqliteStore import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+# 缓冲的账号数达到该值时写入一次
+DEFAULT_BATCH_SIZE = 500
+# 缓冲未满一批时最多等待的秒数（守护进程模式下账号较少，凑不满一批）
+DEFAULT_FLUSH_INTERVAL = 60.0
+
+
+def _days_ago(days: int, until: Optional[str] = None) -> str:
+    """until（默认今天）往前第 days - 1 天的日期，即包含 until 在内最近 days 天的第一天。"""
+    end = date.fromisoformat(until) if until else date.today()
+    return (end - timedelta(days=days - 1)).isoformat()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """已排序数值的 q 分位数（最近秩法），values 不能为空。"""
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+class RunHistory(SqliteStore):
+    """
+    执行历史：每个账号每次执行追加一行（runs），各任务的结果各一行（run_tasks），只追加不修改。
+
+    runs 记录执行日期、窗口、总耗时、各阶段耗时（phases，JSON，毫秒）、请求重试次数和验证码尝试次数；
+    run_tasks 记录任务类型、状态和精简后的消息，并冗余账号和日期，按账号、日期、任务类型的查询都走索引。
+
+    append() 只把记录放入内存缓冲，由后台写入线程每 batch_size 个账号或每 flush_interval 秒在一个事务中
+    写入，执行账号的线程不访问数据库（连接是每个线程一个，由各线程轮流写入会为每个线程各建一个连接和页缓存）。
+    执行结束时调用 flush() 写入剩余部分。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY,
+        account TEXT,
+        run_date TEXT NOT NULL,
+        run_window TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        duration_ms REAL,
+        phases TEXT,
+        retries INTEGER NOT NULL DEFAULT 0,
+        captcha_attempts INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS runs_account ON runs (account, run_date);
+    CREATE INDEX IF NOT EXISTS runs_date ON runs (run_date, duration_ms);
+    CREATE TABLE IF NOT EXISTS run_tasks (
+        run_id INTEGER NOT NULL,
+        account TEXT,
+        run_date TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        message TEXT
+    );
+    CREATE INDEX IF NOT EXISTS run_tasks_run ON run_tasks (run_id);
+    CREATE INDEX IF NOT EXISTS run_tasks_account ON run_tasks (account, run_date);
+    CREATE INDEX IF NOT EXISTS run_tasks_type ON run_tasks (task_type, run_date, status);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        """
+        Args:
+            path (str): 数据库文件路径。
+            batch_size (int): 每次写入的账号数。
+            flush_interval (float): 缓冲的最长时间（秒）。
+        """
+        super().__init__(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Optional[str], List[Dict[str, Any]], RunStats]] = []
+        self._writer: Optional[threading.Thread] = None
+
+    def append(
+        self, account: Optional[str], records: List[Dict[str, Any]], stats: RunStats
+    ) -> None:
+        """
+        缓冲一个账号一次执行的记录，缓冲满一批时通知写入线程。
+
+        Args:
+            account (Optional[str]): 手机号。
+            records (List[Dict[str, Any]]): 精简后的任务记录（见 RunLog.compact_results）。
+            stats (RunStats): 本次执行的统计。
+        """
+        with self._cond:
+            self._pending.append((account, records, stats))
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="run-history", daemon=True
+                )
+                self._writer.start()
+            elif len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.batch_size, self.flush_interval
+                )
+            self.flush()
+
+    def flush(self) -> int:
+        """写入缓冲中的全部记录，返回写入的账号数。写入失败时记录日志并丢弃这一批。"""
+        with self._cond:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            with self.transaction() as conn:
+                for account, records, stats in pending:
+                    self._insert(conn, account, records, stats)
+        except sqlite3.Error as e:
+            logger.error(f"写入执行历史 {self.path} 失败（{len(pending)} 个账号）: {e}")
+            return 0
+        return len(pending)
+
+    @staticmethod
+    def _insert(
+        conn: sqlite3.Connection,
+        account: Optional[str],
+        records: List[Dict[str, Any]],
+        stats: RunStats,
+    ) -> None:
+        started = datetime.fromtimestamp(stats.started_at or time.time())
+        run_date = f"{started:%Y-%m-%d}"
+        cursor = conn.execute(
+            "INSERT INTO runs (account, run_date, run_window, started_at, duration_ms, "
+            "phases, retries, captcha_attempts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                account,
+                run_date,
+                f"{run_date}-{'AM' if started.hour < 12 else 'PM'}",
+                started.timestamp(),
+                None if stats.duration is None else round(stats.duration * 1000, 1),
+                dumps_str({k: round(v * 1000, 1) for k, v in stats.phases.items()}),
+                stats.retries,
+                stats.captcha_attempts,
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO run_tasks (run_id, account, run_date, task_type, status, message) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    cursor.lastrowid,
+                    account,
+                    run_date,
+                    record["task_type"],
+                    record["status"],
+                    record["message"],
+                )
+                for record in records
+            ],
+        )
+
+    def failure_streaks(
+        self, task_type: str, days: int, until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        截至 until 的最近 days 天里，每天都执行了 task_type 且当天没有一次成功的账号。
+
+        Args:
+            task_type (str): 任务类型，例如 打卡、日报提交。
+            days (int): 连续天数。
+            until (Optional[str]): 最后一天（YYYY-MM-DD），默认为今天。
+
+        Returns:
+            List[Dict[str, Any]]: 每个账号一项，含 account、days（失败天数）和 last_message（最近一次失败的消息）。
+        """
+        until = until or date.today().isoformat()
+        rows = self.conn.execute(
+            "SELECT account, COUNT(*) AS days, "
+            "(SELECT message FROM run_tasks t WHERE t.account = f.account AND t.task_type = ? "
+            "AND t.status = 'fail' ORDER BY t.run_date DESC, t.rowid DESC LIMIT 1) AS last_message "
+            "FROM ("
+            "  SELECT account, run_date FROM run_tasks "
+            "  WHERE task_type = ? AND run_date BETWEEN ? AND ? "
+            "  GROUP BY account, run_date "
+            "  HAVING SUM(status = 'fail') > 0 AND SUM(status = 'success') = 0"
+            ") f GROUP BY account HAVING COUNT(*) >= ? ORDER BY account",
+            (task_type, task_type, _days_ago(days, until), until, days),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _values_by_date(
+        self, since: str, phase: Optional[str]
+    ) -> Iterator[Tuple[str, List[float]]]:
+        """按日期依次返回当天各次执行的耗时（升序），phase 为空时为总耗时。"""
+        if phase:
+            cursor = self.conn.execute(
+                "SELECT run_date, value FROM ("
+                "  SELECT run_date, json_extract(phases, ?) AS value FROM runs WHERE run_date >= ?"
+                ") WHERE value IS NOT NULL ORDER BY run_date, value",
+                ('$."' + phase.replace('"', '\\"') + '"', since),
+            )
+        else:
+            cursor = self.conn.execute(
+                "SELECT run_date, duration_ms AS value FROM runs "
+                "WHERE run_date >= ? AND duration_ms IS NOT NULL ORDER BY run_date, duration_ms",
+                (since,),
+            )
+        current: Optional[str] = None
+        values: List[float] = []
+        for row in cursor:
+            if row["run_date"] != current:
+                if values:
+                    yield current, values
+                current, values = row["run_date"], []
+            values.append(row["value"])
+        if values:
+            yield current, values
+
+    def duration_stats(
+        self, days: int = 7, phase: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        最近 days 天每天的执行耗时分布。
+
+        Args:
+            days (int): 天数（含今天）。
+            phase (Optional[str]): 阶段名（见 main._run），默认为 None 时统计每个账号的总耗时。
+
+        Returns:
+            List[Dict[str, Any]]: 每天一项，含 date、runs、p50、p95、max（毫秒）。
+        """
+        return [
+            {
+                "date": run_date,
+                "runs": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": values[-1],
+            }
+            for run_date, values in self._values_by_date(_days_ago(days), phase)
+        ]
+
+    def daily_summary(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        最近 days 天每天每种任务的结果数，以及每天的执行次数、重试次数和验证码尝试次数。
+
+        Returns:
+            List[Dict[str, Any]]: 每天每种任务一项，含 date、task_type、success、fail、skip、
+                runs、retries、captcha_attempts（后三项为当天所有执行的合计，同一天各项相同）。
+        """
+        since = _days_ago(days)
+        totals = {
+            row["run_date"]: row
+            for row in self.conn.execute(
+                "SELECT run_date, COUNT(*) AS runs, SUM(retries) AS retries, "
+                "SUM(captcha_attempts) AS captcha_attempts FROM runs "
+                "WHERE run_date >= ? GROUP BY run_date",
+                (since,),
+            )
+        }
+        rows = self.conn.execute(
+            "SELECT run_date, task_type, SUM(status = 'success') AS success, "
+            "SUM(status = 'fail') AS fail, SUM(status = 'skip') AS skip FROM run_tasks "
+            "WHERE run_date >= ? GROUP BY run_date, task_type ORDER BY run_date, task_type",
+            (since,),
+        ).fetchall()
+        summary = []
+        for row in rows:
+            total = totals.get(row["run_date"])
+            summary.append(
+                {
+                    "date": row["run_date"],
+                    "task_type": row["task_type"],
+                    "success": row["success"],
+                    "fail": row["fail"],
+                    "skip": row["skip"],
+                    "runs": total["runs"] if total else 0,
+                    "retries": total["retries"] if total else 0,
+                    "captcha_attempts": total["captcha_attempts"] if total else 0,
+                }
+            )
+        return summary
+
+    def account_runs(self, account: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        账号最近 limit 次执行，按时间倒序。
+
+        Returns:
+            List[Dict[str, Any]]: 每次执行一项，含 runs 表的各列（phases 已解析）和 tasks（各任务的结果）。
+        """
+        runs = [
+            dict(row)
+            for row in self.conn.execute(
+                "SELECT * FROM runs WHERE account = ? ORDER BY run_date DESC, run_id DESC LIMIT ?",
+                (account, limit),
+            )
+        ]
+        for run in runs:
+            run["phases"] = loads(run["phases"]) if run["phases"] else {}
+            run["tasks"] = [
+                dict(row)
+                for row in self.conn.execute(
+                    "SELECT task_type, status, message FROM run_tasks WHERE run_id = ?",
+                    (run["run_id"],),
+                )
+            ]
+        return runs
@@ -0,0 +1,73 @@
+import time
+from typing import Any, Dict, Optional
+
+from util.JsonCodec import dumps_str, loads
+from util.SqliteStore import SqliteStore
+
+
+class RunLedger(SqliteStore):
+    """
+    本地执行台账：记录每个账号已经确认完成的打卡和报告，以及最近一次的打卡记录。
+
+    同一天内多次触发定时任务时，可以直接从台账判断“已完成”，不必登录和请求服务器。
+    kind 为 clock_in / day / week / month，period 为对应的周期标识（见 main 中的调用方）。
+    最近一次的打卡记录用于提供上次打卡地址，避免为此查询整月的打卡记录。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS run_ledger (
+        account TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        period TEXT NOT NULL,
+        recorded_at REAL NOT NULL,
+        detail TEXT,
+        PRIMARY KEY (account, kind, period)
+    );
+    CREATE TABLE IF NOT EXISTS last_checkin (
+        account TEXT PRIMARY KEY,
+        record TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """
+
+    def has(self, account: str, kind: str, period: str) -> bool:
+        """台账中是否已有该周期的完成记录。"""
+        row = self.conn.execute(
+            "SELECT 1 FROM run_ledger WHERE account = ? AND kind = ? AND period = ?",
+            (account, kind, period),
+        ).fetchone()
+        return row is not None
+
+    def record(
+        self, account: str, kind: str, period: str, detail: Optional[str] = None
+    ) -> None:
+        """记录一次完成（重复记录时更新时间和说明）。"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO run_ledger "
+                "(account, kind, period, recorded_at, detail) VALUES (?, ?, ?, ?, ?)",
+                (account, kind, period, time.time(), detail),
+            )
+
+    def last_checkin(self, account: str) -> Optional[Dict[str, Any]]:
+        """账号最近一次的打卡记录（字段与 listSynchro 一致），没有缓存时返回 None。"""
+        row = self.conn.execute(
+            "SELECT record FROM last_checkin WHERE account = ?", (account,)
+        ).fetchone()
+        return loads(row["record"]) if row is not None else None
+
+    def set_last_checkin(self, account: str, record: Dict[str, Any]) -> None:
+        """更新账号最近一次的打卡记录，只保留 createTime 更新的一条。"""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT record FROM last_checkin WHERE account = ?", (account,)
+            ).fetchone()
+            if row is not None:
+                cached = loads(row["record"])
+                if cached.get("createTime", "") > record.get("createTime", ""):
+                    return
+            conn.execute(
+                "INSERT OR REPLACE INTO last_checkin (account, record, updated_at) "
+                "VALUES (?, ?, ?)",
+                (account, dumps_str(record), time.time()),
+            )
@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from util.JsonCodec import dumps
+
+logger = logging.getLogger(__name__)
+
+# 精简记录中消息的最大长度，超出部分截断
+MAX_MESSAGE_LENGTH = 200
+
+
+def compact_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将任务结果精简为只含 task_type、status、message 的记录。
+
+    完整结果中的 details 和 report_content（报告全文）只用于推送，推送后不再保留。
+
+    Args:
+        results (List[Dict[str, Any]]): run() 中各任务返回的结果。
+
+    Returns:
+        List[Dict[str, Any]]: 精简记录。
+    """
+    records = []
+    for result in results:
+        message = str(result.get("message", ""))
+        if len(message) > MAX_MESSAGE_LENGTH:
+            message = message[:MAX_MESSAGE_LENGTH] + "…"
+        records.append(
+            {
+                "task_type": result.get("task_type", "未知任务"),
+                "status": result.get("status", "unknown"),
+                "message": message,
+            }
+        )
+    return records
+
+
+class RunLog:
+    """
+    以 JSON Lines 追加写入每个账号的执行结果：每个账号结束时写一行，写完即刷新，不在内存中累积。
+
+    每行包含结束时间（time）、账号（手机号）和精简后的任务记录（results）。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): 日志文件路径，已存在时追加。
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def write(self, account: Optional[str], records: List[Dict[str, Any]]) -> None:
+        """写入一个账号的精简记录。"""
+        line = dumps({"time": time.time(), "account": account, "results": records})
+        with self._lock:
+            try:
+                self._file.write(line + b"\n")
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                logger.error(f"写入执行日志 {self.path} 失败: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
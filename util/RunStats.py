@@ -0,0 +1,93 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+_local = threading.local()
+
+
+class RunStats:
+    """
+    一个账号一次执行的统计：开始时间、总耗时、各阶段耗时、请求重试次数和验证码尝试次数。
+
+    登录时并行识别的验证码在临时线程中尝试，计数需要加锁。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.retries = 0
+        self.captcha_attempts = 0
+
+    @contextmanager
+    def timing(self) -> Iterator[None]:
+        """记录开始时间和总耗时。"""
+        self.started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.duration = time.perf_counter() - start
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """累加一个阶段的耗时，同一阶段执行多次（如计划变更后重试任务）时合计。"""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def add_captcha_attempt(self) -> None:
+        with self._lock:
+            self.captcha_attempts += 1
+
+
+@contextmanager
+def collect_stats(stats: Optional[RunStats]) -> Iterator[Optional[RunStats]]:
+    """
+    在当前线程中将重试、验证码尝试和阶段耗时记入 stats（为 None 时不记录），退出时恢复之前的设置。
+
+    统计是线程内的，需要在临时线程中继续记入同一账号时，将 stats 带到临时线程中再次调用。
+    """
+    previous = getattr(_local, "stats", None)
+    _local.stats = stats
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
+
+
+def current_stats() -> Optional[RunStats]:
+    """当前线程正在收集的统计，没有时返回 None。"""
+    return getattr(_local, "stats", None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """记录一个阶段的耗时，当前线程没有收集统计时不做任何事。"""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_phase(name, time.perf_counter() - start)
+
+
+def record_retry() -> None:
+    """当前账号的请求重试次数加一。"""
+    stats = current_stats()
+    if stats is not None:
+        stats.add_retry()
+
+
+def record_captcha_attempt() -> None:
+    """当前账号的验证码尝试次数加一（每获取并识别一张验证码计一次）。"""
+    stats = current_stats()
+    if stats is not None:
+        stats.add_captcha_attempt()
@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认的每日执行时刻：上午完成上班打卡，傍晚完成下班打卡和日/周/月报
+DEFAULT_TIMES = ("08:00", "18:00")
+
+
+def parse_times(times: Iterable[str]) -> List[Tuple[int, int]]:
+    """
+    解析 "HH:MM" 格式的时刻列表。
+
+    Args:
+        times (Iterable[str]): 时刻列表，例如 ["08:00", "18:00"]。
+
+    Returns:
+        List[Tuple[int, int]]: 按时间排序的 (小时, 分钟) 列表。
+
+    Raises:
+        ValueError: 时刻格式不正确时抛出。
+    """
+    parsed = []
+    for value in times:
+        try:
+            hour, minute = (int(part) for part in str(value).split(":"))
+        except ValueError:
+            raise ValueError(f"时刻格式不正确: {value}，应为 HH:MM")
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"时刻超出范围: {value}")
+        parsed.append((hour, minute))
+    if not parsed:
+        raise ValueError("至少需要一个执行时刻")
+    return sorted(set(parsed))
+
+
+def next_run_time(
+    times: List[Tuple[int, int]],
+    now: datetime,
+    jitter_minutes: float = 0,
+    rng: Optional[random.Random] = None,
+) -> datetime:
+    """
+    计算下一次执行时间。
+
+    抖动只向后偏移 [0, jitter_minutes] 分钟，保证不会早于设定时刻（例如 12:00 的任务
+    不会提前到上午而被当作上班打卡）。
+
+    Args:
+        times (List[Tuple[int, int]]): parse_times 的结果。
+        now (datetime): 当前时间。
+        jitter_minutes (float): 最大随机延后分钟数。
+        rng (Optional[random.Random]): 随机数生成器，默认使用 random 模块。
+
+    Returns:
+        datetime: 下一次执行时间，一定晚于 now。
+    """
+    rng = rng or random
+    for day in (0, 1):
+        date = (now + timedelta(days=day)).date()
+        for hour, minute in times:
+            slot = datetime.combine(date, datetime.min.time()).replace(
+                hour=hour, minute=minute
+            )
+            if slot > now:
+                return slot + timedelta(seconds=rng.uniform(0, jitter_minutes * 60))
+    raise AssertionError("unreachable")
+
+
+class Scheduler:
+    """
+    按时间触发的任务队列，每个键最多只有一个待执行的时间。
+
+    使用最小堆保存到期时间，重新安排时旧条目惰性作废，适合成百上千个账号。
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._current: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def schedule(self, key: str, when: datetime) -> None:
+        """安排（或重新安排）某个键的下一次执行时间。"""
+        with self._cond:
+            seq = next(self._counter)
+            self._current[key] = seq
+            heapq.heappush(self._heap, (when, seq, key))
+            self._cond.notify()
+
+    def cancel(self, key: str) -> None:
+        """取消某个键的待执行任务。"""
+        with self._cond:
+            self._current.pop(key, None)
+
+    def wake(self) -> None:
+        """唤醒正在 wait_due 的线程（例如需要退出或重新加载时）。"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_due(self, timeout: float) -> List[str]:
+        """
+        等待直到有任务到期或超时。
+
+        Args:
+            timeout (float): 最长等待秒数。
+
+        Returns:
+            List[str]: 已到期的键，到期后即从队列中移除。
+        """
+        with self._cond:
+            self._discard_stale()
+            if self._heap:
+                delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(min(timeout, delay))
+            else:
+                self._cond.wait(timeout)
+
+            due = []
+            now = datetime.now()
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, key = heapq.heappop(self._heap)
+                if self._current.get(key) == seq:
+                    del self._current[key]
+                    due.append(key)
+            return due
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._current.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+
+class DirectoryWatcher:
+    """通过比较修改时间轮询目录中配置文件的增删改，不依赖 inotify 等平台特性。"""
+
+    def __init__(self, path: str, suffix: str = ".json"):
+        self.path = path
+        self.suffix = suffix
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        snapshot = {}
+        try:
+            for entry in os.scandir(self.path):
+                if entry.is_file() and entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    snapshot[entry.name[: -len(self.suffix)]] = (
+                        stat.st_mtime,
+                        stat.st_size,
+                    )
+        except OSError as e:
+            logger.error(f"扫描配置文件目录失败: {e}")
+        return snapshot
+
+    def names(self) -> Set[str]:
+        """返回当前已知的文件名（不含后缀）。"""
+        return set(self._snapshot)
+
+    def poll(self, ignore: Iterable[str] = ()) -> Tuple[Set[str], Set[str]]:
+        """
+        检查自上次调用以来的变化。
+
+        Args:
+            ignore (Iterable[str]): 暂不处理的文件名，其变化会保留到之后的 poll。
+
+        Returns:
+            Tuple[Set[str], Set[str]]: (新增或修改的文件名, 删除的文件名)，均不含后缀。
+        """
+        ignore = set(ignore)
+        snapshot = self._scan()
+        for name in ignore:
+            if name in self._snapshot:
+                snapshot[name] = self._snapshot[name]
+            else:
+                snapshot.pop(name, None)
+        changed = {
+            name for name, stamp in snapshot.items() if self._snapshot.get(name) != stamp
+        }
+        removed = set(self._snapshot) - set(snapshot)
+        self._snapshot = snapshot
+        return changed, removed
+
+    def acknowledge(self, name: str) -> None:
+        """把某个文件的当前状态记为已知（例如程序自己写回配置后），不再报告为变更。"""
+        try:
+            stat = os.stat(os.path.join(self.path, f"{name}{self.suffix}"))
+        except OSError:
+            return
+        self._snapshot[name] = (stat.st_mtime, stat.st_size)
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class SqliteStore:
+    """
+    SQLite 存储的公共基类：每个线程一个连接、统一的 PRAGMA、建表和写事务。
+
+    子类通过 SCHEMA 提供建表语句（可包含多条，需幂等）。
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str, wal: bool = True, timeout: float = 30):
+        """
+        初始化存储并建表。
+
+        Args:
+            path (str): 数据库文件路径，所在目录不存在时自动创建。
+            wal (bool): 是否使用 WAL 日志模式。多台机器通过网络共享磁盘访问同一文件时必须关闭，
+                因为 WAL 依赖本机共享内存。
+            timeout (float): 等待其它连接释放锁的秒数。
+        """
+        self.path = path
+        self.wal = wal
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if self.SCHEMA:
+            self.conn.executescript(self.SCHEMA)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """当前线程的连接（自动提交模式，写操作请使用 transaction()）。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={'WAL' if self.wal else 'DELETE'}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        以 BEGIN IMMEDIATE 开启写事务，立即获取写锁，避免读后写升级时的死锁。
+
+        Yields:
+            sqlite3.Connection: 当前线程的连接。
+        """
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """关闭当前线程的连接。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
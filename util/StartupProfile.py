@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+# 默认视为“重量级”的依赖，启动时不应被导入
+HEAVY_MODULES = ("cv2", "numpy", "onnxruntime", "PIL")
+
+
+class ImportRecord(NamedTuple):
+    """一条 -X importtime 记录，耗时单位为微秒。"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str = "main") -> List[ImportRecord]:
+    """
+    在子进程中以 -X importtime 导入指定模块，解析每个模块的导入耗时。
+
+    Args:
+        module (str): 要导入的模块名，默认为 main。
+
+    Returns:
+        List[ImportRecord]: 按导入完成顺序排列的记录。
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # 表头
+        records.append(
+            ImportRecord(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            )
+        )
+    return records
+
+
+def print_startup_profile(module: str = "main", top: int = 20) -> None:
+    """
+    打印启动导入耗时分解：总耗时、累计耗时最高的模块，以及是否提前导入了重量级依赖。
+
+    Args:
+        module (str): 要分析的模块名，默认为 main。
+        top (int): 显示的模块数量。
+    """
+    records = profile_imports(module)
+    total = next((r.cumulative_us for r in records if r.module == module), 0)
+    print(f"导入 {module} 共耗时 {total / 1000:.1f}ms（{len(records)} 个模块）")
+    print(f"{'累计(ms)':>10}{'自身(ms)':>10}  模块")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(
+            f"{record.cumulative_us / 1000:>10.1f}{record.self_us / 1000:>10.1f}  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+    loaded = {r.module.split(".")[0] for r in records}
+    eager = [name for name in HEAVY_MODULES if name in loaded]
+    if eager:
+        print(f"启动时导入了重量级依赖: {', '.join(eager)}")
+    else:
+        print("启动时未导入重量级依赖（验证码、图片处理模块将在首次使用时加载）")
@@ -0,0 +1,132 @@
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from util import JsonCodec
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """
+    轻量级的 span 追踪器，导出为 Chrome trace / Perfetto 可读取的 JSON。
+
+    未启用时 span() 只做一次属性判断，不记录任何数据。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        """开始记录 span，并清空之前的数据。"""
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._origin_ns = time.perf_counter_ns()
+        self.enabled = True
+
+    def set_account(self, account: Optional[str]) -> None:
+        """设置当前线程的账号标识（应已脱敏），之后的 span 都会带上该标签。"""
+        self._local.account = account
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """
+        记录一段耗时。
+
+        Args:
+            name (str): span 名称。
+            **args: 附加在 span 上的参数。
+        """
+        if not self.enabled:
+            yield
+            return
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        except Exception as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            end_ns = time.perf_counter_ns()
+            account = getattr(self._local, "account", None)
+            if account:
+                args["account"] = account
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": args,
+            }
+            with self._lock:
+                self._events.append(event)
+                self._threads.setdefault(thread.ident, thread.name)
+
+    def export(self, path: str) -> None:
+        """
+        导出为 Chrome trace JSON（可在 chrome://tracing 或 ui.perfetto.dev 打开）。
+
+        Args:
+            path (str): 输出文件路径。
+        """
+        pid = os.getpid()
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            events = metadata + self._events
+        with open(path, "wb") as f:
+            f.write(JsonCodec.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        logger.info(f"追踪数据已导出: {path}（{len(events) - len(metadata)} 个 span）")
+
+
+# 全局追踪器
+TRACER = Tracer()
+
+
+def span(name: str, **args: Any):
+    """在全局追踪器上记录一个 span，参见 Tracer.span。"""
+    return TRACER.span(name, **args)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    为函数调用记录 span 的装饰器。
+
+    Args:
+        name (Optional[str]): span 名称，默认为函数的限定名。
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
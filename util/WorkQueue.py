@@ -0,0 +1,410 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from util import JsonCodec
+from util.RespClient import RespClient
+from util.SqliteStore import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+# 默认租约时长（秒）；持有者每隔 1/3 租约续期一次，节点宕机后最多这么久任务会被其它节点接手
+DEFAULT_LEASE_SECONDS = 120
+# 任务失败后最多执行的次数（含第一次），用尽后标记为失败，不再重新入队
+DEFAULT_MAX_ATTEMPTS = 3
+# 任务失败后重新可被领取前等待的秒数
+DEFAULT_RETRY_DELAY = 60
+
+
+class LeaseLostError(Exception):
+    """租约已过期并被其它节点接手，当前节点不应再产生任何副作用。"""
+
+
+class Lease:
+    """
+    一次领取到的任务。
+
+    Attributes:
+        window (str): 任务所属的执行窗口，例如 "2025-01-01-AM"。
+        key (str): 任务键（账号手机号）。
+        payload (Any): 入队时保存的数据（账号配置）。
+        token (int): 单调递增的防护令牌，每次被领取加一，只有持有最新令牌的节点能续期或完成；
+            同时也是该任务被领取的次数。
+        worker (str): 领取者标识。
+    """
+
+    __slots__ = ("window", "key", "payload", "token", "worker")
+
+    def __init__(self, window: str, key: str, payload: Any, token: int, worker: str):
+        self.window = window
+        self.key = key
+        self.payload = payload
+        self.token = token
+        self.worker = worker
+
+
+class SqliteLeaseQueue(SqliteStore):
+    """
+    基于 SQLite 的租约队列，可放在多台机器共享的磁盘上（此时自动关闭 WAL）。
+
+    未完成的任务 available_at 表示可被领取的时间：刚入队时为入队时间，被领取后为租约到期时间，
+    因此租约过期的任务无需额外回收即可被其它节点再次领取。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lease_jobs (
+            run_window TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            owner TEXT,
+            token INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            PRIMARY KEY (run_window, key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_lease_jobs_claim
+            ON lease_jobs (run_window, done, available_at);
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path, wal=False)
+
+    def enqueue(self, window: str, jobs: Dict[str, Any]) -> int:
+        """
+        入队，同一窗口内已存在（包括已完成）的键会被忽略。
+
+        Args:
+            window (str): 执行窗口。
+            jobs (Dict[str, Any]): 任务键到数据的映射。
+
+        Returns:
+            int: 新加入的任务数。
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO lease_jobs (run_window, key, payload, available_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(window, key, JsonCodec.dumps_str(p), now) for key, p in jobs.items()],
+            )
+            return conn.total_changes - before
+
+    def claim(self, window: str, worker: str, lease_seconds: float) -> Optional[Lease]:
+        """领取一个可执行的任务，没有时返回 None。"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT key, payload, token FROM lease_jobs "
+                "WHERE run_window = ? AND done = 0 AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (window, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE lease_jobs SET available_at = ?, owner = ?, token = token + 1, "
+                "attempts = attempts + 1 WHERE run_window = ? AND key = ?",
+                (now + lease_seconds, worker, window, row["key"]),
+            )
+        payload = JsonCodec.loads(row["payload"])
+        return Lease(window, row["key"], payload, row["token"] + 1, worker)
+
+    def _update_held(self, lease: Lease, assignments: str, params: tuple) -> bool:
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE lease_jobs SET {assignments} "
+                "WHERE run_window = ? AND key = ? AND token = ? AND done = 0",
+                params + (lease.window, lease.key, lease.token),
+            )
+            return cursor.rowcount == 1
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """续期，返回是否仍持有租约。"""
+        return self._update_held(lease, "available_at = ?", (time.time() + lease_seconds,))
+
+    def complete(self, lease: Lease, result: str = "done") -> bool:
+        """标记完成，返回是否成功（租约已被接手时返回 False）。"""
+        return self._update_held(lease, "done = 1, result = ?", (result,))
+
+    def release(self, lease: Lease, delay: float = 0) -> bool:
+        """放弃租约，任务在 delay 秒后可被其它节点领取。"""
+        return self._update_held(
+            lease, "available_at = ?, owner = NULL", (time.time() + delay,)
+        )
+
+    def stats(self, window: str) -> Dict[str, int]:
+        """返回窗口内可领取、租用中、已完成的任务数。"""
+        row = self.conn.execute(
+            "SELECT "
+            "COALESCE(SUM(done = 0 AND available_at <= ?), 0) AS ready, "
+            "COALESCE(SUM(done = 0 AND available_at > ?), 0) AS leased, "
+            "COALESCE(SUM(done = 1), 0) AS done "
+            "FROM lease_jobs WHERE run_window = ?",
+            (time.time(), time.time(), window),
+        ).fetchone()
+        return dict(row)
+
+
+class RedisLeaseQueue:
+    """
+    基于 Redis 协议的租约队列，只使用 WATCH/MULTI/EXEC 和基本的有序集合、哈希命令。
+
+    每个窗口一个有序集合，分数含义与 SqliteLeaseQueue 的 available_at 相同，
+    已完成的任务分数为 +inf，因此重复入队不会把它重新放回队列。
+    """
+
+    def __init__(self, client: RespClient, prefix: str = "moguding:queue"):
+        self.client = client
+        self.prefix = prefix
+
+    def _keys(self, window: str):
+        base = f"{self.prefix}:{window}"
+        return tuple(
+            f"{base}:{name}" for name in ("jobs", "payload", "token", "owner", "result")
+        )
+
+    def enqueue(self, window: str, jobs: Dict[str, Any]) -> int:
+        """入队，同一窗口内已存在（包括已完成）的键会被忽略，返回新加入的任务数。"""
+        jobs_key, payload_key, *_ = self._keys(window)
+        now = time.time()
+        added = 0
+        for key, payload in jobs.items():
+            result = self.client.transaction(
+                [
+                    ["HSETNX", payload_key, key, JsonCodec.dumps(payload)],
+                    ["ZADD", jobs_key, "NX", now, key],
+                ]
+            )
+            added += result[1]
+        return added
+
+    def claim(self, window: str, worker: str, lease_seconds: float) -> Optional[Lease]:
+        """领取一个可执行的任务，没有时返回 None。"""
+        jobs_key, payload_key, token_key, owner_key, _ = self._keys(window)
+        while True:
+            now = time.time()
+            self.client.execute("WATCH", jobs_key)
+            members = self.client.execute(
+                "ZRANGEBYSCORE", jobs_key, "-inf", now, "LIMIT", 0, 1
+            )
+            if not members:
+                self.client.execute("UNWATCH")
+                return None
+            key = members[0].decode("utf-8")
+            result = self.client.transaction(
+                [
+                    ["ZADD", jobs_key, "XX", now + lease_seconds, key],
+                    ["HINCRBY", token_key, key, 1],
+                    ["HSET", owner_key, key, worker],
+                    ["HGET", payload_key, key],
+                ]
+            )
+            if result is not None:
+                return Lease(window, key, JsonCodec.loads(result[3]), result[1], worker)
+            # 其它节点同时修改了队列，重试
+
+    def _update_held(self, lease: Lease, score: Any, extra: Optional[list] = None) -> bool:
+        jobs_key, _, token_key, _, _ = self._keys(lease.window)
+        commands = [["ZADD", jobs_key, "XX", score, lease.key]] + (extra or [])
+        while True:
+            self.client.execute("WATCH", jobs_key, token_key)
+            token = self.client.execute("HGET", token_key, lease.key)
+            current = self.client.execute("ZSCORE", jobs_key, lease.key)
+            if token is None or int(token) != lease.token or current in (None, b"inf"):
+                self.client.execute("UNWATCH")
+                return False
+            if self.client.transaction(commands) is not None:
+                return True
+            # 其它任务的领取/续期修改了同一个有序集合，重新校验后再试
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """续期，返回是否仍持有租约。"""
+        return self._update_held(lease, time.time() + lease_seconds)
+
+    def complete(self, lease: Lease, result: str = "done") -> bool:
+        """标记完成，返回是否成功（租约已被接手时返回 False）。"""
+        result_key = self._keys(lease.window)[4]
+        return self._update_held(lease, "+inf", [["HSET", result_key, lease.key, result]])
+
+    def release(self, lease: Lease, delay: float = 0) -> bool:
+        """放弃租约，任务在 delay 秒后可被其它节点领取。"""
+        return self._update_held(lease, time.time() + delay)
+
+    def stats(self, window: str) -> Dict[str, int]:
+        """返回窗口内可领取、租用中、已完成的任务数。"""
+        jobs_key = self._keys(window)[0]
+        now = time.time()
+        return {
+            "ready": self.client.execute("ZCOUNT", jobs_key, "-inf", now),
+            "leased": self.client.execute("ZCOUNT", jobs_key, f"({now}", "(+inf"),
+            "done": self.client.execute("ZCOUNT", jobs_key, "+inf", "+inf"),
+        }
+
+
+def open_queue(url: str):
+    """
+    根据地址打开租约队列。
+
+    Args:
+        url (str): sqlite:///path/to/queue.db 或 redis://host:port/db。
+
+    Returns:
+        SqliteLeaseQueue | RedisLeaseQueue: 队列实例。
+
+    Raises:
+        ValueError: 不支持的地址。
+    """
+    if url.startswith("sqlite:///"):
+        return SqliteLeaseQueue(url[len("sqlite:///"):])
+    if url.startswith("redis://"):
+        return RedisLeaseQueue(RespClient.from_url(url))
+    raise ValueError(f"不支持的队列地址: {url}（应为 sqlite:///路径 或 redis://主机:端口/库）")
+
+
+class _LeaseKeeper:
+    """在后台为一个租约续期，并提供产生副作用前的同步校验。"""
+
+    def __init__(self, queue, lease: Lease, lease_seconds: float):
+        self.queue = queue
+        self.lease = lease
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+
+    def _renew(self) -> bool:
+        try:
+            held = self.queue.renew(self.lease, self.lease_seconds)
+        except Exception as e:
+            logger.warning(f"租约续期失败: {e}")
+            return True  # 暂时性错误：保留租约，由下一次心跳或 guard 再确认
+        if not held:
+            self.lost.set()
+        return held
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self._renew():
+                logger.error(f"任务 {self.lease.key} 的租约已被其它节点接手")
+                return
+
+    def guard(self) -> None:
+        """
+        在提交打卡/报告的请求发出前调用：同步续期一次，确认仍持有租约。
+
+        续期成功后租约至少还有 lease_seconds 秒，因此校验与请求之间只剩本地到服务器的发送时间这一小段窗口；
+        剩余的风险是各节点时钟不同步（超过租约时长时其它节点可能提前接手），以及请求已被服务器处理但
+        响应超时的情况，后者由任务本身对“今日已打卡/已提交”的检查兜底。
+
+        Raises:
+            LeaseLostError: 租约已被其它节点接手。
+        """
+        if self.lost.is_set():
+            raise LeaseLostError("租约已失效，放弃提交")
+        try:
+            held = self.queue.renew(self.lease, self.lease_seconds)
+        except Exception as e:
+            raise LeaseLostError(f"无法确认租约: {e}")
+        if not held:
+            self.lost.set()
+            raise LeaseLostError("租约已失效，放弃提交")
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def process_queue(
+    queue,
+    window: str,
+    handler: Callable[[Any, Callable[[], None]], bool],
+    worker: str,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_workers: int = 5,
+    poll_interval: float = 2,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_delay: float = DEFAULT_RETRY_DELAY,
+) -> int:
+    """
+    领取并执行窗口内的任务，直到窗口内没有可领取或租用中的任务。
+
+    其它节点持有的租约到期后，任务会被本节点接手；因此只要还有租用中的任务就继续轮询。
+    handler 返回 False 或抛出异常时不标记完成：放弃租约，retry_delay 秒后可被任一节点重新领取，
+    被领取满 max_attempts 次后才标记为失败。
+
+    Args:
+        queue: open_queue 返回的队列。
+        window (str): 执行窗口。
+        handler (Callable[[Any, Callable[[], None]], bool]): 执行函数，参数为任务数据和 guard，返回是否成功。
+            产生副作用（提交打卡/报告）的请求发出前必须调用 guard()，它在租约失效时抛出 LeaseLostError。
+        worker (str): 本节点标识。
+        lease_seconds (float): 租约时长（秒）。
+        max_workers (int): 本节点同时执行的任务数。
+        poll_interval (float): 没有可领取任务时的轮询间隔（秒）。
+        max_attempts (int): 每个任务最多被领取执行的次数。
+        retry_delay (float): 失败的任务重新可被领取前等待的秒数。
+
+    Returns:
+        int: 本节点成功完成的任务数。
+    """
+    completed = 0
+    lock = threading.Lock()
+    slots = threading.Semaphore(max_workers)
+
+    def execute(lease: Lease) -> None:
+        nonlocal completed
+        keeper = _LeaseKeeper(queue, lease, lease_seconds)
+        succeeded = False
+        try:
+            succeeded = handler(lease.payload, keeper.guard)
+        except LeaseLostError as e:
+            logger.warning(f"任务 {lease.key}: {e}")
+            return
+        except Exception as e:
+            logger.error(f"任务 {lease.key} 执行失败: {e}")
+        finally:
+            keeper.close()
+            slots.release()
+        if not succeeded and lease.token < max_attempts:
+            try:
+                if queue.release(lease, retry_delay):
+                    logger.warning(
+                        f"任务 {lease.key} 第 {lease.token} 次执行失败，{retry_delay:.0f} 秒后重新执行"
+                    )
+                else:
+                    logger.warning(f"任务 {lease.key} 执行失败，租约已被其它节点接手")
+            except Exception as e:
+                logger.error(f"任务 {lease.key} 放弃租约失败，将在租约到期后重新执行: {e}")
+            return
+        try:
+            if not queue.complete(lease, "done" if succeeded else "failed"):
+                logger.warning(f"任务 {lease.key} 完成时租约已失效")
+                return
+        except Exception as e:
+            logger.error(f"任务 {lease.key} 标记完成失败，将在租约到期后重新执行: {e}")
+            return
+        if not succeeded:
+            logger.error(f"任务 {lease.key} 已执行 {lease.token} 次均失败，不再重试")
+            return
+        with lock:
+            completed += 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            slots.acquire()
+            lease = queue.claim(window, worker, lease_seconds)
+            if lease is not None:
+                executor.submit(execute, lease)
+                continue
+            slots.release()
+            stats = queue.stats(window)
+            if not stats["ready"] and not stats["leased"]:
+                break
+            time.sleep(poll_interval)
+    return completed